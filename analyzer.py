@@ -0,0 +1,303 @@
+# analyzer.py
+# Sentiment analysis core shared by the UI, the worker pool and scripts (no UI imports here).
+# TextBlob and NLTK are imported on first use, so importing this module costs milliseconds;
+# benchmarks/import_time.py keeps it that way.
+
+import time
+import lexicon
+import metrics
+from key_phrases import choose_mode as choose_key_phrase_mode, extract as extract_key_phrases, rank_light, tagged_phrases
+
+# Bump whenever scoring or the result layout changes; persisted results of other versions are discarded
+ANALYZER_VERSION = "3"
+
+# ---------- ANALYSIS ----------
+def sentiment_label(polarity):
+    """Return the (sentiment, emoji) pair shown for a polarity score"""
+    if polarity > 0.1:
+        return "Positive", "😊"
+    if polarity < -0.1:
+        return "Negative", "😔"
+    return "Neutral", "😐"
+
+def summarize_scores(polarity, subjectivity, word_count, sentence_count, key_phrases):
+    sentiment, emoji = sentiment_label(polarity)
+    
+    return {
+        "sentiment": sentiment,
+        "emoji": emoji,
+        "polarity": polarity,
+        "polarity_percent": ((polarity + 1) / 2) * 100,
+        "subjectivity": subjectivity,
+        "subjectivity_label": "Subjective" if subjectivity > 0.5 else "Objective",
+        "word_count": word_count,
+        "sentence_count": sentence_count,
+        "key_phrases": list(dict.fromkeys(key_phrases))[:10],
+    }
+
+def analyze_text_blob(text: str):
+    return analyze_batch([text])[0]
+
+def analyze_batch(texts):
+    """Quick analysis of many texts in one call.
+    
+    Each text is split into sentences once and tokenized twice, as TextBlob
+    does: NLTK's word tokenizer gives the word count and the key phrases, and
+    the lexicon's own tokenizer (pattern's rules, which split differently)
+    gives the score.
+    """
+    import nltk
+    with metrics.stage("split"):
+        sentences = [nltk.sent_tokenize(text) for text in texts]
+    with metrics.stage("tokenize"):
+        tokens = [[nltk.word_tokenize(s, preserve_line=True) for s in text_sentences] for text_sentences in sentences]
+        words = [[w for sentence_tokens in text_tokens for w in words_from_tokens(sentence_tokens)] for text_tokens in tokens]
+    
+    try:
+        # Tagged per sentence, like blob.tags
+        with metrics.stage("key_phrases"):
+            key_phrases = [extract_key_phrases(sentence_tokens) for sentence_tokens in tokens]
+    except LookupError:  # no NLTK tagger model; anything else, like a job's timeout, is the caller's
+        key_phrases = [[w.lower() for w in text_words if len(w) > 3] for text_words in words]
+    
+    with metrics.stage("scoring"):
+        scores = [lexicon.score(text) for text in texts]
+    return [summarize_scores(polarity, subjectivity, len(text_words), len(text_sentences), phrases)
+            for (polarity, subjectivity), text_words, text_sentences, phrases in zip(scores, words, sentences, key_phrases)]
+
+def words_from_tokens(tokens):
+    """Drop punctuation tokens the same way TextBlob's .words does"""
+    from textblob.utils import strip_punc
+    return [t if t.startswith("'") else strip_punc(t) for t in tokens if strip_punc(t)]
+
+def split_sentences(text: str):
+    import nltk
+    with metrics.stage("split"):
+        return nltk.sent_tokenize(text)
+
+def outline_text(text: str):
+    """Cheap first stage of a deep analysis: sentence split plus whole-text score"""
+    with metrics.stage("scoring"):
+        polarity, subjectivity = lexicon.score(text)
+    return {"sentences": split_sentences(text), "polarity": polarity, "subjectivity": subjectivity}
+
+def analyze_sentence_batch(sentences, start=1, with_key_phrases=True, document=None, text_length=None):
+    """Analyze a run of consecutive sentences, numbering them from start.
+    
+    Each sentence is tokenized twice, like in the quick analysis: NLTK's word
+    tokenizer gives the word counts, word frequencies and key phrases, and the
+    lexicon's tokenizer the sentence and document scores. The returned
+    partial result can be combined with merge_partials() and turned into the
+    full report with finish_deep_analysis(). Callers that already have their
+    key phrases can skip the tagging with with_key_phrases=False.
+    
+    Key phrases are left unranked so batches merge into the same result as
+    one big batch: the tagged ones in text order, or None when the light mode
+    ranks the merged word frequencies instead. When these sentences are one
+    batch of a longer text, pass the text's length as text_length so the auto
+    mode decides for the whole text.
+    
+    The document score reads the sentences as one continuous stream, like the
+    quick analysis reads the whole text. Pass a lexicon.Accumulator as document
+    to continue the stream of the sentences before these (in this process).
+    """
+    import nltk
+    sentence_tokens = []
+    sentence_analysis = []
+    scores = []
+    document = document if document is not None else lexicon.Accumulator()
+    word_freq = {}
+    total_words = 0
+    tokenize_time = scoring_time = 0.0
+    
+    for i, sentence in enumerate(sentences, start):
+        t0 = time.perf_counter()
+        tokens = nltk.word_tokenize(sentence, preserve_line=True)
+        words = words_from_tokens(tokens)
+        t1 = time.perf_counter()
+        score_tokens = lexicon.tokenize(sentence)
+        p_sum, s_sum, count = lexicon.accumulate(score_tokens)
+        document.feed(score_tokens)
+        t2 = time.perf_counter()
+        tokenize_time += t1 - t0
+        scoring_time += t2 - t1
+        sentence_analysis.append({
+            "number": i,
+            "text": sentence,
+            "polarity": p_sum / float(count or 1),
+            "subjectivity": s_sum / float(count or 1),
+            "word_count": len(words)
+        })
+        sentence_tokens.append(tokens)
+        scores.append((p_sum, s_sum, count))
+        total_words += len(words)
+        
+        # Word frequency analysis
+        for word in words:
+            word_lower = word.lower()
+            if len(word_lower) > 2:
+                word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
+    
+    metrics.add_stage("tokenize", tokenize_time)
+    metrics.add_stage("scoring", scoring_time)
+    
+    key_phrases = []
+    if with_key_phrases and choose_key_phrase_mode(text_length or sum(map(len, sentences))) == "light":
+        key_phrases = None
+    elif with_key_phrases:
+        try:
+            with metrics.stage("key_phrases"):
+                key_phrases = tagged_phrases(sentence_tokens)
+        except LookupError:  # no NLTK tagger model
+            key_phrases = [w.lower() for tokens in sentence_tokens for w in words_from_tokens(tokens) if len(w) > 3]
+    
+    return {
+        "sentences": sentence_analysis,
+        "scores": scores,
+        "document": document.totals(),
+        "word_freq": word_freq,
+        "total_words": total_words,
+        "key_phrases": key_phrases if key_phrases is None else list(dict.fromkeys(key_phrases)),
+    }
+
+def shard_sentences(sentences, shards):
+    """Split sentences into at most shards runs of consecutive sentences with similar amounts of
+    text, as (first sentence number, sentences) pairs ready for analyze_sentence_batch()"""
+    total = sum(len(s) for s in sentences)
+    runs = []
+    run = []
+    start = 1
+    done = 0
+    for number, sentence in enumerate(sentences, 1):
+        run.append(sentence)
+        done += len(sentence)
+        if len(runs) < shards - 1 and done * shards >= total * (len(runs) + 1):
+            runs.append((start, run))
+            run = []
+            start = number + 1
+    if run:
+        runs.append((start, run))
+    return runs
+
+def merge_partials(partials):
+    """Combine partial results of consecutive sentence batches, in order. The document score
+    adds up the batches' own, as if the text broke off at each batch boundary; pass the
+    whole-text score to finish_deep_analysis() to match the quick analysis exactly.
+    Key phrases are ranked once, by finish_deep_analysis(), as for a single batch."""
+    merged = {"sentences": [], "scores": [], "document": (0.0, 0.0, 0), "word_freq": {}, "total_words": 0, "key_phrases": []}
+    word_freq = merged["word_freq"]
+    for part in partials:
+        merged["sentences"].extend(part["sentences"])
+        merged["scores"].extend(part["scores"])
+        merged["document"] = tuple(a + b for a, b in zip(merged["document"], part["document"]))
+        merged["total_words"] += part["total_words"]
+        if part["key_phrases"] is None or merged["key_phrases"] is None:
+            merged["key_phrases"] = None
+        else:
+            merged["key_phrases"].extend(part["key_phrases"])
+        for word, freq in part["word_freq"].items():
+            word_freq[word] = word_freq.get(word, 0) + freq
+    if merged["key_phrases"] is not None:
+        merged["key_phrases"] = list(dict.fromkeys(merged["key_phrases"]))
+    return merged
+
+def finish_deep_analysis(partial, score=None):
+    """Build the deep analysis report from a (merged) partial result.
+    score is the whole text's (polarity, subjectivity), as from outline_text(), for partials
+    merged from several batches; otherwise the partial's continuous document score is used."""
+    sentence_analysis = partial["sentences"]
+    total_words = partial["total_words"]
+    
+    if score is None:
+        polarity_sum, subjectivity_sum, assessments = partial["document"]
+        score = (polarity_sum / float(assessments or 1), subjectivity_sum / float(assessments or 1))
+    key_phrases = partial["key_phrases"]
+    if key_phrases is None:
+        key_phrases = rank_light(partial["word_freq"])
+    basic_analysis = summarize_scores(
+        score[0],
+        score[1],
+        total_words,
+        len(sentence_analysis),
+        key_phrases,
+    )
+    
+    top_words = sorted(partial["word_freq"].items(), key=lambda x: x[1], reverse=True)[:10]
+    
+    # Analysis metrics
+    polarities = [s["polarity"] for s in sentence_analysis]
+    totals = {
+        "sentences": len(sentence_analysis),
+        "words": total_words,
+        "subjectivity_sum": sum(s["subjectivity"] for s in sentence_analysis),
+        "deviation_sum": sum(abs(p - basic_analysis["polarity"]) for p in polarities),
+        "positive": sum(1 for p in polarities if p > 0.1),
+        "negative": sum(1 for p in polarities if p < -0.1),
+        "polarity_range": max(polarities) - min(polarities) if polarities else 0,
+    }
+    return build_report(basic_analysis, sentence_analysis, top_words, totals)
+
+def build_report(basic_analysis, sentence_analysis, top_words, totals):
+    """Assemble the deep analysis report from document-wide totals: sentence and word counts,
+    the sums of sentence subjectivity and of each sentence's distance from the document
+    polarity, positive/negative sentence counts and the spread of sentence polarities"""
+    sentences = totals["sentences"]
+    positive, negative = totals["positive"], totals["negative"]
+    
+    avg_sentence_length = totals["words"] / sentences if sentences else 0
+    complexity_score = totals["subjectivity_sum"] / sentences if sentences else 0
+    sentiment_consistency = 1 - (totals["deviation_sum"] / sentences) if sentences else 0
+    
+    return {
+        "basic": basic_analysis,
+        "sentences": sentence_analysis,
+        "word_frequency": top_words,
+        "statistics": {
+            "total_sentences": sentences,
+            "total_words": totals["words"],
+            "avg_sentence_length": round(avg_sentence_length, 2),
+            "complexity_score": round(complexity_score, 3),
+            "sentiment_consistency": round(max(0, sentiment_consistency), 3),
+            "positive_sentences": positive,
+            "negative_sentences": negative,
+            "neutral_sentences": sentences - positive - negative
+        },
+        "insights": {
+            "dominant_emotion": "Positive" if positive > negative else "Negative" if negative > positive else "Neutral",
+            "emotional_range": round(totals["polarity_range"], 3),
+            "subjectivity_level": "High" if complexity_score > 0.6 else "Medium" if complexity_score > 0.3 else "Low",
+            "consistency_level": "High" if sentiment_consistency > 0.7 else "Medium" if sentiment_consistency > 0.4 else "Low"
+        }
+    }
+
+def deep_analyze_text(text: str):
+    """Perform comprehensive deep analysis of the text"""
+    return finish_deep_analysis(analyze_sentence_batch(split_sentences(text)))
+
+def deep_analyze_batch(texts):
+    """deep_analyze_text() for many texts in one worker job"""
+    return [deep_analyze_text(text) for text in texts]
+
+# ---------- WORKER SETUP ----------
+_warm_up_timings = {}
+
+def warm_up():
+    """Load the lexicon, tokenizer and tagger so the first real analysis doesn't pay for it.
+    Returns the seconds each took; later calls return the first call's timings."""
+    if _warm_up_timings:
+        return _warm_up_timings
+    t0 = time.perf_counter()
+    lexicon.load_lexicon()
+    t1 = time.perf_counter()
+    _warm_up_timings["lexicon"] = round(t1 - t0, 4)
+    try:
+        import nltk
+        tokens = nltk.word_tokenize(nltk.sent_tokenize("Warm up the analyzer.")[0], preserve_line=True)
+        words_from_tokens(tokens)
+        t2 = time.perf_counter()
+        _warm_up_timings["tokenizer"] = round(t2 - t1, 4)
+        extract_key_phrases([tokens], mode="tagger")
+        _warm_up_timings["tagger"] = round(time.perf_counter() - t2, 4)
+    except LookupError:
+        pass  # missing NLTK data is reported by the analysis itself
+    return _warm_up_timings
@@ -0,0 +1,273 @@
+# api.py
+# JSON API over the analyzer: /api/analyze and /api/deep-analyze for one text or a batch,
+# /api/bulk for streamed NDJSON/CSV uploads of any size
+#
+# Environment:
+#   API_MAX_BATCH        most texts accepted in one /api/analyze or /api/deep-analyze request (default: 100)
+#   API_BULK_IN_FLIGHT   /api/bulk jobs queued on the worker pool at once (default: 2 per worker)
+
+import asyncio
+import codecs
+import csv
+import json
+import math
+import os
+from collections import deque
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from nicegui import app
+from pydantic import BaseModel
+from starlette.requests import ClientDisconnect
+
+import result_cache
+import worker_pool
+from analyzer import (analyze_batch, analyze_sentence_batch, deep_analyze_batch, finish_deep_analysis,
+                      merge_partials, outline_text, shard_sentences)
+
+# ---------- CONFIG ----------
+MAX_BATCH = int(os.environ.get("API_MAX_BATCH", "100"))
+BULK_CHUNK = 32  # records per /api/bulk worker job
+BULK_IN_FLIGHT = int(os.environ.get("API_BULK_IN_FLIGHT", str(2 * worker_pool.POOL_SIZE)))
+SHARD_MIN_CHARS = 4000  # longer texts are deep-analyzed by all workers together, split at sentence boundaries
+CSV_MAX_RECORD = 1024 * 1024  # characters a CSV record may span before it is reported as unterminated
+
+class AnalyzeRequest(BaseModel):
+    text: str | None = None          # one text ...
+    texts: list[str] | None = None   # ... or a batch of them
+    fields: list[str] | None = None  # top-level result keys to return (default: all)
+
+# ---------- BATCHING ----------
+async def deep_analyze_sharded(text):
+    """deep_analyze_text() for one long text, with its sentences split into one shard per worker.
+    The partials are merged in order, so the result is identical to the sequential one."""
+    outline = await worker_pool.run(outline_text, text)
+    shards = shard_sentences(outline["sentences"], worker_pool.POOL_SIZE)
+    length = sum(map(len, outline["sentences"]))
+    partials = await asyncio.gather(*(worker_pool.run(analyze_sentence_batch, shard, start, True, None, length)
+                                      for start, shard in shards))
+    return finish_deep_analysis(merge_partials(partials), score=(outline["polarity"], outline["subjectivity"]))
+
+async def analyze_many(kind, batch_fn, texts):
+    """Results for texts, in order: cached ones as they are, long deep-analysis texts sharded across
+    the workers, the rest split into one pool job per worker"""
+    results = await result_cache.results.fetch_many(kind, texts)
+    pending = list(dict.fromkeys(text for text, result in zip(texts, results) if result is None))
+    if pending:
+        computed = {}
+        sharded = [text for text in pending if len(text) > SHARD_MIN_CHARS] \
+            if batch_fn is deep_analyze_batch and worker_pool.POOL_SIZE > 1 else []
+        batched = [text for text in pending if text not in sharded]
+        size = math.ceil(len(batched) / worker_pool.POOL_SIZE) or 1
+        chunks = [batched[i:i + size] for i in range(0, len(batched), size)]
+
+        async def run_chunk(chunk):
+            computed.update(zip(chunk, await worker_pool.run(batch_fn, chunk)))
+
+        async def run_sharded(text):
+            computed[text] = await deep_analyze_sharded(text)
+
+        await asyncio.gather(*map(run_chunk, chunks), *map(run_sharded, sharded))
+        await result_cache.results.save_many(kind, [(text, computed[text]) for text in pending])
+        results = [computed[text] if result is None else result for text, result in zip(texts, results)]
+    return results
+
+def select_fields(results, fields):
+    if not fields or not results:
+        return results
+    unknown = [f for f in fields if f not in results[0]]
+    if unknown:
+        raise HTTPException(400, f"Unknown fields {unknown}; available: {list(results[0])}")
+    return [{f: result[f] for f in fields} for result in results]
+
+async def handle(kind, batch_fn, request: AnalyzeRequest):
+    if (request.text is None) == (request.texts is None):
+        raise HTTPException(400, "Send either 'text' or 'texts'")
+    texts = [request.text] if request.text is not None else request.texts
+    if not texts:
+        raise HTTPException(400, "'texts' is empty")
+    if len(texts) > MAX_BATCH:
+        raise HTTPException(413, f"At most {MAX_BATCH} texts per request")
+    if any(not text.strip() for text in texts):
+        raise HTTPException(400, "Texts must not be empty")
+    try:
+        results = select_fields(await analyze_many(kind, batch_fn, texts), request.fields)
+    except asyncio.TimeoutError:
+        raise HTTPException(504, "Analysis took too long — try shorter texts or smaller batches")
+    return results[0] if request.text is not None else {"results": results}
+
+# ---------- ENDPOINTS ----------
+@app.post("/api/analyze")
+async def api_analyze(request: AnalyzeRequest):
+    """Quick analysis: the same result as the Quick Analyze button"""
+    return await handle("quick", analyze_batch, request)
+
+@app.post("/api/deep-analyze")
+async def api_deep_analyze(request: AnalyzeRequest):
+    """Deep analysis: the same result as the Deep Analyze button"""
+    return await handle("deep", deep_analyze_batch, request)
+
+# ---------- BULK ----------
+class DuplexStreamingResponse(StreamingResponse):
+    """A streaming response that may start while the request body is still being read.
+    StreamingResponse watches receive() for a disconnect, which would swallow body chunks;
+    here the body reader is the only consumer and notices the disconnect itself."""
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+async def read_lines(request: Request):
+    """Lines of the request body, decoded as they arrive"""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    buffer = ""
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.removesuffix("\r")
+
+async def read_ndjson(lines, text_field, id_field):
+    """(id, text, error) per line: a JSON string, or an object with the text under text_field"""
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None, None, "Invalid JSON"
+            continue
+        if isinstance(record, str):
+            yield None, record, None
+        elif isinstance(record, dict) and isinstance(record.get(text_field), str):
+            yield record.get(id_field), record[text_field], None
+        else:
+            yield record.get(id_field) if isinstance(record, dict) else None, None, f"No '{text_field}' string"
+
+def csv_quoted(line, quoted=False):
+    """Whether a CSV record is inside a quoted field at the end of line, given whether it was at its
+    start. Same rules as csv.reader: a quote only opens a field at the start of the field, and ""
+    inside a quoted field is a literal quote."""
+    if not quoted and '"' not in line:
+        return False
+    field_start = not quoted
+    closed = False  # the previous character closed a quoted field (or starts a "" escape)
+    for ch in line:
+        if quoted:
+            if ch == '"':
+                quoted, closed = False, True
+            continue
+        if closed and ch == '"':
+            quoted, closed = True, False
+            continue
+        closed = False
+        if ch == ",":
+            field_start = True
+        else:
+            quoted = ch == '"' and field_start
+            field_start = False
+    return quoted
+
+async def read_csv(lines, text_field, id_field):
+    """(id, text, error) per CSV row after the header row; quoted fields may span lines, up to
+    CSV_MAX_RECORD characters"""
+    header = None
+    pending = []
+    pending_chars = 0
+    quoted = False
+    async for line in lines:
+        pending.append(line)
+        pending_chars += len(line) + 1
+        quoted = csv_quoted(line, quoted)
+        if quoted:
+            if pending_chars <= CSV_MAX_RECORD:
+                continue  # inside a quoted field that continues on the next line
+            pending, pending_chars, quoted = [], 0, False
+            yield None, None, "Unterminated quoted field"
+            continue
+        record = "\n".join(pending)
+        pending, pending_chars = [], 0
+        row = next(csv.reader([record]), [])
+        if not any(row):
+            continue
+        if header is None:
+            header = row
+            if text_field not in header:
+                yield None, None, f"CSV header has no '{text_field}' column"
+                return
+            continue
+        values = dict(zip(header, row))
+        yield values.get(id_field), values.get(text_field) or "", None
+    if pending:
+        yield None, None, "Unterminated quoted field"  # the upload ended inside a quoted field
+
+def submit_chunk(batch_fn, chunk):
+    texts = [text for _, _, text, error in chunk if error is None]
+    return chunk, asyncio.ensure_future(worker_pool.run(batch_fn, texts)) if texts else None
+
+async def finish_chunk(chunk, task, fields):
+    """NDJSON lines for one submitted chunk, in input order"""
+    try:
+        results = iter(await task) if task is not None else iter(())
+        failure = None
+    except asyncio.TimeoutError:
+        failure = "Analysis took too long"
+    except Exception as e:
+        failure = f"Analysis failed: {e}"
+    lines = []
+    for index, record_id, text, error in chunk:
+        line = {"index": index}
+        if record_id is not None:
+            line["id"] = record_id
+        if error is None and failure is None:
+            result = next(results)
+            line["result"] = {f: result[f] for f in fields if f in result} if fields else result
+        else:
+            line["error"] = error or failure
+        lines.append(json.dumps(line, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+async def stream_bulk(records, batch_fn, fields):
+    """Analyze records in chunks with at most BULK_IN_FLIGHT jobs queued, yielding results in input order"""
+    in_flight = deque()
+    chunk = []
+    try:
+        index = 0
+        async for record_id, text, error in records:
+            if error is None and not text.strip():
+                error = "Empty text"
+            chunk.append((index, record_id, text, error))
+            index += 1
+            if len(chunk) >= BULK_CHUNK:
+                in_flight.append(submit_chunk(batch_fn, chunk))
+                chunk = []
+            # Flush whatever is done at the head; block on it only when the queue is full
+            while in_flight and (len(in_flight) >= BULK_IN_FLIGHT or in_flight[0][1] is None or in_flight[0][1].done()):
+                yield await finish_chunk(*in_flight.popleft(), fields)
+        if chunk:
+            in_flight.append(submit_chunk(batch_fn, chunk))
+        while in_flight:
+            yield await finish_chunk(*in_flight.popleft(), fields)
+    finally:
+        for _, task in in_flight:
+            if task is not None:
+                task.cancel()
+
+@app.post("/api/bulk")
+async def api_bulk(request: Request, mode: str = "quick", text_field: str = "text", id_field: str = "id", fields: str = ""):
+    """Analyze a streamed NDJSON (default) or CSV (Content-Type: text/csv) upload.
+    Streams back one NDJSON line per input record, in input order: {"index", "id"?, "result" | "error"}."""
+    if mode not in ("quick", "deep"):
+        raise HTTPException(400, "mode must be 'quick' or 'deep'")
+    batch_fn = deep_analyze_batch if mode == "deep" else analyze_batch
+    reader = read_csv if request.headers.get("content-type", "").startswith("text/csv") else read_ndjson
+    records = reader(read_lines(request), text_field, id_field)
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    return DuplexStreamingResponse(stream_bulk(records, batch_fn, wanted), media_type="application/x-ndjson")
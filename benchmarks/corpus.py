@@ -0,0 +1,88 @@
+# benchmarks/corpus.py
+# Seeded synthetic texts for benchmarks and load tests: the same seed always gives the same corpus
+#
+# Kinds: "tweet" (one or two short sentences), "review" (a product/service review paragraph),
+# "report" (a long multi-paragraph report) and "social" (emoji- and hashtag-heavy posts with line
+# breaks, like the one in sentiment_history_20251129_213607.json).
+#
+# Usage: python benchmarks/corpus.py KIND [N] [--seed S]   (prints one JSON string per line)
+
+import argparse
+import json
+import random
+
+# ---------- CONFIG ----------
+DEFAULT_SEED = 42
+KINDS = ("tweet", "review", "report", "social")
+
+SUBJECTS = ["The delivery", "Customer support", "This phone", "The hotel room", "Our waiter", "The new update",
+            "Battery life", "The checkout page", "The onboarding", "Their team", "The camera", "Shipping"]
+VERDICTS = ["was absolutely fantastic", "felt slow and clunky", "is decent for the price", "broke after two days",
+            "exceeded every expectation", "was honestly disappointing", "works exactly as described",
+            "could be a lot better", "made my whole week", "is not worth the hype", "surprised me in a good way",
+            "was rude and unhelpful"]
+CLAUSES = ["but the packaging was damaged", "and the staff were friendly", "although it took twelve days",
+           "so I would buy it again", "yet nobody answered my emails", "and the quality is outstanding",
+           "while the price keeps going up", "even though the manual is confusing"]
+OPENERS = ["Honestly,", "To be fair,", "Overall,", "Sadly,", "Luckily,", "In short,", "After a month,", ""]
+REPORT_TOPICS = ["Quarterly revenue", "Customer satisfaction", "Employee engagement", "Server uptime",
+                 "Marketing reach", "Churn", "Support response time", "Product quality"]
+REPORT_TRENDS = ["rose sharply", "declined slightly", "remained stable", "improved steadily", "fell short of targets",
+                 "exceeded our forecast", "was mixed across regions", "recovered after a weak start"]
+REPORT_NOTES = ["The team considers this a strong result.", "Several risks remain unresolved.",
+                "Feedback from partners was largely positive.", "The main driver was a delayed launch.",
+                "We expect the situation to improve next quarter.", "This is a worrying trend that needs attention.",
+                "Dr. Perera's team led the analysis, e.g. the survey of 1,200 users.", "No major incidents were reported."]
+EMOJIS = ["🚀", "✨", "💙", "💛", "🔥", "🙌", "😊", "😔", "🎉", "💪", "❤️", "👏"]
+HASHTAGS = ["StartupDuo", "YouthEmpowerment", "WeAreBack", "StartAgain", "LeadershipForYouth", "Growth",
+            "MondayMotivation", "TeamWork", "NewBeginnings", "Community"]
+SOCIAL_LINES = ["We’re officially restarting!", "Life got busy, but our mission never changed.",
+                "This is your reminder:", "Growth takes time", "Impact needs consistency",
+                "And we’re here to build something meaningful together", "Let’s start again.",
+                "A new chapter begins today.", "Huge thanks to everyone who showed up!", "Not every day is easy."]
+
+# ---------- GENERATORS ----------
+def tweet(rng):
+    text = f"{rng.choice(SUBJECTS)} {rng.choice(VERDICTS)}."
+    if rng.random() < 0.5:
+        text += f" {rng.choice(['Love it!', 'Never again.', 'Meh.', 'So good!!', 'Why is this so hard?', 'Ugh.'])}"
+    return text
+
+def review(rng):
+    sentences = [f"{rng.choice(OPENERS)} {rng.choice(SUBJECTS).lower()} {rng.choice(VERDICTS)} {rng.choice(CLAUSES)}.".strip()
+                 for _ in range(rng.randint(3, 8))]
+    return " ".join(s[0].upper() + s[1:] for s in sentences)
+
+def report(rng):
+    paragraphs = []
+    for _ in range(rng.randint(12, 20)):
+        sentences = [f"{rng.choice(REPORT_TOPICS)} {rng.choice(REPORT_TRENDS)} in {rng.choice(['Q1', 'Q2', 'Q3', 'Q4'])}."]
+        sentences += rng.sample(REPORT_NOTES, rng.randint(2, 5))
+        sentences += [review(rng)]
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+def social(rng):
+    lines = [f"{rng.choice(SOCIAL_LINES)} {rng.choice(EMOJIS)}", ""]
+    lines += [f"{rng.choice(EMOJIS)} {line}" for line in rng.sample(SOCIAL_LINES, rng.randint(2, 5))]
+    lines += ["", " ".join(f"hashtag#{tag}" for tag in rng.sample(HASHTAGS, rng.randint(3, 6)))]
+    return "\n".join(lines)
+
+GENERATORS = {"tweet": tweet, "review": review, "report": report, "social": social}
+
+def generate(kind, n, seed=DEFAULT_SEED):
+    """n texts of one kind; each kind has its own stream of the seed, so kinds don't shift each other"""
+    rng = random.Random(f"{seed}-{kind}")
+    return [GENERATORS[kind](rng) for _ in range(n)]
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a seeded synthetic corpus as JSON lines")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("n", type=int, nargs="?", default=10)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+    for text in generate(args.kind, args.n, args.seed):
+        print(json.dumps(text, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
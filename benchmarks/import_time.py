@@ -0,0 +1,62 @@
+# benchmarks/import_time.py
+# Cold-import cost of the headless analysis core, measured in fresh interpreters
+#
+# Usage: python benchmarks/import_time.py [--runs N] [--budget-ms MS]
+# Exits non-zero when the median import exceeds the budget or pulls in a heavy dependency.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# ---------- CONFIG ----------
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ("analyzer",)
+HEAVY = ("nicegui", "fastapi", "starlette", "textblob", "nltk")  # must only load on first use
+DEFAULT_RUNS = 15
+DEFAULT_BUDGET_MS = 50.0
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import {module}
+print((time.perf_counter() - t0) * 1000)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+# ---------- BENCHMARK ----------
+def measure(module, runs):
+    """Import times in ms over runs fresh interpreters, plus any heavy modules the import loaded"""
+    code = PROBE.format(module=module, heavy=HEAVY)
+    times, loaded = [], set()
+    for run in range(runs + 1):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        ms, heavy = out.stdout.splitlines()
+        if run == 0:
+            continue  # the first run may still be writing .pyc files
+        times.append(float(ms))
+        loaded.update(m for m in heavy.split(",") if m)
+    return times, sorted(loaded)
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-import benchmark for the analysis core")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args()
+
+    failed = False
+    for module in MODULES:
+        times, loaded = measure(module, args.runs)
+        median = statistics.median(times)
+        print(f"{module:<12} median {median:7.2f} ms   min {min(times):7.2f} ms   max {max(times):7.2f} ms")
+        if median > args.budget_ms:
+            print(f"  over budget: {median:.2f} ms > {args.budget_ms:.2f} ms")
+            failed = True
+        if loaded:
+            print(f"  imported eagerly: {', '.join(loaded)}")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/key_phrase_tagging.py
+# Key-phrase extraction against nltk.pos_tag: identical output and timing for the memoized
+# tagger, overlap and timing for the light mode
+#
+# Usage: python benchmarks/key_phrase_tagging.py [TEXTS_FILE] [--repeat N]
+# TEXTS_FILE holds one text per line; without it a seeded sample of the benchmark corpus is used.
+# Exits non-zero if the memoized tagger ever disagrees with nltk.pos_tag_sents.
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus  # noqa: E402
+import key_phrases  # noqa: E402
+import startup  # noqa: E402
+
+# ---------- CONFIG ----------
+SEED = 7
+SAMPLE_TEXTS = 400
+
+def sample_texts(n):
+    """n texts from the benchmark corpus, the same number of each kind"""
+    return [text for kind in corpus.KINDS for text in corpus.generate(kind, n // len(corpus.KINDS), SEED)]
+
+def tokenize(texts):
+    import nltk
+    return [[nltk.word_tokenize(s, preserve_line=True) for s in nltk.sent_tokenize(t)] for t in texts]
+
+def timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description="Key-phrase extraction benchmark")
+    parser.add_argument("texts_file", nargs="?")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over the texts (later passes hit the memo)")
+    args = parser.parse_args()
+
+    startup.configure_nltk()
+    import nltk
+    if args.texts_file:
+        with open(args.texts_file, encoding="utf-8") as f:
+            texts = [line.strip() for line in f if line.strip()]
+    else:
+        texts = sample_texts(SAMPLE_TEXTS)
+    docs = tokenize(texts)
+    try:
+        nltk.pos_tag(["warm", "up"])
+        key_phrases.get_tagger()
+    except LookupError:
+        sys.exit("The NLTK tagger model is missing; run: python startup.py download")
+
+    tokens = sum(len(s) for doc in docs for s in doc)
+    print(f"{len(texts)} texts, {tokens} tokens, {args.repeat} passes")
+
+    reference, ref_time = timed(lambda: [[[tag for _, tag in sent] for sent in nltk.pos_tag_sents(doc)]
+                                         for _ in range(args.repeat) for doc in docs])
+    memoized, memo_time = timed(lambda: [key_phrases.tag_sents(doc) for _ in range(args.repeat) for doc in docs])
+    mismatches = sum(r != m for r, m in zip(reference, memoized))
+    print(f"nltk.pos_tag_sents   {ref_time:8.3f}s")
+    print(f"memoized tagger      {memo_time:8.3f}s  x{ref_time / memo_time:.2f}  "
+          f"memo hits {key_phrases.stats['memo_hits']}/{key_phrases.stats['tokens']}  mismatching texts {mismatches}")
+
+    tagged = [list(dict.fromkeys(key_phrases.extract(doc, mode="tagger")))[:10] for doc in docs]
+    light, light_time = timed(lambda: [list(dict.fromkeys(key_phrases.extract(doc, mode="light")))[:10]
+                                       for _ in range(args.repeat) for doc in docs])
+    found = sum(len(set(t) & set(l)) for t, l in zip(tagged, light))
+    expected = sum(len(t) for t in tagged)
+    print(f"light mode           {light_time:8.3f}s  x{ref_time / light_time:.2f}  "
+          f"recall of tagger key phrases {found / max(expected, 1):.1%}")
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
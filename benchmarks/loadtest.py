@@ -0,0 +1,319 @@
+# benchmarks/loadtest.py
+# Many simulated browsers against a locally started server: end-to-end latency of quick and deep
+# analyses, websocket message volume, and the server's CPU and memory, at increasing client counts
+#
+# Each client does what a browser does: loads the page (with its own session cookie), connects the
+# NiceGUI websocket, types a text from the seeded corpus into the editor and clicks Quick or Deep
+# Analyze, then waits for the "complete" notification and thinks for a while before the next one.
+# Everything runs on this machine; no browser and no network access are needed.
+#
+# Usage:
+#   python benchmarks/loadtest.py                                   10, 25 and 50 clients, 30 s each
+#   python benchmarks/loadtest.py --clients 5,20,80 --duration 60 --mix quick:3,deep:1 --texts review:2,report:1
+#   python benchmarks/loadtest.py --workers 4 --clients 50,100,200        (the multi-process server, server.py)
+#   python benchmarks/loadtest.py --url http://localhost:8080 --output load.json   (an already running server)
+# Server CPU and memory are only measured for a server this script started (Linux /proc).
+# Needs aiohttp and python-socketio: pip install -r benchmarks/requirements.txt
+
+import argparse
+import ast
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import time
+import uuid
+
+import aiohttp
+import socketio
+
+import corpus
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------- CONFIG ----------
+BUTTONS = {"quick": "🔍 Quick Analyze", "deep": "🧠 Deep Analyze"}
+DEFAULT_CLIENTS = "10,25,50"
+DEFAULT_MIX = "quick:3,deep:1"
+DEFAULT_TEXTS = "tweet:4,review:3,social:2,report:1"
+TEXTS_PER_KIND = 50        # distinct corpus texts per kind; repeats hit the result cache, as real traffic does
+ACTION_TIMEOUT = 60        # seconds before an analysis counts as failed
+SAMPLE_INTERVAL = 0.5      # seconds between server CPU/RSS samples
+READY_TIMEOUT = 120        # seconds to wait for a started server to pass /readyz
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+# ---------- SERVER ----------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(port, workers=None):
+    env = {**os.environ, "PORT": str(port), "PYTHONUNBUFFERED": "1"}
+    command = [sys.executable, os.path.join(ROOT, "main.py")]
+    if workers:
+        command += ["serve", "--workers", str(workers)]
+    return subprocess.Popen(command, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+async def wait_ready(url, server):
+    deadline = time.monotonic() + READY_TIMEOUT
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            if server is not None and server.poll() is not None:
+                raise RuntimeError(f"server exited with code {server.returncode}")
+            try:
+                async with session.get(f"{url}/readyz") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.5)
+    raise RuntimeError(f"server not ready after {READY_TIMEOUT}s")
+
+def process_tree(root_pid):
+    """(cpu seconds, rss bytes) summed over root_pid and all its descendants, from /proc"""
+    stats = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            with open(f"/proc/{name}/statm") as f:
+                rss = int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            continue  # exited while we looked
+        stats[int(name)] = (int(fields[1]), (int(fields[11]) + int(fields[12])) / CLK_TCK, rss)
+    tree, frontier = set(), {root_pid}
+    while frontier:
+        tree |= frontier
+        frontier = {pid for pid, (ppid, _, _) in stats.items() if ppid in frontier and pid not in tree}
+    return sum(stats[pid][1] for pid in tree if pid in stats), sum(stats[pid][2] for pid in tree if pid in stats)
+
+async def sample_server(pid, samples, stop):
+    while not stop.is_set():
+        samples.append((time.monotonic(), *process_tree(pid)))
+        try:
+            await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+# ---------- CLIENT ----------
+def parse_page(html):
+    """Element tree and websocket query of a NiceGUI page, as the page's own script reads them"""
+    raw = re.search(r"parseElements\(String\.raw`(.*?)`\)", html, re.S).group(1)
+    for escaped, char in (("&#36;", "$"), ("&#96;", "`"), ("&gt;", ">"), ("&lt;", "<"), ("&amp;", "&")):
+        raw = raw.replace(escaped, char)
+    query = ast.literal_eval(re.search(r"^\s*query: (\{.*\}),$", html, re.M).group(1))
+    return json.loads(raw), query
+
+def listener(elements, event_type, **props):
+    """(element id, listener id) of the first element with these props listening to event_type"""
+    for element_id, element in elements.items():
+        if all(element.get("props", {}).get(k) == v for k, v in props.items()):
+            for event in element.get("events", []):
+                if event["type"] == event_type:
+                    return element_id, event["listener_id"]
+    raise LookupError(f"no {event_type} listener on an element with {props}")
+
+class Client:
+    """One simulated browser tab"""
+
+    def __init__(self, url, texts, mix, think, rng, stats):
+        self.url, self.texts, self.mix, self.think, self.rng, self.stats = url, texts, mix, think, rng, stats
+        self.sio = socketio.AsyncClient(reconnection=False)
+        self.sio.on("*", self.on_message)
+        self.done = None         # future resolved by the next "complete" or error notification
+        self.next_message_id = 0
+
+    async def on_message(self, event, data):
+        self.stats["messages_in"] += 1
+        self.stats["bytes_in"] += len(json.dumps(data, ensure_ascii=False).encode())
+        if isinstance(data, dict) and "_id" in data:
+            self.next_message_id = data["_id"] + 1
+        if event == "notify" and self.done is not None and not self.done.done():
+            self.done.set_result(data.get("type") not in ("negative", "warning"))
+
+    async def emit(self, event, data):
+        self.stats["messages_out"] += 1
+        self.stats["bytes_out"] += len(json.dumps(data, ensure_ascii=False).encode())
+        await self.sio.emit(event, data)
+
+    async def run(self, session, stop):
+        t0 = time.perf_counter()
+        async with session.get(self.url + "/") as response:
+            elements, query = parse_page(await response.text())
+        self.stats["page_loads"].append(time.perf_counter() - t0)
+        query = {k: str(v).lower() if isinstance(v, bool) else v for k, v in query.items()}
+        query.update(document_id=uuid.uuid4(), tab_id=uuid.uuid4())  # set by the page's script in a browser
+        editor = listener(elements, "update:value", type="textarea")
+        buttons = {action: listener(elements, "click", label=label) for action, label in BUTTONS.items()}
+        client_id = query["client_id"]
+        cookies = "; ".join(f"{c.key}={c.value}" for c in session.cookie_jar)
+        await self.sio.connect(f"{self.url}?{'&'.join(f'{k}={v}' for k, v in query.items())}",
+                               socketio_path="/_nicegui_ws/socket.io", transports=["websocket"],
+                               headers={"Cookie": cookies} if cookies else {})
+        try:
+            while not stop.is_set():
+                action = self.rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+                kind = self.rng.choices(list(self.texts), weights=[w for w, _ in self.texts.values()])[0]
+                text = self.rng.choice(self.texts[kind][1])
+                await self.emit("event", {"id": int(editor[0]), "client_id": client_id, "listener_id": editor[1],
+                                          "args": [json.dumps(text)]})
+                self.done = asyncio.get_running_loop().create_future()
+                t0 = time.perf_counter()
+                await self.emit("event", {"id": int(buttons[action][0]), "client_id": client_id,
+                                          "listener_id": buttons[action][1], "args": []})
+                try:
+                    ok = await asyncio.wait_for(self.done, ACTION_TIMEOUT)
+                except asyncio.TimeoutError:
+                    ok = False
+                if not stop.is_set():  # finished during the measurement window
+                    self.stats["latencies"].setdefault(f"{action}.{kind}", []).append(time.perf_counter() - t0)
+                    if not ok:
+                        self.stats["errors"] += 1
+                await self.emit("ack", {"client_id": client_id, "next_message_id": self.next_message_id})
+                try:
+                    await asyncio.wait_for(stop.wait(), self.rng.expovariate(1 / self.think) if self.think else 0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.sio.disconnect()
+
+# ---------- LOAD STEPS ----------
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+def latency_stats(values):
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 1),
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 1),
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 1),
+        "max_ms": round(1000 * ordered[-1], 1),
+    }
+
+async def run_step(url, clients, duration, ramp, texts, mix, think, seed, server_pid):
+    stats = {"latencies": {}, "page_loads": [], "errors": 0, "connect_errors": 0,
+             "messages_in": 0, "bytes_in": 0, "messages_out": 0, "bytes_out": 0}
+    stop = asyncio.Event()
+    samples = []
+    sampler = asyncio.create_task(sample_server(server_pid, samples, stop)) if server_pid else None
+
+    async def one_client(i):
+        await asyncio.sleep(ramp * i / clients)
+        async with aiohttp.ClientSession(cookie_jar=aiohttp.CookieJar(unsafe=True)) as session:
+            try:
+                await Client(url, texts, mix, think, random.Random(f"{seed}-{i}"), stats).run(session, stop)
+            except Exception as e:
+                print(f"client {i}: {e!r}", file=sys.stderr)
+                stats["connect_errors"] += 1
+
+    tasks = [asyncio.create_task(one_client(i)) for i in range(clients)]
+    await asyncio.sleep(ramp + duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    if sampler is not None:
+        await sampler
+
+    latencies = stats.pop("latencies")
+    actions = {}
+    for name, values in latencies.items():
+        actions.setdefault(name.split(".")[0], []).extend(values)
+    completed = sum(len(values) for values in latencies.values())
+    result = {
+        "clients": clients,
+        "completed": completed,
+        "analyses_per_s": round(completed / (ramp + duration), 2),
+        "errors": stats["errors"],
+        "connect_errors": stats["connect_errors"],
+        "page_load": latency_stats(stats["page_loads"]) if stats["page_loads"] else None,
+        "actions": {action: latency_stats(values) for action, values in sorted(actions.items())},
+        "cases": {name: latency_stats(values) for name, values in sorted(latencies.items())},
+        "websocket": {
+            "messages_in": stats["messages_in"], "messages_out": stats["messages_out"],
+            "kb_in": round(stats["bytes_in"] / 1024), "kb_out": round(stats["bytes_out"] / 1024),
+            "messages_per_analysis": round(stats["messages_in"] / max(completed, 1), 1),
+            "kb_per_analysis": round(stats["bytes_in"] / 1024 / max(completed, 1), 1),
+        },
+    }
+    if len(samples) > 1:
+        (t_first, cpu_first, _), (t_last, cpu_last, _) = samples[0], samples[-1]
+        result["server"] = {
+            "cpu_percent": round(100 * (cpu_last - cpu_first) / (t_last - t_first), 1),
+            "rss_mb_peak": round(max(rss for _, _, rss in samples) / 2**20, 1),
+            "rss_mb_end": round(samples[-1][2] / 2**20, 1),
+        }
+    return result
+
+def print_step(result):
+    line = f"{result['clients']:4d} clients  {result['analyses_per_s']:6.2f} analyses/s"
+    for action, stats in result["actions"].items():
+        line += f"  {action} p50 {stats['p50_ms']:7.1f} p95 {stats['p95_ms']:7.1f} ms"
+    line += f"  {result['websocket']['kb_per_analysis']:6.1f} KB/analysis"
+    if "server" in result:
+        line += f"  cpu {result['server']['cpu_percent']:5.1f}%  rss {result['server']['rss_mb_peak']:6.1f} MB"
+    if result["errors"] or result["connect_errors"]:
+        line += f"  errors {result['errors']}+{result['connect_errors']}"
+    print(line, flush=True)
+
+def weights(spec):
+    """"quick:3,deep:1" -> {"quick": 3.0, "deep": 1.0}"""
+    return {name: float(weight or 1) for name, _, weight in (part.partition(":") for part in spec.split(","))}
+
+async def run(args):
+    server = None
+    url = args.url.rstrip("/") if args.url else None
+    if url is None:
+        url = f"http://127.0.0.1:{free_port()}"
+        server = start_server(url.rsplit(":", 1)[1], args.workers)
+    try:
+        await wait_ready(url, server)
+        texts = {kind: (w, corpus.generate(kind, TEXTS_PER_KIND, args.seed)) for kind, w in weights(args.texts).items()}
+        mix = weights(args.mix)
+        unknown = set(mix) - set(BUTTONS)
+        if unknown:
+            raise SystemExit(f"unknown actions in --mix: {sorted(unknown)}; use {sorted(BUTTONS)}")
+        results = []
+        for clients in (int(n) for n in args.clients.split(",")):
+            results.append(await run_step(url, clients, args.duration, args.ramp, texts, mix, args.think,
+                                          args.seed, server.pid if server else None))
+            print_step(results[-1])
+        return results
+    finally:
+        if server is not None:
+            server.terminate()
+            try:
+                server.wait(10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-client load test of the NiceGUI app")
+    parser.add_argument("--clients", default=DEFAULT_CLIENTS, help=f"concurrent clients per step (default: {DEFAULT_CLIENTS})")
+    parser.add_argument("--duration", type=float, default=30, help="seconds measured per step, after the ramp-up (default: 30)")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which the clients of a step connect (default: 5)")
+    parser.add_argument("--think", type=float, default=1.0, help="mean seconds between a client's analyses (default: 1)")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"weighted analysis types (default: {DEFAULT_MIX})")
+    parser.add_argument("--texts", default=DEFAULT_TEXTS, help=f"weighted corpus kinds (default: {DEFAULT_TEXTS})")
+    parser.add_argument("--seed", type=int, default=corpus.DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, help="start the multi-process server with this many app processes")
+    parser.add_argument("--url", help="test this running server instead of starting main.py")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "cpus": os.cpu_count(), "steps": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
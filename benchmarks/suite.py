@@ -0,0 +1,228 @@
+# benchmarks/suite.py
+# Latency percentiles, throughput and peak memory of the analyzer and of the UI render paths,
+# on a seeded synthetic corpus, compared against a stored baseline
+#
+# Usage:
+#   python benchmarks/suite.py                        run, compare with benchmarks/baseline.json
+#   python benchmarks/suite.py --save-baseline        run and store the results as the new baseline
+#   python benchmarks/suite.py --output run.json --scale 0.2 --no-ui --cases 'deep_*'
+# Exits 1 when a case is slower or uses more memory than the baseline beyond the tolerance, and 2
+# without comparing when the baseline comes from a different environment (--ignore-environment to force).
+# Baselines are machine-specific: store one per machine (or CI runner) and compare runs there;
+# benchmarks/baseline.json is not committed.
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import corpus  # noqa: E402
+
+# ---------- CONFIG ----------
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_TOLERANCE = 0.5   # allowed slowdown / memory growth over the baseline; shared VMs jitter by 30%+
+NOISE_FLOOR_MS = 0.2      # latency differences below this are never regressions
+NOISE_FLOOR_KB = 64       # nor are peak-memory differences below this
+REPEATS = 3               # each text's latency is its fastest of this many runs, to filter out scheduler noise
+ANALYZER_CASES = [        # (case name, function name, corpus kind, texts)
+    ("analyze_text_blob.tweet", "analyze_text_blob", "tweet", 300),
+    ("analyze_text_blob.review", "analyze_text_blob", "review", 200),
+    ("analyze_text_blob.social", "analyze_text_blob", "social", 200),
+    ("analyze_text_blob.report", "analyze_text_blob", "report", 20),
+    ("deep_analyze_text.tweet", "deep_analyze_text", "tweet", 200),
+    ("deep_analyze_text.review", "deep_analyze_text", "review", 100),
+    ("deep_analyze_text.social", "deep_analyze_text", "social", 100),
+    ("deep_analyze_text.report", "deep_analyze_text", "report", 20),
+]
+UI_CASES = [              # (case name, button, corpus kind, texts, buttons clicked once first); results come from the cache
+    ("ui.quick_result.review", "🔍 Quick Analyze", "review", 40, ()),
+    ("ui.deep_result.review", "🧠 Deep Analyze", "review", 30, ()),
+    ("ui.deep_result.report", "🧠 Deep Analyze", "report", 10, ()),
+    # Short results, so mostly the history panel: a row in the compact list and one in the open full view
+    ("ui.history_update.tweet", "🔍 Quick Analyze", "tweet", 100, ("📜",)),
+]
+METRICS = ("p50_ms", "p95_ms", "peak_kb")  # compared against the baseline
+ENVIRONMENT = ("python", "cpus", "nltk_data_complete", "key_phrases_mode")  # must match the baseline's
+
+# ---------- MEASUREMENT ----------
+def percentile(sorted_values, p):
+    return sorted_values[max(0, math.ceil(p * len(sorted_values)) - 1)]
+
+def summarize(latencies, texts, peak_bytes):
+    total = sum(latencies)
+    ordered = sorted(latencies)
+    words = sum(len(text.split()) for text in texts)
+    return {
+        "n": len(latencies),
+        "mean_ms": round(1000 * total / len(latencies), 3),
+        "p50_ms": round(1000 * percentile(ordered, 0.50), 3),
+        "p95_ms": round(1000 * percentile(ordered, 0.95), 3),
+        "p99_ms": round(1000 * percentile(ordered, 0.99), 3),
+        "max_ms": round(1000 * ordered[-1], 3),
+        "docs_per_s": round(len(latencies) / total, 1),
+        "words_per_s": round(words / total),
+        "peak_kb": round(peak_bytes / 1024),
+    }
+
+def run_analyzer_case(fn, texts):
+    """Latency passes, then a separate tracemalloc pass for peak memory (tracing slows calls down)"""
+    fn(texts[0])  # first-call costs (lazy imports, lexicon) belong to startup, not to the case
+    latencies = [math.inf] * len(texts)
+    for _ in range(REPEATS):
+        for i, text in enumerate(texts):
+            t0 = time.perf_counter()
+            fn(text)
+            latencies[i] = min(latencies[i], time.perf_counter() - t0)
+    tracemalloc.start()
+    for text in texts:
+        fn(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(latencies, texts, peak)
+
+async def run_ui_cases(cases, seed, scale):
+    """Click the analyze buttons of a simulated page and time each handler until its render is done.
+    Every text is analyzed once beforehand, so the timings cover the render path, not the analysis."""
+    from nicegui import background_tasks, ui
+    from nicegui.testing.user_simulation import user_simulation
+
+    async def click(user, button):
+        before = set(background_tasks.running_tasks)
+        user.find(button).click()
+        handlers = set(background_tasks.running_tasks) - before
+        if handlers:
+            await asyncio.wait(handlers)
+
+    results = {}
+    sys.argv[0] = os.path.join(ROOT, "main.py")
+    async with user_simulation(main_file=sys.argv[0]) as user:
+        await user.open("/")
+        editor = user.find(ui.textarea).elements.pop()
+        for name, button, kind, n, setup in cases:
+            for setup_button in setup:
+                await click(user, setup_button)
+            texts = corpus.generate(kind, max(1, round(n * scale)), seed)
+            for text in texts:
+                editor.value = text
+                await click(user, button)
+            latencies = [math.inf] * len(texts)
+            for _ in range(REPEATS):
+                for i, text in enumerate(texts):
+                    editor.value = text
+                    t0 = time.perf_counter()
+                    await click(user, button)
+                    latencies[i] = min(latencies[i], time.perf_counter() - t0)
+            tracemalloc.start()
+            for text in texts:
+                editor.value = text
+                await click(user, button)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results[name] = summarize(latencies, texts, peak)
+            print_case(name, results[name])
+    return results
+
+# ---------- REPORTING ----------
+def environment():
+    import key_phrases
+    import startup
+    startup.configure_nltk()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "nltk_data_complete": not startup.missing_corpora(),
+        "key_phrases_mode": key_phrases.MODE,
+    }
+
+def environment_differences(baseline, results):
+    """The ENVIRONMENT settings in which the run differs from the baseline; timings of different
+    setups (no tagger model, fewer CPUs, another key-phrase mode) say nothing about regressions"""
+    before, now = baseline["environment"], results["environment"]
+    return [f"{key}: {before.get(key)} in the baseline, {now.get(key)} now" for key in ENVIRONMENT if before.get(key) != now.get(key)]
+
+def print_case(name, stats):
+    print(f"{name:<28} p50 {stats['p50_ms']:9.3f} ms  p95 {stats['p95_ms']:9.3f} ms  p99 {stats['p99_ms']:9.3f} ms  "
+          f"{stats['docs_per_s']:8.1f} docs/s  {stats['words_per_s']:8d} words/s  peak {stats['peak_kb']:7d} KB")
+
+def compare(results, baseline, tolerance):
+    """Regression messages for cases worse than the baseline by more than tolerance"""
+    regressions = []
+    for name, stats in results["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        for metric in METRICS:
+            floor = NOISE_FLOOR_KB if metric == "peak_kb" else NOISE_FLOOR_MS
+            if stats[metric] > before[metric] * (1 + tolerance) and stats[metric] - before[metric] > floor:
+                regressions.append(f"{name}: {metric} {before[metric]} -> {stats[metric]} "
+                                   f"(+{100 * (stats[metric] / max(before[metric], 1e-9) - 1):.0f}%)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyzer and UI benchmark suite")
+    parser.add_argument("--cases", default="*", help="glob of case names to run (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the number of texts per case")
+    parser.add_argument("--seed", type=int, default=corpus.DEFAULT_SEED)
+    parser.add_argument("--no-ui", action="store_true", help="skip the UI render cases (no NiceGUI needed)")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline to compare with (default: benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative regression (default: 0.5)")
+    parser.add_argument("--ignore-environment", action="store_true",
+                        help="compare with (or save) a baseline whatever the environment")
+    args = parser.parse_args()
+
+    import analyzer
+    results = {"created": datetime.now().isoformat(timespec="seconds"), "seed": args.seed, "scale": args.scale,
+               "environment": environment(), "cases": {}}
+    if args.save_baseline and not results["environment"]["nltk_data_complete"] and not args.ignore_environment:
+        sys.exit("refusing to save a baseline without the NLTK data the analyzer uses; run python startup.py download")
+    analyzer.warm_up()
+    for name, fn_name, kind, n in ANALYZER_CASES:
+        if fnmatch.fnmatch(name, args.cases):
+            texts = corpus.generate(kind, max(1, round(n * args.scale)), args.seed)
+            results["cases"][name] = run_analyzer_case(getattr(analyzer, fn_name), texts)
+            print_case(name, results["cases"][name])
+    ui_cases = [case for case in UI_CASES if fnmatch.fnmatch(case[0], args.cases)]
+    if ui_cases and not args.no_ui:
+        results["cases"].update(asyncio.run(run_ui_cases(ui_cases, args.seed, args.scale)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    differences = environment_differences(baseline, results)
+    for line in differences:
+        print(f"ENVIRONMENT {line}")
+    if differences and not args.ignore_environment:
+        print(f"not comparing with {args.baseline} from another environment; "
+              f"save a baseline here with --save-baseline (or pass --ignore-environment)")
+        sys.exit(2)
+    regressions = compare(results, baseline, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
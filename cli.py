@@ -0,0 +1,179 @@
+# cli.py
+# Command-line batch mode: run the analyzer over files or stdin without the NiceGUI server
+#
+# Usage:
+#   python main.py analyze [FILE ...] [--deep] [--workers N] [-o OUT]   (or: python cli.py ...)
+#   Input is CSV, JSONL or one text per line; output is one JSON line per record, in input order.
+#   With --stream each input is one document, deep-analyzed in constant memory whatever its size.
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import analyzer
+
+# ---------- CONFIG ----------
+DEFAULT_CHUNK = 64        # records per worker job
+IN_FLIGHT_PER_WORKER = 2  # jobs queued per worker before reading more input
+
+# ---------- INPUT ----------
+def detect_format(path, fmt):
+    if fmt != "auto":
+        return fmt
+    ext = os.path.splitext(path)[1].lower()
+    return {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}.get(ext, "text")
+
+def read_records(path, fmt, text_field, id_field):
+    """(id, text, error) per record of one input, read lazily; '-' is stdin. A JSONL line that
+    isn't JSON or has no text string is an error for that record, as in /api/bulk."""
+    f = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+    try:
+        fmt = detect_format(path, fmt)
+        if fmt == "csv":
+            for row in csv.DictReader(f):
+                yield row.get(id_field), row.get(text_field) or "", None
+        elif fmt == "jsonl":
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    yield None, None, "Invalid JSON"
+                    continue
+                if isinstance(record, str):
+                    yield None, record, None
+                elif isinstance(record, dict) and isinstance(record.get(text_field), str):
+                    yield record.get(id_field), record[text_field], None
+                else:
+                    yield record.get(id_field) if isinstance(record, dict) else None, None, f"No '{text_field}' string"
+        else:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    yield number, line.rstrip("\r\n"), None
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+def chunked(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ---------- RUN ----------
+def word_count(result):
+    return result["basic"]["word_count"] if "basic" in result else result["word_count"]
+
+def analyze_chunk(deep, chunk):
+    """Worker job: results for one chunk of (id, text, error) records, None for errors and empty texts"""
+    batch_fn = analyzer.deep_analyze_batch if deep else analyzer.analyze_batch
+    texts = [text for _, text, error in chunk if error is None and text.strip()]
+    results = iter(batch_fn(texts) if texts else ())
+    return [next(results) if error is None and text.strip() else None for _, text, error in chunk]
+
+def run(args, out):
+    records = (record for path in args.inputs for record in read_records(path, args.format, args.text_field, args.id_field))
+    fields = [f for f in args.fields.split(",") if f] if args.fields else None
+    docs = words = 0
+    index = 0
+
+    def write(chunk, results):
+        nonlocal docs, words, index
+        for (record_id, text, error), result in zip(chunk, results):
+            line = {"index": index}
+            if record_id is not None:
+                line["id"] = record_id
+            if result is None:
+                line["error"] = error or "Empty text"
+            else:
+                line["result"] = {f: result[f] for f in fields if f in result} if fields else result
+                docs += 1
+                words += word_count(result)
+            out.write(json.dumps(line, ensure_ascii=False) + "\n")
+            index += 1
+
+    started = time.perf_counter()
+    if args.workers <= 1:
+        analyzer.warm_up()
+        for chunk in chunked(records, args.chunk_size):
+            write(chunk, analyze_chunk(args.deep, chunk))
+    else:
+        import worker_pool
+        with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=worker_pool.init_worker) as pool:
+            # Bounded queue of chunk jobs, written out in input order as the head finishes
+            in_flight = deque()
+            for chunk in chunked(records, args.chunk_size):
+                in_flight.append((chunk, pool.submit(analyze_chunk, args.deep, chunk)))
+                while in_flight and (len(in_flight) >= args.workers * IN_FLIGHT_PER_WORKER or in_flight[0][1].done()):
+                    chunk, future = in_flight.popleft()
+                    write(chunk, future.result())
+            while in_flight:
+                chunk, future = in_flight.popleft()
+                write(chunk, future.result())
+    out.flush()
+    return docs, words, time.perf_counter() - started
+
+def run_stream(args, out):
+    """Deep-analyze each input as a single document, read and analyzed chunk by chunk"""
+    import streaming
+    top_sentences = streaming.TOP_SENTENCES if args.top_sentences is None else args.top_sentences
+    fields = [f for f in args.fields.split(",") if f] if args.fields else None
+    docs = words = 0
+    analyzer.warm_up()
+    started = time.perf_counter()
+    for index, path in enumerate(args.inputs):
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8", errors="replace")
+        try:
+            result = streaming.deep_analyze_stream(streaming.read_chunks(source), top_sentences=top_sentences)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+        line = {"index": index, "id": path, "result": {f: result[f] for f in fields if f in result} if fields else result}
+        out.write(json.dumps(line, ensure_ascii=False) + "\n")
+        out.flush()
+        docs += 1
+        words += word_count(result)
+    return docs, words, time.perf_counter() - started
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python main.py analyze", description="Analyze texts from files or stdin")
+    parser.add_argument("inputs", nargs="*", default=["-"], help="CSV, JSONL or plain-text files ('-' for stdin, the default)")
+    parser.add_argument("--format", choices=("auto", "csv", "jsonl", "text"), default="auto", help="input format (default: by file extension, plain text otherwise)")
+    parser.add_argument("--deep", action="store_true", help="run the deep analysis")
+    parser.add_argument("--stream", action="store_true", help="deep-analyze each input as one document in constant memory (for very large files)")
+    parser.add_argument("--top-sentences", type=int, help="with --stream, most polarized sentences kept per document (default: STREAM_TOP_SENTENCES or 50)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes; 1 analyzes in this process (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK, help=f"records per worker job (default: {DEFAULT_CHUNK})")
+    parser.add_argument("--text-field", default="text", help="CSV column or JSON key holding the text (default: text)")
+    parser.add_argument("--id-field", default="id", help="CSV column or JSON key echoed as the record id (default: id)")
+    parser.add_argument("--fields", default="", help="comma-separated result keys to keep (default: all)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    import startup
+    startup.configure_nltk()
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        docs, words, elapsed = (run_stream if args.stream else run)(args, out)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = max(elapsed, 1e-9)
+    print(f"{docs} docs, {words} words in {elapsed:.2f}s: {docs / elapsed:.1f} docs/s, {words / elapsed:.0f} words/s",
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
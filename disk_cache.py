@@ -0,0 +1,175 @@
+# disk_cache.py
+# Optional SQLite-backed store behind the in-process result cache, so computed
+# results survive restarts and redeploys
+#
+# Environment:
+#   ANALYSIS_CACHE_DB        path of the SQLite file; the disk cache is disabled when unset
+#   ANALYSIS_CACHE_DB_BYTES  size budget before compaction (default: 256 MB)
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# ---------- CONFIG ----------
+DB_PATH = os.environ.get("ANALYSIS_CACHE_DB", "")
+MAX_BYTES = int(os.environ.get("ANALYSIS_CACHE_DB_BYTES", str(256 * 1024 * 1024)))
+BATCH_SIZE = 256        # writes per transaction
+FLUSH_INTERVAL = 0.5    # seconds a write may wait for more writes to batch with
+COMPACT_TARGET = 0.8    # compaction shrinks the store to this fraction of MAX_BYTES
+LOOKUP_BATCH = 500      # digests per lookup, under SQLite's limit on query parameters
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    kind TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    version TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (kind, digest, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS usage (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO usage VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM results));
+"""
+
+# ---------- STORE ----------
+class DiskCache:
+    """Results in one SQLite file, which several processes (see server.py) may share. The size
+    of the store is kept in the file too, so every process compacts on the same total."""
+
+    def __init__(self, path, version, max_bytes=MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.compactions = 0
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._reader.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._reader.execute("PRAGMA journal_mode=WAL")
+        self._reader.executescript(SCHEMA)
+        self.bytes = self._reader.execute("SELECT bytes FROM usage").fetchone()[0]
+
+        self._writer = threading.Thread(target=self._write_loop, name="disk-cache-writer", daemon=True)
+        self._writer.start()
+
+    def get_many(self, kind: str, digests):
+        """Results for digests, None where there is none"""
+        found = {}
+        with self._lock:
+            for i in range(0, len(digests), LOOKUP_BATCH):
+                batch = digests[i:i + LOOKUP_BATCH]
+                found.update(self._reader.execute(
+                    f"SELECT digest, value FROM results WHERE kind = ? AND version = ? AND digest IN ({','.join('?' * len(batch))})",
+                    (kind, self.version, *batch),
+                ).fetchall())
+        self.hits += len(found)
+        self.misses += len(digests) - len(found)
+        for digest in found:
+            self._queue.put(("touch", kind, digest, None))
+        return [None if digest not in found else json.loads(found[digest]) for digest in digests]
+
+    def put_many(self, kind: str, items):
+        """Queue (digest, result) pairs for the background writer; returns immediately"""
+        for digest, result in items:
+            self._queue.put(("put", kind, digest, json.dumps(result, ensure_ascii=False)))
+
+    def stats(self):
+        return {
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "compactions": self.compactions,
+            "pending": self._queue.qsize(),
+        }
+
+    def close(self):
+        """Flush queued writes and stop the writer thread"""
+        self._queue.put(None)
+        self._writer.join(timeout=10)
+        with self._lock:
+            self._reader.close()
+
+    # ---------- BACKGROUND WRITER ----------
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        self.compact(conn)
+        running = True
+        while running:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.monotonic() + FLUSH_INTERVAL
+            while len(batch) < BATCH_SIZE:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+            self._write_batch(conn, batch)
+            if self.bytes > self.max_bytes:
+                self.compact(conn)
+        conn.close()
+
+    def _write_batch(self, conn, batch):
+        # Spread timestamps by queue position so rows written together still evict in order
+        now = time.time()
+        puts = [(kind, digest, self.version, value, len(value), now + n * 1e-6)
+                for n, (op, kind, digest, value) in enumerate(batch) if op == "put"]
+        touches = [(now + n * 1e-6, kind, digest, self.version)
+                   for n, (op, kind, digest, value) in enumerate(batch) if op == "touch"]
+        conn.execute("BEGIN IMMEDIATE")
+        added = 0
+        for row in puts:
+            # A result written again (here or by another process) replaces its row
+            old = conn.execute("SELECT size FROM results WHERE kind = ? AND digest = ? AND version = ?", row[:3]).fetchone()
+            conn.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)", row)
+            added += row[4] - (old[0] if old else 0)
+        conn.executemany("UPDATE results SET accessed = ? WHERE kind = ? AND digest = ? AND version = ?", touches)
+        conn.execute("UPDATE usage SET bytes = bytes + ?", (added,))
+        self.bytes = conn.execute("SELECT bytes FROM usage").fetchone()[0]
+        conn.execute("COMMIT")
+        self.writes += len(puts)
+
+    def compact(self, conn):
+        """Drop results of other analyzer versions, then least recently used rows until under budget.
+        Runs as one write transaction, so processes sharing the file compact one at a time, and a
+        process that finds the store already compacted by another leaves it alone."""
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM results WHERE version != ?", (self.version,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total > self.max_bytes:
+            target = int(self.max_bytes * COMPACT_TARGET)
+            doomed = []
+            for kind, digest, size in conn.execute("SELECT kind, digest, size FROM results ORDER BY accessed").fetchall():
+                if total <= target:
+                    break
+                doomed.append((kind, digest, self.version))
+                total -= size
+            conn.executemany("DELETE FROM results WHERE kind = ? AND digest = ? AND version = ?", doomed)
+            self.compactions += 1
+        conn.execute("UPDATE usage SET bytes = ?", (total,))
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA incremental_vacuum")
+        self.bytes = total
+
+def open_from_env(version):
+    """Return a DiskCache for ANALYSIS_CACHE_DB, or None when the disk cache is disabled"""
+    if not DB_PATH:
+        return None
+    return DiskCache(DB_PATH, version)
@@ -0,0 +1,195 @@
+# history.py
+# Per-browser-session analysis history kept in fixed-size ring buffers
+#
+# Environment:
+#   HISTORY_PER_SESSION  records kept per browser session (default: 50)
+#   HISTORY_MAX_BYTES    approximate memory cap across all sessions (default: 8 MB)
+#   HISTORY_TTL          seconds an idle session's history is kept in a shared STATE_BACKEND (default: 30 days)
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+import metrics
+import state
+
+# ---------- CONFIG ----------
+PER_SESSION = int(os.environ.get("HISTORY_PER_SESSION", "50"))
+MAX_BYTES = int(os.environ.get("HISTORY_MAX_BYTES", str(8 * 1024 * 1024)))
+SESSION_TTL = int(os.environ.get("HISTORY_TTL", str(30 * 24 * 3600)))
+PREVIEW_CHARS = 60
+
+# ---------- RECORDS ----------
+class HistoryRecord:
+    """One analysis in the history: a short preview and a hash instead of the full text"""
+    __slots__ = ("timestamp", "preview", "digest", "sentiment", "polarity", "subjectivity", "kind")
+
+    def __init__(self, text, sentiment, polarity, subjectivity, kind="quick", timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.preview = text[:PREVIEW_CHARS] + ('...' if len(text) > PREVIEW_CHARS else '')
+        self.digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self.sentiment = sentiment
+        self.polarity = polarity
+        self.subjectivity = subjectivity
+        self.kind = kind
+
+    @classmethod
+    def from_dict(cls, data):
+        record = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(record, name, data[name])
+        return record
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @property
+    def time_label(self):
+        return datetime.fromtimestamp(self.timestamp).strftime("%H:%M:%S")
+
+    def approx_size(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.preview) + sys.getsizeof(self.digest)
+
+class SessionHistory:
+    """Ring buffer of the most recent records of one browser session"""
+
+    def __init__(self, capacity=PER_SESSION):
+        self.records = deque(maxlen=capacity)
+        self.bytes = sys.getsizeof(self.records)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def recent(self, n):
+        """Newest first"""
+        return [self.records[-i] for i in range(1, min(n, len(self.records)) + 1)]
+
+    def append(self, record):
+        """Add a record; returns the record pushed out of the buffer, if any"""
+        evicted = self.records[0] if len(self.records) == self.records.maxlen else None
+        self.records.append(record)
+        self.bytes += record.approx_size() - (evicted.approx_size() if evicted else 0)
+        return evicted
+
+    def clear(self):
+        self.records.clear()
+        self.bytes = sys.getsizeof(self.records)
+
+# ---------- REGISTRY ----------
+class HistoryRegistry:
+    """All session histories of this process, with idle sessions dropped to stay under MAX_BYTES"""
+
+    def __init__(self, per_session=PER_SESSION, max_bytes=MAX_BYTES):
+        self.per_session = per_session
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._sessions = OrderedDict()  # session id -> SessionHistory, least recently used first
+        self._lock = threading.Lock()
+
+    def session(self, session_id):
+        return self._open(session_id)
+
+    def _open(self, session_id):
+        """This process's copy of the session's history"""
+        with self._lock:
+            history = self._sessions.get(session_id)
+            if history is None:
+                history = self._sessions[session_id] = SessionHistory(self.per_session)
+                self.bytes += history.bytes
+                self._trim(history)
+            self._sessions.move_to_end(session_id)
+            return history
+
+    def append(self, session_id, record):
+        history = self._open(session_id)
+        with self._lock:
+            before = history.bytes
+            evicted = history.append(record)
+            self.bytes += history.bytes - before
+            self._trim(history)
+        return evicted
+
+    def clear(self, session_id):
+        history = self._open(session_id)
+        with self._lock:
+            before = history.bytes
+            history.clear()
+            self.bytes += history.bytes - before
+
+    def _trim(self, keep):
+        # Over budget: forget the least recently active sessions (never the current one)
+        while self.bytes > self.max_bytes and len(self._sessions) > 1:
+            idle_id, idle = next(iter(self._sessions.items()))
+            if idle is keep:
+                break
+            del self._sessions[idle_id]
+            self.bytes -= idle.bytes
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "records": sum(len(h) for h in self._sessions.values()),
+                "bytes": self.bytes,
+            }
+
+class SharedHistoryRegistry(HistoryRegistry):
+    """Session histories kept in the shared state store, so whichever app process serves a browser
+    sees its history. session() reloads the history from the store; append() and clear() update
+    this process's copy and the store without reading it back. Every call does blocking store I/O,
+    so the UI runs them in a thread. While the store is unreachable, this process's copies keep
+    working and failed requests are counted in errors."""
+
+    def __init__(self, store, per_session=PER_SESSION, max_bytes=MAX_BYTES, ttl=SESSION_TTL):
+        super().__init__(per_session, max_bytes)
+        self.store = store
+        self.ttl = ttl
+        self.errors = 0
+
+    def session(self, session_id):
+        history = self._open(session_id)
+        try:
+            stored = self.store.items(f"history:{session_id}", self.per_session)
+        except state.StateError:
+            self.errors += 1
+            return history
+        with self._lock:
+            before = history.bytes
+            history.clear()
+            for value in reversed(stored):
+                history.append(HistoryRecord.from_dict(json.loads(value)))
+            self.bytes += history.bytes - before
+        return history
+
+    def append(self, session_id, record):
+        evicted = super().append(session_id, record)
+        try:
+            self.store.push(f"history:{session_id}", json.dumps(record.to_dict()), self.per_session, self.ttl)
+        except state.StateError:
+            self.errors += 1
+        return evicted
+
+    def clear(self, session_id):
+        super().clear(session_id)
+        try:
+            self.store.delete(f"history:{session_id}")
+        except state.StateError:
+            self.errors += 1
+
+# Shared by every client of this process (and, with a shared STATE_BACKEND, with the other app processes)
+histories = SharedHistoryRegistry(state.store) if state.store.shared else HistoryRegistry()
+
+metrics.gauge("analyzer_history_sessions", "Browser sessions with history in memory", lambda: histories.stats()["sessions"])
+metrics.gauge("analyzer_history_records", "History records kept across all sessions", lambda: histories.stats()["records"])
+metrics.gauge("analyzer_history_bytes", "Approximate memory used by the history", lambda: histories.bytes)
+if state.store.shared:
+    metrics.gauge("analyzer_history_store_errors_total", "History requests the shared state store failed",
+                  lambda: histories.errors, type="counter")
@@ -0,0 +1,193 @@
+# history_log.py
+# Append-only analysis log: JSONL segments with batched fsync and size-based rotation
+#
+# Several server processes can share one directory: each writes only segments tagged with its own
+# pid, so lines never interleave, and readers merge the segments by timestamp. Lines that don't
+# parse (a process killed mid-write) are skipped and counted.
+#
+# Environment:
+#   HISTORY_LOG_DIR            directory for the log segments; logging is disabled when unset
+#   HISTORY_LOG_SEGMENT_BYTES  rotate to a new segment past this size (default: 4 MB)
+#   HISTORY_LOG_SEGMENTS       least recently written segments beyond this count are deleted (default: 64)
+
+import hashlib
+import heapq
+import json
+import os
+import threading
+from datetime import datetime
+
+import metrics
+
+# ---------- CONFIG ----------
+LOG_DIR = os.environ.get("HISTORY_LOG_DIR", "")
+SEGMENT_BYTES = int(os.environ.get("HISTORY_LOG_SEGMENT_BYTES", str(4 * 1024 * 1024)))
+MAX_SEGMENTS = int(os.environ.get("HISTORY_LOG_SEGMENTS", "64"))
+FSYNC_EVERY = 64        # appends between forced fsyncs
+FSYNC_INTERVAL = 1.0    # seconds before pending appends are fsynced anyway
+MTIME_SLACK = 1.0       # file modification times come from a coarse clock and can trail record timestamps
+
+SEGMENT_PREFIX = "history-"
+SEGMENT_SUFFIX = ".jsonl"
+
+# ---------- LOG ----------
+def session_key(session_id):
+    """What a browser session's records carry as "session": a hash, so the log holds no browser ids"""
+    return hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:16]
+
+def _segment_start(name):
+    """Segments are named after the time of their first record, in microseconds, and the writer's pid"""
+    return int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split("-")[0]) / 1e6
+
+def _timestamp(record):
+    return datetime.fromisoformat(record["timestamp"]).timestamp()
+
+class HistoryLog:
+    def __init__(self, directory, segment_bytes=SEGMENT_BYTES, max_segments=MAX_SEGMENTS):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.appends = 0
+        self.skipped_lines = 0  # lines readers found unparseable
+        self._pending = 0
+        self._file = None       # this process's segment, opened on the first append
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self._closed = threading.Event()
+        self._syncer = threading.Thread(target=self._sync_loop, name="history-log-sync", daemon=True)
+        self._syncer.start()
+
+    def segments(self):
+        """Segment file names of all processes, by the time of their first record"""
+        return sorted(name for name in os.listdir(self.directory)
+                      if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+
+    def append(self, record):
+        """Append one record (a JSON-serializable dict with an ISO "timestamp"); O(1) per call"""
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            # Another process may have deleted this segment as the least recently written one
+            if self._file is None or self._file.tell() >= self.segment_bytes or os.fstat(self._file.fileno()).st_nlink == 0:
+                self._rotate(_timestamp(record))
+            self._file.write(line)
+            self.appends += 1
+            self._pending += 1
+            if self._pending >= FSYNC_EVERY:
+                self._sync()
+
+    def iter_records(self, since=None, until=None):
+        """Yield records with since <= timestamp < until (datetimes), oldest first.
+        Only the segments that can overlap the range are opened."""
+        self.flush()
+        since = since.timestamp() if since is not None else None
+        until = until.timestamp() if until is not None else None
+        segments = []
+        for name, end in self._segment_ends():
+            if until is not None and _segment_start(name) >= until or since is not None and end < since:
+                continue
+            segments.append((ts, record) for ts, record in self._read(name) if since is None or ts >= since)
+        for ts, record in heapq.merge(*segments, key=lambda entry: entry[0]):
+            if until is not None and ts >= until:
+                return
+            yield record
+
+    def page(self, before=None, limit=50, session=None):
+        """Up to limit records older than before (a datetime), newest first. With a session key,
+        only that session's records, back to the last time it cleared its history."""
+        self.flush()
+        before = before.timestamp() if before is not None else None
+        segments = [(name, end) for name, end in self._segment_ends()
+                    if before is None or _segment_start(name) < before]
+        segments.reverse()
+        # later[i]: the newest any record of segments[i:] can be, as segments of different processes overlap
+        later = [0.0] * (len(segments) + 1)
+        for i in reversed(range(len(segments))):
+            later[i] = max(later[i + 1], segments[i][1])
+        found = []  # (timestamp, record), newest first, ending at a cleared marker or at limit records
+        for i, (name, _) in enumerate(segments):
+            found.extend((ts, record) for ts, record in self._read(name, session)
+                         if (session is None or record.get("session") == session) and (before is None or ts < before))
+            found.sort(key=lambda entry: entry[0], reverse=True)
+            cleared = next((k for k, (_, record) in enumerate(found) if record.get("type") == "cleared"), None)
+            del found[limit if cleared is None or cleared >= limit else cleared + 1:]
+            if (len(found) >= limit or cleared is not None) and found[-1][0] > later[i + 1]:
+                break
+        return [record for _, record in found if record.get("type") != "cleared"]
+
+    def flush(self):
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        self._closed.set()
+        self._syncer.join(timeout=5)
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ---------- INTERNALS ----------
+    def _segment_ends(self):
+        """(name, latest time of a record in it) of each segment, by the time of their first record"""
+        ends = []
+        for name in self.segments():
+            try:
+                ends.append((name, os.stat(os.path.join(self.directory, name)).st_mtime + MTIME_SLACK))
+            except FileNotFoundError:
+                continue  # deleted by a writer since the listing
+        return ends
+
+    def _read(self, name, session=None):
+        """Yield (timestamp, record) for each parseable line of a segment, in file order"""
+        try:
+            f = open(os.path.join(self.directory, name), encoding="utf-8")
+        except FileNotFoundError:
+            return  # deleted by a writer since the listing
+        with f:
+            for line in f:
+                if not line.strip() or session is not None and session not in line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    yield _timestamp(record), record
+                except (ValueError, TypeError, KeyError):
+                    self.skipped_lines += 1
+
+    # ---------- INTERNALS (call with the lock held) ----------
+    def _rotate(self, start):
+        if self._file is not None:
+            self._sync()
+            self._file.close()
+        name = f"{SEGMENT_PREFIX}{int(start * 1e6):020d}-{os.getpid()}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "a", encoding="utf-8")
+        ends = self._segment_ends()
+        ends.sort(key=lambda entry: entry[1])
+        for old, _ in ends[:-self.max_segments]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except FileNotFoundError:
+                pass  # another process got there first
+
+    def _sync(self):
+        if self._file is not None and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def _sync_loop(self):
+        while not self._closed.wait(FSYNC_INTERVAL):
+            with self._lock:
+                self._sync()
+
+def open_from_env():
+    """Return a HistoryLog for HISTORY_LOG_DIR, or None when logging is disabled"""
+    if not LOG_DIR:
+        return None
+    return HistoryLog(LOG_DIR)
+
+log = open_from_env()
+if log is not None:
+    metrics.gauge("analyzer_history_log_skipped_lines_total", "History log lines that could not be parsed",
+                  lambda: log.skipped_lines, type="counter")
@@ -0,0 +1,119 @@
+# key_phrases.py
+# Key-phrase extraction: nouns and adjectives from a memoized POS tagger, or a lightweight
+# stopword/frequency ranking when tagging would blow the latency budget
+#
+# Environment:
+#   KEY_PHRASES_MODE       "tagger" (default, same output as nltk.pos_tag), "light", or "auto"
+#   KEY_PHRASES_BUDGET_MS  in auto mode, texts expected to take longer than this to tag use the light mode (default: 50)
+#
+# A text analyzed in batches gets the same key phrases as in one piece: choose_mode() is asked
+# about the whole text, tagged phrases are kept in text order and the light ranking is done once
+# over the merged word counts (see analyzer.merge_partials).
+#   KEY_PHRASES_MEMO_SIZE  tagging decisions memoized per process (default: 100000)
+
+import os
+import time
+
+# ---------- CONFIG ----------
+MODE = os.environ.get("KEY_PHRASES_MODE", "tagger")
+BUDGET = float(os.environ.get("KEY_PHRASES_BUDGET_MS", "50")) / 1000
+MEMO_SIZE = int(os.environ.get("KEY_PHRASES_MEMO_SIZE", "100000"))
+KEY_TAGS = ("NN", "JJ")
+
+STOPWORDS = frozenset("""
+a about above after again against ain all am an and any are aren't as at be because been before being
+below between both but by can couldn't did didn't do does doesn't doing don't down during each few for
+from further had hadn't has hasn't have haven't having he her here hers herself him himself his how i if
+in into is isn't it it's its itself just let's me more most mustn't my myself no nor not now of off on
+once only or other our ours ourselves out over own same shan't she she's should shouldn't so some such
+than that that's the their theirs them themselves then there these they this those through to too under
+until up very was wasn't we were weren't what when where which while who whom why will with won't would
+wouldn't you you'd you'll you're you've your yours yourself yourselves also really just get got still
+""".split())
+
+# ---------- STATE ----------
+_tagger = []            # the process's PerceptronTagger, loaded on first use
+_memo = {}              # (word, prev tag, prev2 tag, 5-word normalized window) -> tag
+_seconds_per_char = []  # running estimate of tagging cost per character of text, for the auto mode
+stats = {"tokens": 0, "memo_hits": 0, "tagged_texts": 0, "light_texts": 0}
+
+# ---------- TAGGING ----------
+def get_tagger():
+    if not _tagger:
+        from nltk.tag.perceptron import PerceptronTagger
+        _tagger.append(PerceptronTagger())
+    return _tagger[0]
+
+def tag_sents(sentences):
+    """Tags for each token of each sentence, exactly as nltk.pos_tag_sents would tag them.
+    The perceptron's features only depend on the word, the two previous tags and the
+    normalized words two either side, so a decision made once is reused for that same key."""
+    tagger = get_tagger()
+    tagdict, predict, features = tagger.tagdict, tagger.model.predict, tagger._get_features
+    tagged = []
+    for tokens in sentences:
+        prev, prev2 = tagger.START
+        context = tagger.START + [tagger.normalize(w) for w in tokens] + tagger.END
+        tags = []
+        for i, word in enumerate(tokens):
+            tag = tagdict.get(word)
+            if not tag:
+                key = (word, prev, prev2, *context[i:i + 5])
+                tag = _memo.get(key)
+                if tag is None:
+                    tag = predict(features(i, word, context, prev, prev2))[0]
+                    if len(_memo) >= MEMO_SIZE:
+                        _memo.clear()
+                    _memo[key] = tag
+                else:
+                    stats["memo_hits"] += 1
+            tags.append(tag)
+            prev2, prev = prev, tag
+        stats["tokens"] += len(tokens)
+        tagged.append(tags)
+    return tagged
+
+# ---------- EXTRACTION ----------
+def text_length(sentences):
+    """About the length of the text the token lists came from"""
+    return sum(len(w) + 1 for tokens in sentences for w in tokens)
+
+def tagged_phrases(sentences):
+    """Lower-cased nouns and adjectives, in text order"""
+    t0 = time.perf_counter()
+    tags = tag_sents(sentences)
+    chars = text_length(sentences)
+    if chars:
+        per_char = (time.perf_counter() - t0) / chars
+        _seconds_per_char[:] = [per_char if not _seconds_per_char else 0.8 * _seconds_per_char[0] + 0.2 * per_char]
+    stats["tagged_texts"] += 1
+    return [w.lower() for s, ts in zip(sentences, tags) for w, tag in zip(s, ts) if tag.startswith(KEY_TAGS)]
+
+def rank_light(word_counts):
+    """Most frequent non-stopwords of lower-cased word counts, ties in the counts' order"""
+    stats["light_texts"] += 1
+    return sorted((w for w in word_counts if len(w) > 2 and w.isalpha() and w not in STOPWORDS),
+                  key=word_counts.get, reverse=True)
+
+def light_phrases(sentences):
+    """Most frequent non-stopwords, ties in text order; no tagger needed"""
+    counts = {}
+    for tokens in sentences:
+        for w in tokens:
+            w = w.lower()
+            counts[w] = counts.get(w, 0) + 1
+    return rank_light(counts)
+
+def choose_mode(chars, mode=None):
+    """"tagger" or "light": the mode a text of about chars characters gets.
+    Texts analyzed in batches ask once for the whole text, so every batch agrees."""
+    mode = mode or MODE
+    if mode == "auto":
+        return "light" if _seconds_per_char and chars * _seconds_per_char[0] > BUDGET else "tagger"
+    return mode
+
+def extract(sentences, mode=None):
+    """Key-phrase candidates for one text given as token lists per sentence, best first.
+    Raises LookupError in tagger mode when the NLTK tagger model is missing."""
+    mode = choose_mode(text_length(sentences), mode)
+    return light_phrases(sentences) if mode == "light" else tagged_phrases(sentences)
@@ -0,0 +1,223 @@
+# lexicon.py
+# Compiled pattern sentiment lexicon: scores text like TextBlob's PatternAnalyzer
+# without building a TextBlob, in one tokenize-and-accumulate pass.
+
+import importlib.util
+import os
+import re
+from xml.etree import ElementTree
+
+# ---------- TOKENIZER TABLES (mirrors textblob._text) ----------
+PUNCTUATION = ".,;:!?()[]{}`''\"@#$^&*+-|=~_"
+_LEADING = tuple(PUNCTUATION.replace(".", ""))
+_TRAILING = _LEADING + (".",)
+
+ABBREVIATIONS = frozenset((
+    "a.", "adj.", "adv.", "al.", "a.m.", "c.", "cf.", "comp.", "conf.", "def.",
+    "ed.", "e.g.", "esp.", "etc.", "ex.", "f.", "fig.", "gen.", "id.", "i.e.",
+    "int.", "l.", "m.", "Med.", "Mil.", "Mr.", "n.", "n.q.", "orig.", "pl.",
+    "pred.", "pres.", "p.m.", "ref.", "v.", "vs.", "w/",
+))
+RE_ABBR1 = re.compile(r"^[A-Za-z]\.$")
+RE_ABBR2 = re.compile(r"^([A-Za-z]\.)+$")
+RE_ABBR3 = re.compile("^[A-Z][" + "|".join("bcdfghjklmnpqrstvwxz") + "]+.$")
+
+CONTRACTIONS = ("'d", "'m", "'s", "'ll", "'re", "'ve", "n't")
+RE_CONTRACTION = re.compile("|".join(CONTRACTIONS))
+RE_QUOTES = re.compile("([“”‘’'\"])")
+RE_LINEBREAK = re.compile(r"\n{2,}")
+RE_SPACE = re.compile(r"\s+")
+EOS = "END-OF-SENTENCE"
+SENTENCE_END = frozenset(("...", ".", "!", "?", EOS))
+
+EMOTICONS = {
+    ("love", +1.00): ("<3", "♥"),
+    ("grin", +1.00): (">:D", ":-D", ":D", "=-D", "=D", "X-D", "x-D", "XD", "xD", "8-D"),
+    ("taunt", +0.75): (">:P", ":-P", ":P", ":-p", ":p", ":-b", ":b", ":c)", ":o)", ":^)"),
+    ("smile", +0.50): (">:)", ":-)", ":)", "=)", "=]", ":]", ":}", ":>", ":3", "8)", "8-)"),
+    ("wink", +0.25): (">;]", ";-)", ";)", ";-]", ";]", ";D", ";^)", "*-)", "*)"),
+    ("gasp", +0.05): (">:o", ":-O", ":O", ":o", ":-o", "o_O", "o.O", "°O°", "°o°"),
+    ("worry", -0.25): (">:/", ":-/", ":/", ":\\", ">:\\", ":-.", ":-s", ":s", ":S", ":-S", ">.>"),
+    ("frown", -0.75): (">:[", ":-(", ":(", "=(", ":-[", ":[", ":{", ":-<", ":c", ":-c", "=/"),
+    ("cry", -1.00): (":'(", ":'''(", ";'("),
+}
+EMOTICON_POLARITY = {}
+for (_mood, _p), _faces in EMOTICONS.items():
+    for _face in _faces:
+        EMOTICON_POLARITY.setdefault(_face.lower(), _p)
+
+RE_EMOTICONS = re.compile(r"(%s)($|\s)" % "|".join(
+    r" ?".join(re.escape(c) for c in face) for faces in EMOTICONS.values() for face in faces
+))
+RE_SARCASM = re.compile(r"\( ?\! ?\)")
+
+NEGATIONS = frozenset(("no", "not", "n't", "never"))
+
+# ---------- LEXICON ----------
+_lexicon = None
+
+def lexicon_path():
+    """Locate the en-sentiment.xml shipped with TextBlob without importing it"""
+    spec = importlib.util.find_spec("textblob")
+    if spec is None or not spec.submodule_search_locations:
+        raise RuntimeError("textblob is not installed")
+    return os.path.join(spec.submodule_search_locations[0], "en", "en-sentiment.xml")
+
+def _avg(values):
+    return sum(values) / float(len(values) or 1)
+
+def load_lexicon(path=None):
+    """Load the pattern lexicon once into a word -> (polarity, subjectivity, intensity, is_modifier) table"""
+    global _lexicon
+    if _lexicon is not None and path is None:
+        return _lexicon
+
+    words = {}
+    for w in ElementTree.parse(path or lexicon_path()).getroot().findall("word"):
+        form = w.attrib.get("form")
+        if form:
+            psi = (float(w.attrib.get("polarity", 0.0)),
+                   float(w.attrib.get("subjectivity", 0.0)),
+                   float(w.attrib.get("intensity", 1.0)))
+            words.setdefault(form, {}).setdefault(w.attrib.get("pos"), []).append(psi)
+
+    # Average word senses per POS tag, then across tags (same order as pattern).
+    for form, senses in words.items():
+        words[form] = {pos: [_avg(each) for each in zip(*psi)] for pos, psi in senses.items()}
+    for form, tags in list(words.items()):
+        tags[None] = [_avg(each) for each in zip(*tags.values())]
+
+    # Map adjectives to their adverbs ("terrible" -> "terribly").
+    for form, tags in list(words.items()):
+        if "JJ" in tags:
+            if form.endswith("y"):
+                form = form[:-1] + "i"
+            if form.endswith("le"):
+                form = form[:-2]
+            entry = words.setdefault(form + "ly", {})
+            entry["RB"] = entry[None] = tuple(tags["JJ"])
+
+    table = {form: (tags[None][0], tags[None][1], tags[None][2], "RB" in tags)
+             for form, tags in words.items()}
+    if path is None:
+        _lexicon = table
+    return table
+
+# ---------- TOKENIZE ----------
+def _split_token(t, tokens):
+    tail = []
+    while t.startswith(_LEADING) and t not in CONTRACTIONS:
+        tokens.append(t[0])
+        t = t[1:]
+    while t.endswith(_TRAILING) and t not in CONTRACTIONS:
+        if t.endswith(_LEADING):
+            tail.append(t[-1])
+            t = t[:-1]
+        if t.endswith("..."):
+            tail.append("...")
+            t = t[:-3].rstrip(".")
+        if t.endswith("."):
+            if (t in ABBREVIATIONS or RE_ABBR1.match(t) is not None
+                    or RE_ABBR2.match(t) is not None or RE_ABBR3.match(t) is not None):
+                break
+            tail.append(t[-1])
+            t = t[:-1]
+    if t != "":
+        tokens.append(t)
+    tokens.extend(reversed(tail))
+
+def tokenize(text: str):
+    """Split text into lowercase tokens exactly like pattern's find_tokens"""
+    text = RE_CONTRACTION.sub(lambda m: " " + m.group(0), text)
+    text = RE_QUOTES.sub(r" \1 ", text)
+    text = RE_LINEBREAK.sub(" %s " % EOS, text.replace("\r\n", "\n"))
+    tokens = []
+    for t in text.split():
+        _split_token(t, tokens)
+
+    joined = " ".join(t for t in tokens if t != EOS)
+    if "(" in joined:
+        joined = RE_SARCASM.sub("(!)", joined)
+    joined = RE_EMOTICONS.sub(lambda m: m.group(1).replace(" ", "") + m.group(2), joined)
+    return joined.lower().split()
+
+# ---------- SCORE ----------
+class Accumulator:
+    """Running assessment of a token stream that arrives in pieces (sentences, batches).
+    Feeding a text's tokens in any split gives the same totals as one accumulate() call."""
+    __slots__ = ("p_sum", "s_sum", "count", "cur", "m", "n")
+
+    def __init__(self):
+        self.p_sum = self.s_sum = 0.0
+        self.count = 0
+        self.cur = None  # open assessment [polarity, subjectivity, intensity, negated]
+        self.m = None    # preceding modifier
+        self.n = None    # preceding negation
+
+    def feed(self, tokens):
+        table = _lexicon or load_lexicon()
+        p_sum, s_sum, count, cur, m, n = self.p_sum, self.s_sum, self.count, self.cur, self.m, self.n
+        for w in tokens:
+            entry = table.get(w)
+            if entry is not None:
+                p, s, i, is_modifier = entry
+                if m is None:
+                    if cur is not None:
+                        p_sum += cur[0] * -0.5 if cur[3] else cur[0]
+                        s_sum += cur[1]
+                        count += 1
+                    cur = [p, s, i, False]
+                else:
+                    cur[0] = max(-1.0, min(p * cur[2], +1.0))
+                    cur[1] = max(-1.0, min(s * cur[2], +1.0))
+                    cur[2] = i
+                if n is not None:
+                    cur[2] = 1.0 / cur[2]
+                    cur[3] = True
+                m = w if is_modifier else None
+                n = w if w in NEGATIONS else None
+                continue
+
+            if w in NEGATIONS:
+                n = w
+            elif n and len(w.strip("'")) > 1:
+                n = None
+            if n is not None and m is not None and m.endswith("ly"):
+                cur[3] = True
+                n = None
+            elif m and len(w) > 2:
+                m = None
+            if w == "!" and cur is not None:
+                cur[0] = max(-1.0, min(cur[0] * 1.25, +1.0))
+            if w == "(!)":
+                if cur is not None:
+                    p_sum += cur[0] * -0.5 if cur[3] else cur[0]
+                    s_sum += cur[1]
+                    count += 1
+                cur = [0.0, 1.0, 1.0, False]
+            if not w.isalpha() and len(w) <= 5 and w not in PUNCTUATION:
+                mood = EMOTICON_POLARITY.get(w)
+                if mood is not None:
+                    if cur is not None:
+                        p_sum += cur[0] * -0.5 if cur[3] else cur[0]
+                        s_sum += cur[1]
+                        count += 1
+                    cur = [mood, 1.0, 1.0, False]
+        self.p_sum, self.s_sum, self.count, self.cur, self.m, self.n = p_sum, s_sum, count, cur, m, n
+        return self
+
+    def totals(self):
+        """(polarity_sum, subjectivity_sum, assessments) so far, counting the open assessment"""
+        cur = self.cur
+        if cur is None:
+            return self.p_sum, self.s_sum, self.count
+        return self.p_sum + (cur[0] * -0.5 if cur[3] else cur[0]), self.s_sum + cur[1], self.count + 1
+
+def accumulate(tokens):
+    """Assess tokens in one pass; returns (polarity_sum, subjectivity_sum, assessments)"""
+    return Accumulator().feed(tokens).totals()
+
+def score(text: str):
+    """Return (polarity, subjectivity) for text, matching TextBlob(text).sentiment"""
+    p_sum, s_sum, count = accumulate(tokenize(text))
+    return p_sum / float(count or 1), s_sum / float(count or 1)
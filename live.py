@@ -0,0 +1,183 @@
+# live.py
+# As-you-type analysis: an edit re-splits only the sentences around it, re-scores only sentences
+# not seen before, and the document figures are recombined from the cached sentence results.
+# The splitting and scoring (sentence_spans, score_sentences) are worker pool jobs; LiveAnalysis
+# only compares texts, looks up results and adds them up, so it is cheap to run in the server.
+#
+# Environment:
+#   LIVE_SENTENCE_CACHE  sentence results kept per editor, including ones edited away (default: 2000)
+
+import heapq
+import os
+from collections import OrderedDict
+
+import analyzer
+
+# ---------- CONFIG ----------
+CACHE_SIZE = int(os.environ.get("LIVE_SENTENCE_CACHE", "2000"))
+
+# ---------- SPLITTING ----------
+def sentence_spans(text, offset=0):
+    """(start, end) of each sentence of text, shifted by offset"""
+    spans = []
+    pos = 0
+    for sentence in analyzer.split_sentences(text):
+        start = text.find(sentence, pos)
+        pos = start + len(sentence)
+        spans.append((offset + start, offset + pos))
+    return spans
+
+def score_sentences(sentences):
+    """The cached result of each sentence: its analysis, scores and word counts"""
+    results = []
+    for sentence in sentences:
+        partial = analyzer.analyze_sentence_batch([sentence], with_key_phrases=False)
+        results.append({"sentence": partial["sentences"][0], "scores": partial["scores"][0], "word_freq": partial["word_freq"]})
+    return results
+
+def common_affixes(old, new):
+    """Lengths of the common prefix and (non-overlapping) common suffix of two strings,
+    found by bisection so long texts are compared in C"""
+    limit = min(len(old), len(new))
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    lo, hi = 0, limit - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, lo
+
+# ---------- ANALYSIS ----------
+class LiveAnalysis:
+    """Analysis state of one editor: the current text, its sentences and their cached results"""
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.cache_size = cache_size
+        self.text = ""
+        self._spans = []              # (start, end) of each sentence in self.text
+        self._entries = []            # result of each sentence, aligned with _spans
+        self._cache = OrderedDict()   # sentence -> result, least recently used first
+        self._word_freq = {}
+        self._words = 0
+        self.stats = {"updates": 0, "rescored": 0, "reused": 0, "resplit_chars": 0}
+
+    def _count(self, entries, sign):
+        word_freq = self._word_freq
+        for entry in entries:
+            self._words += sign * entry["sentence"]["word_count"]
+            for word, freq in entry["word_freq"].items():
+                freq = word_freq.get(word, 0) + sign * freq
+                if freq:
+                    word_freq[word] = freq
+                else:
+                    del word_freq[word]
+
+    def window(self, text):
+        """The sentences an edit to text replaces, from one sentence before the edited region to one
+        after, as (first, stop) indexes, and the (start, end) of the text to split again in their place"""
+        old, spans = self.text, self._spans
+        prefix, suffix = common_affixes(old, text)
+        if not spans:
+            return 0, 0, 0, len(text)
+        if prefix == len(old) == len(text):
+            return 0, 0, 0, 0
+        first = next((i for i, (_, end) in enumerate(spans) if end >= prefix), len(spans))
+        first = max(0, first - 1)
+        edit_end = len(old) - suffix
+        last = next((i for i in range(len(spans) - 1, -1, -1) if spans[i][0] <= edit_end), -1)
+        last = min(len(spans) - 1, last + 1)
+        start = spans[first][0] if first > 0 else 0
+        old_end = spans[last][1] if last < len(spans) - 1 else len(old)
+        end = old_end + len(text) - len(old)
+        return first, last + 1, start, end
+
+    def missing(self, text, spans):
+        """The sentences of text at spans that have no cached result, for score_sentences()"""
+        return list(dict.fromkeys(text[start:end] for start, end in spans if text[start:end] not in self._cache))
+
+    def apply(self, text, first, stop, window, scored):
+        """Analysis of the edited text, given window(text), the sentence_spans() of its window and the
+        score_sentences() results of the missing() sentences as a {sentence: result} dict"""
+        self.stats["updates"] += 1
+        if window:
+            self.stats["resplit_chars"] += window[-1][1] - window[0][0]
+        delta = len(text) - len(self.text)
+        entries = [scored.get(text[start:end]) or self._cache[text[start:end]] for start, end in window]
+        for sentence in dict.fromkeys(text[start:end] for start, end in window):
+            if sentence in scored:
+                self._cache[sentence] = scored[sentence]
+            else:
+                self._cache.move_to_end(sentence)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        self.stats["rescored"] += len(scored)
+        self.stats["reused"] += len(window) - len(scored)
+        self._count(self._entries[first:stop], -1)
+        self._count(entries, 1)
+        self._entries[first:stop] = entries
+        self._spans[first:stop] = window
+        self._spans[first + len(window):] = [(start + delta, end + delta) for start, end in self._spans[first + len(window):]]
+        self.text = text
+        return self.report()
+
+    def update(self, text):
+        """Analysis of the edited text, splitting and scoring in this process"""
+        first, stop, start, end = self.window(text)
+        window = sentence_spans(text[start:end], start) if end > start else []
+        missing = self.missing(text, window)
+        return self.apply(text, first, stop, window, dict(zip(missing, score_sentences(missing))))
+
+    def top_words(self, n):
+        """The n most frequent words with their counts; ties in order of first appearance, as in the
+        deep analysis. Only the words tied at the cut-off need their positions looked up."""
+        word_freq = self._word_freq
+        if not word_freq:
+            return []
+        cutoff = heapq.nlargest(n, word_freq.values())[-1]
+        candidates = {word for word, freq in word_freq.items() if freq >= cutoff}
+        order = {}
+        for entry in self._entries:
+            for word in entry["word_freq"]:
+                if word in candidates:
+                    order.setdefault(word, len(order))
+            if len(order) == len(candidates):
+                break
+        return sorted(((word, word_freq[word]) for word in candidates), key=lambda x: (-x[1], order[x[0]]))[:n]
+
+    def report(self):
+        """The figures of a deep analysis, recombined from the sentence results (without key
+        phrases, and without the per-sentence list)"""
+        entries = self._entries
+        polarity_sum = sum(entry["scores"][0] for entry in entries)
+        subjectivity_sum = sum(entry["scores"][1] for entry in entries)
+        assessments = sum(entry["scores"][2] for entry in entries)
+        polarities = [entry["sentence"]["polarity"] for entry in entries]
+        basic_analysis = analyzer.summarize_scores(
+            polarity_sum / float(assessments or 1),
+            subjectivity_sum / float(assessments or 1),
+            self._words,
+            len(entries),
+            [],
+        )
+        totals = {
+            "sentences": len(entries),
+            "words": self._words,
+            "subjectivity_sum": sum(entry["sentence"]["subjectivity"] for entry in entries),
+            "deviation_sum": sum(abs(p - basic_analysis["polarity"]) for p in polarities),
+            "positive": sum(1 for p in polarities if p > 0.1),
+            "negative": sum(1 for p in polarities if p < -0.1),
+            "polarity_range": max(polarities) - min(polarities) if polarities else 0,
+        }
+        top_words = self.top_words(10)
+        report = analyzer.build_report(basic_analysis, [], top_words, totals)
+        del report["sentences"]
+        return report
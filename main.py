@@ -2,12 +2,42 @@
 # Enhanced Sentiment Reader + Personal Link-card (NiceGUI + TextBlob)
 # Requirements: nicegui, textblob
 
-from nicegui import ui
-from textblob import TextBlob
+import os
+import subprocess
+import sys
+
+if __name__ == "__main__" and sys.argv[1:2] == ["analyze"]:
+    # Command-line batch mode (cli.py), without importing NiceGUI. It runs as its own script so
+    # its worker processes re-import cli.py rather than this UI module.
+    sys.exit(subprocess.call([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "cli.py"), *sys.argv[2:]]))
+if __name__ == "__main__" and sys.argv[1:2] == ["serve"]:
+    # Production server (server.py): several copies of this app behind one port. It replaces this
+    # process, so the platform's stop signal reaches it.
+    server_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    os.execv(sys.executable, [sys.executable, server_py, *sys.argv[2:]])
+
+from nicegui import app, background_tasks, ui
+from collections import OrderedDict, deque
 from datetime import datetime
+import asyncio
+import secrets
 import json
-import base64
+import time
 from io import BytesIO
+import metrics
+import result_cache
+from history import HistoryRecord, histories
+import history_log
+import static_assets
+import api  # registers the /api routes
+import startup
+import state
+import worker_pool
+from live import LiveAnalysis, score_sentences, sentence_spans
+from analyzer import (
+    analyze_text_blob, analyze_sentence_batch, finish_deep_analysis, merge_partials,
+    outline_text, sentiment_label, split_sentences,
+)
 
 # ---------- CONFIG ----------
 PROFILE_IMAGE = 'image.png'
@@ -20,297 +50,151 @@ LINKS = [
     ("Instagram", "https://instagram.com/senith.lokitha", "bi-instagram"),
 ]
 
+DEEP_BATCH_SIZE = 25      # sentences per worker job in a deep analysis
+DEEP_BATCHES_IN_FLIGHT = worker_pool.POOL_SIZE  # a page's batches queued at once, so one long paste can't fill the pool
+POLARITY_ZOOM_AFTER = 60  # sentences in the polarity chart before it gets a zoom slider
+TOP_WORDS_CHART = 10      # bars in the word-frequency chart
+HISTORY_ROWS = 6          # rows in the compact history list; the full view scrolls through all of them
+HISTORY_PAGE = 100        # records the full view reads from the history log at a time
+LIVE_DEBOUNCE = 0.3       # seconds of typing pause before the live analysis updates
+
 # ---------- STATE ----------
-analysis_history = []
+# History lives in the history module so it is kept per browser session, not per page build
+# (the first run of this script happens before ui.run, when there is no browser and no storage yet)
+session_id = app.storage.browser.get('id', 'local') if app.is_started else 'local'
+deep_run = [0]  # bumped on every new analysis so a stale deep stream stops rendering
+history_rows = OrderedDict()  # record -> its row in the compact list, oldest first
+history_table = [None]        # virtual-scroll table of the whole session history, built on first use
+history_key = history_log.session_key(session_id)
+history_paging = {"before": None, "done": False, "loading": False}  # how far the full view has read the log
+history_writes = asyncio.Lock()  # this page's history store and log writes, run in a thread one after another
+live_analysis = LiveAnalysis()  # this page's sentence cache for the live mode
+live_edit = [0]                 # bumped on every edit so only the last one in a burst is analyzed
+live_lock = asyncio.Lock()
 
 # ---------- UTILITIES ----------
-def analyze_text_blob(text: str):
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    
-    if polarity > 0.1:
-        sentiment = "Positive"
-        emoji = "😊"
-    elif polarity < -0.1:
-        sentiment = "Negative"
-        emoji = "😔"
-    else:
-        sentiment = "Neutral"
-        emoji = "😐"
-    
+async def run_analysis(fn, *args):
+    """Run an analysis in the worker pool, notifying the user instead of raising"""
     try:
-        key_phrases = [w.lower() for w, pos in blob.tags if pos.startswith(("NN","JJ"))]
-    except Exception:
-        key_phrases = [w.lower() for w in blob.words if len(w) > 3]
-    
+        return await worker_pool.run(fn, *args)
+    except asyncio.TimeoutError:
+        ui.notify("Analysis took too long — try a shorter text", type='negative')
+    except Exception as e:
+        ui.notify(f"Analysis failed: {e}", type='negative')
+    return None
+
+async def cached_analysis(kind, fn, text):
+    """Return a cached result for text, running fn in the worker pool on a miss"""
+    result = await result_cache.results.fetch(kind, text)
+    if result is None:
+        result = await run_analysis(fn, text)
+        if result is not None:
+            await result_cache.results.save(kind, text, result)
+    return result
+
+def write_history(fn, *args):
+    """Run fn(*args), a blocking history store or log write, in a thread after this page's earlier ones"""
+    async def write():
+        async with history_writes:
+            await asyncio.to_thread(fn, *args)
+    background_tasks.create(write(), name="history write")
+
+async def read_history():
+    """This session's history from the store, once this page's pending writes are done"""
+    async with history_writes:
+        return await asyncio.to_thread(histories.session, session_id)
+
+def record_analysis(text, analysis, kind="quick"):
+    """Add an analysis to this session's history and, when enabled, the on-disk log"""
+    record = HistoryRecord(text, analysis["sentiment"], analysis["polarity"], analysis["subjectivity"], kind=kind)
+    add_history_row(record)
+    write_history(histories.append, session_id, record)
+    if history_log.log is not None:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.timestamp).isoformat(),
+            "text": text,
+            "sentiment": record.sentiment,
+            "polarity": record.polarity,
+            "subjectivity": record.subjectivity,
+            "session": history_key,
+        }
+        if kind != "quick":
+            entry["type"] = kind
+        write_history(history_log.log.append, entry)
+
+# ---------- DEEP RESULT ----------
+# The deep result is drawn in the browser from plain data (ECharts and a virtual-scroll table),
+# so a text with thousands of sentences still takes a fixed handful of elements
+CHART_TEXT = 'rgba(255,255,255,0.7)'
+SENTENCE_COLUMNS = [
+    {"name": "number", "label": "#", "field": "number", "align": "left"},
+    {"name": "text", "label": "Sentence", "field": "text", "align": "left", "style": "white-space:normal;"},
+    {"name": "polarity", "label": "Polarity", "field": "polarity", "align": "right"},
+    {"name": "words", "label": "Words", "field": "words", "align": "right"},
+]
+POLARITY_CELL = '''
+    <q-td :props="props" :style="{color: props.value > 0.1 ? '#4ade80' : props.value < -0.1 ? '#f87171' : 'rgba(255,255,255,0.6)'}">
+        {{ props.value.toFixed(3) }}
+    </q-td>
+'''
+# Puts a batch's bars on a polarity chart in the browser, so each batch sends only its own points.
+# They go after the bars of the sentences before them, replacing any the chart was sent with already;
+# waits for the chart to be created the way the echart element's update_chart() does
+APPEND_BARS = '''
+(function append(id, numbers, values) {
+    const chart = getElement(id)?.chart;
+    if (!chart) return setTimeout(() => append(id, numbers, values), 10);
+    const option = chart.getOption(), before = numbers[0] - 1;
+    chart.setOption({xAxis: [{data: option.xAxis[0].data.slice(0, before).concat(numbers)}],
+                     series: [{data: option.series[0].data.slice(0, before).concat(values)}]});
+})(%d, %s, %s)
+'''
+
+def sentence_rows(sentences):
+    return [{"number": s["number"], "text": s["text"], "polarity": round(s["polarity"], 3), "words": s["word_count"]}
+            for s in sentences]
+
+def polarity_bars(sentences):
+    """x-axis sentence numbers and bar heights for a polarity chart"""
+    return [s["number"] for s in sentences], [round(s["polarity"], 3) for s in sentences]
+
+def polarity_chart_options(total, sentences=()):
+    """Bars of each sentence's polarity, green/grey/red like the sentiment labels; filled in as batches
+    arrive unless the sentences are already known"""
+    zoom = total > POLARITY_ZOOM_AFTER
+    numbers, values = polarity_bars(sentences)
     return {
-        "sentiment": sentiment,
-        "emoji": emoji,
-        "polarity": polarity,
-        "polarity_percent": ((polarity + 1) / 2) * 100,
-        "subjectivity": subjectivity,
-        "subjectivity_label": "Subjective" if subjectivity > 0.5 else "Objective",
-        "word_count": len(blob.words),
-        "sentence_count": len(blob.sentences),
-        "key_phrases": list(dict.fromkeys(key_phrases))[:10],
+        "backgroundColor": "transparent",
+        "animation": False,
+        "grid": {"left": 36, "right": 12, "top": 10, "bottom": 48 if zoom else 24},
+        "tooltip": {"trigger": "axis"},
+        "xAxis": {"type": "category", "data": numbers, "axisLabel": {"color": CHART_TEXT}},
+        "yAxis": {"type": "value", "min": -1, "max": 1, "axisLabel": {"color": CHART_TEXT},
+                  "splitLine": {"lineStyle": {"color": "rgba(255,255,255,0.08)"}}},
+        "visualMap": {"show": False, "pieces": [
+            {"lt": -0.1, "color": "#ef4444"}, {"gte": -0.1, "lte": 0.1, "color": "#6b7280"}, {"gt": 0.1, "color": "#22c55e"},
+        ]},
+        "series": [{"type": "bar", "name": "Polarity", "data": values, "large": True}],
+        **({"dataZoom": [{"type": "inside"}, {"type": "slider", "height": 16, "bottom": 8}]} if zoom else {}),
     }
 
-def deep_analyze_text(text: str):
-    """Perform comprehensive deep analysis of the text"""
-    blob = TextBlob(text)
-    basic_analysis = analyze_text_blob(text)
-    
-    sentences = list(blob.sentences)
-    words = list(blob.words)
-    
-    # Sentence-by-sentence analysis
-    sentence_analysis = []
-    for i, sentence in enumerate(sentences, 1):
-        sent_blob = TextBlob(str(sentence))
-        sentence_analysis.append({
-            "number": i,
-            "text": str(sentence),
-            "polarity": sent_blob.sentiment.polarity,
-            "subjectivity": sent_blob.sentiment.subjectivity,
-            "word_count": len(sent_blob.words)
-        })
-    
-    # Word frequency analysis
-    word_freq = {}
-    for word in words:
-        word_lower = word.lower()
-        if len(word_lower) > 2:
-            word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
-    
-    top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    # Analysis metrics
-    positive_sentences = [s for s in sentence_analysis if s["polarity"] > 0.1]
-    negative_sentences = [s for s in sentence_analysis if s["polarity"] < -0.1]
-    neutral_sentences = [s for s in sentence_analysis if -0.1 <= s["polarity"] <= 0.1]
-    
-    avg_sentence_length = sum(len(s.words) for s in sentences) / len(sentences) if sentences else 0
-    complexity_score = sum(s["subjectivity"] for s in sentence_analysis) / len(sentence_analysis) if sentence_analysis else 0
-    
-    polarities = [s["polarity"] for s in sentence_analysis]
-    sentiment_consistency = 1 - (sum(abs(p - basic_analysis["polarity"]) for p in polarities) / len(polarities)) if polarities else 0
-    
+def word_chart_options(word_frequency):
+    words = word_frequency[:TOP_WORDS_CHART][::-1]  # ECharts draws the first category at the bottom
     return {
-        "basic": basic_analysis,
-        "sentences": sentence_analysis,
-        "word_frequency": top_words,
-        "statistics": {
-            "total_sentences": len(sentences),
-            "total_words": len(words),
-            "avg_sentence_length": round(avg_sentence_length, 2),
-            "complexity_score": round(complexity_score, 3),
-            "sentiment_consistency": round(max(0, sentiment_consistency), 3),
-            "positive_sentences": len(positive_sentences),
-            "negative_sentences": len(negative_sentences),
-            "neutral_sentences": len(neutral_sentences)
-        },
-        "insights": {
-            "dominant_emotion": "Positive" if len(positive_sentences) > len(negative_sentences) else "Negative" if len(negative_sentences) > len(positive_sentences) else "Neutral",
-            "emotional_range": round(max(polarities) - min(polarities), 3) if polarities else 0,
-            "subjectivity_level": "High" if complexity_score > 0.6 else "Medium" if complexity_score > 0.3 else "Low",
-            "consistency_level": "High" if sentiment_consistency > 0.7 else "Medium" if sentiment_consistency > 0.4 else "Low"
-        }
+        "backgroundColor": "transparent",
+        "animation": False,
+        "grid": {"left": 8, "right": 36, "top": 4, "bottom": 4, "containLabel": True},
+        "xAxis": {"type": "value", "show": False},
+        "yAxis": {"type": "category", "data": [word for word, _ in words], "axisLabel": {"color": CHART_TEXT},
+                  "axisLine": {"show": False}, "axisTick": {"show": False}},
+        "series": [{"type": "bar", "data": [freq for _, freq in words], "itemStyle": {"color": "#a855f7", "borderRadius": 4},
+                    "label": {"show": True, "position": "right", "color": CHART_TEXT}}],
     }
 
-def read_profile_image_datauri(path):
-    try:
-        with open(path, "rb") as f:
-            b = base64.b64encode(f.read()).decode("ascii")
-        ext = path.split('.')[-1].lower()
-        mime = "image/png" if ext in ("png","apng") else f"image/{ext}"
-        return f"data:{mime};base64,{b}"
-    except Exception:
-        svg = """
-        <svg xmlns='http://www.w3.org/2000/svg' width='240' height='240' viewBox='0 0 24 24' fill='none' stroke='currentColor'>
-          <rect width='24' height='24' rx='4' fill='#e2e8f0'/>
-          <circle cx='12' cy='9' r='3' fill='#94a3b8'/>
-          <path d='M6 20c1.5-4 10.5-4 12 0' stroke='#64748b' stroke-width='1.2' fill='none'/>
-        </svg>
-        """
-        b = base64.b64encode(svg.encode("utf-8")).decode("ascii")
-        return f"data:image/svg+xml;base64,{b}"
-
 # ---------- UI ----------
 
-# Head CSS + Bootstrap Icons + responsive design
-ui.add_head_html('''
-<link href="https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css" rel="stylesheet">
-<style>
-:root {
-  --glass: rgba(255,255,255,0.06);
-  --glass-strong: rgba(255,255,255,0.09);
-  --accent-start: #667eea;
-  --accent-end: #764ba2;
-}
-body { 
-  font-family: Inter, system-ui, -apple-system, "Segoe UI", Roboto, "Helvetica Neue", Arial; 
-  background: linear-gradient(120deg,#0f172a,#071028);
-  min-height: 100vh;
-  margin: 0;
-  padding: 15px;
-}
-.main-container {
-  max-width: 1200px;
-  margin: 0 auto;
-  padding: 0 15px;
-}
-
-.profile-img { 
-  width:80px; 
-  height:80px; 
-  border-radius:999px; 
-  object-fit:cover; 
-  border:3px solid rgba(255,255,255,0.06); 
-  box-shadow: 0 10px 30px rgba(0,0,0,0.35); 
-}
-.social-icon {
-  width: 40px;
-  height: 40px;
-  border-radius: 50%;
-  display: inline-flex;
-  align-items: center;
-  justify-content: center;
-  margin: 0 8px;
-  background: linear-gradient(135deg, var(--accent-start), var(--accent-end));
-  color: white;
-  text-decoration: none;
-  transition: all 0.3s ease;
-  font-size: 18px;
-}
-.social-icon:hover {
-  transform: translateY(-3px);
-  box-shadow: 0 8px 25px rgba(102, 126, 234, 0.3);
-}
-.link-btn { 
-  padding: 8px 16px; 
-  border-radius: 8px; 
-  background: linear-gradient(90deg,var(--accent-start),var(--accent-end)); 
-  color:white; 
-  font-weight:600; 
-  border: none;
-  cursor: pointer;
-  transition: transform 0.2s ease;
-  width: 100%;
-  margin-bottom: 8px;
-}
-.link-btn:hover {
-  transform: translateY(-1px);
-}
-.btn-primary {
-  background: linear-gradient(90deg,var(--accent-start),var(--accent-end));
-  color: white;
-  border: none;
-  padding: 12px 24px;
-  border-radius: 8px;
-  font-weight: 600;
-  cursor: pointer;
-  transition: transform 0.2s ease;
-  margin-right: 8px;
-  margin-bottom: 8px;
-}
-.btn-primary:hover {
-  transform: translateY(-1px);
-}
-.btn-secondary {
-  background: rgba(255,255,255,0.1);
-  color: white;
-  border: 1px solid rgba(255,255,255,0.2);
-  padding: 8px 16px;
-  border-radius: 8px;
-  cursor: pointer;
-  transition: all 0.2s ease;
-  margin-right: 8px;
-  margin-bottom: 8px;
-}
-.btn-secondary:hover {
-  background: rgba(255,255,255,0.15);
-}
-.card-glass { 
-  background: linear-gradient(180deg, rgba(255,255,255,0.02), rgba(255,255,255,0.015)); 
-  border-radius: 14px; 
-  padding: 20px; 
-  border:1px solid rgba(255,255,255,0.03);
-  backdrop-filter: blur(10px);
-  margin-bottom: 20px;
-}
-.glass-strong {
-  background: linear-gradient(180deg, rgba(255,255,255,0.09), rgba(255,255,255,0.06)); 
-  border-radius: 14px; 
-  border:1px solid rgba(255,255,255,0.08);
-  backdrop-filter: blur(15px);
-}
-.footer { 
-  opacity:0.75; 
-  font-size:13px; 
-  color: rgba(255,255,255,0.6);
-  text-align: center;
-  margin-top: 30px;
-}
-.content-grid {
-  display: grid;
-  grid-template-columns: 1fr 340px;
-  gap: 20px;
-  align-items: start;
-  margin-top: 10px;
-}
-
-/* Mobile Responsive */
-@media (max-width: 968px) {
-  .content-grid {
-    grid-template-columns: 1fr;
-    gap: 15px;
-  }
-  .profile-img { 
-    width: 70px; 
-    height: 70px; 
-  }
-  .social-icon {
-    width: 35px;
-    height: 35px;
-    font-size: 16px;
-    margin: 0 5px;
-  }
-  body { 
-    padding: 15px; 
-  }
-  .main-container {
-    padding: 0 15px;
-  }
-  .card-glass {
-    padding: 15px;
-  }
-}
-
-@media (max-width: 640px) {
-  .profile-img { 
-    width: 60px; 
-    height: 60px; 
-  }
-  .social-icon {
-    width: 32px;
-    height: 32px;
-    font-size: 14px;
-    margin: 0 4px;
-  }
-  body { 
-    padding: 10px; 
-  }
-  .main-container {
-    padding: 0 10px;
-  }
-  .btn-primary, .btn-secondary {
-    padding: 10px 16px;
-    font-size: 14px;
-  }
-}
-</style>
-''')
+# Head CSS + Bootstrap Icons + responsive design, served as fingerprinted static files
+ui.add_head_html(static_assets.head_html())
 
 # Main container with centered layout
 with ui.column().classes('main-container'):
@@ -325,22 +209,62 @@ with ui.column().classes('main-container'):
                     value="This product is absolutely amazing! Best purchase I've made this year!"
                 ).classes('w-full').props('clearable rows=6').style('background:rgba(255,255,255,0.05);color:white;border:1px solid rgba(255,255,255,0.1);border-radius:8px;padding:12px;min-height:120px;')
                 
+                # Live mode: running figures under the editor, updated when typing pauses
+                with ui.row().classes('items-center gap-3').style('margin-top:8px;flex-wrap:wrap;') as live_row:
+                    live_summary = ui.label().classes('text-sm').style('font-weight:700;color:white;')
+                    live_details = ui.label().classes('text-xs text-white/60')
+                live_row.visible = False
+                
+                async def refresh_live():
+                    async with live_lock:
+                        started = time.perf_counter()
+                        text = text_input.value or ""
+                        # Splitting and scoring run in the worker pool, so pasting a long text doesn't stall
+                        # other pages; here only the cached sentence results are looked up and added up
+                        first, stop, start, end = live_analysis.window(text)
+                        window = await run_analysis(sentence_spans, text[start:end], start) if end > start else []
+                        if window is None:
+                            return
+                        missing = live_analysis.missing(text, window)
+                        scored = await run_analysis(score_sentences, missing) if missing else []
+                        if scored is None:
+                            return
+                        report = live_analysis.apply(text, first, stop, window, dict(zip(missing, scored)))
+                        elapsed = (time.perf_counter() - started) * 1000
+                    basic, stats = report["basic"], report["statistics"]
+                    live_summary.set_text(f"{basic['emoji']} {basic['sentiment']} • Polarity {basic['polarity']:.3f} • Subjectivity {basic['subjectivity']:.3f}")
+                    live_details.set_text(f"{stats['total_words']} words • {stats['total_sentences']} sentences • "
+                                          f"😊 {stats['positive_sentences']} 😔 {stats['negative_sentences']} 😐 {stats['neutral_sentences']} • {elapsed:.0f} ms")
+                
+                async def on_text_change():
+                    if not live_switch.value:
+                        return
+                    live_edit[0] += 1
+                    edit = live_edit[0]
+                    await asyncio.sleep(LIVE_DEBOUNCE)
+                    if edit == live_edit[0]:
+                        await refresh_live()
+                
+                async def toggle_live():
+                    live_row.visible = live_switch.value
+                    if live_switch.value:
+                        await refresh_live()
+                
+                text_input.on_value_change(on_text_change)
+                
                 with ui.row().classes('items-center gap-3').style('margin-top:12px;flex-wrap:wrap;'):
-                    def do_analyze():
+                    async def do_analyze():
                         text = text_input.value.strip()
                         if not text:
                             ui.notify("Please enter some text", type='warning')
                             return
                         
-                        analysis = analyze_text_blob(text)
-                        analysis_record = {
-                            "timestamp": datetime.now().isoformat(),
-                            "text": text,
-                            "sentiment": analysis["sentiment"],
-                            "polarity": analysis["polarity"],
-                            "subjectivity": analysis["subjectivity"]
-                        }
-                        analysis_history.append(analysis_record)
+                        deep_run[0] += 1
+                        analysis = await cached_analysis("quick", analyze_text_blob, text)
+                        if analysis is None:
+                            return
+                        render_started = time.perf_counter()
+                        record_analysis(text, analysis)
                         
                         result_box.clear()
                         with result_box:
@@ -360,11 +284,11 @@ with ui.column().classes('main-container'):
                                     with ui.row().classes('gap-2').style('flex-wrap:wrap;margin-top:6px;'):
                                         for kp in analysis['key_phrases'][:8]:
                                             ui.html(f'<span style="padding:6px 10px;border-radius:999px;background:rgba(255,255,255,0.03);font-size:13px;color:rgba(255,255,255,0.7)">{kp}</span>', sanitize=False)
+                        metrics.observe_stage("render", "quick", time.perf_counter() - render_started)
                         
-                        refresh_history_list()
                         ui.notify(f"✨ Analysis complete — {analysis['sentiment']}", type='positive')
                     
-                    def do_deep_analyze():
+                    async def do_deep_analyze():
                         text = text_input.value.strip()
                         if not text:
                             ui.notify("Please enter some text for deep analysis", type='warning')
@@ -377,28 +301,112 @@ with ui.column().classes('main-container'):
                                 ui.label("Performing Deep Analysis...").style('color:white;font-weight:600;')
                                 ui.label("Analyzing sentences, words, and patterns").classes('text-sm text-white/60')
                         
-                        ui.timer(1.0, lambda: show_deep_result(text), once=True)
+                        await show_deep_result(text)
+                    
+                    def chart_sentences(chart, sentences):
+                        # chart.options stays complete for a re-render; the browser gets just the new bars
+                        numbers, values = polarity_bars(sentences)
+                        chart.options["xAxis"]["data"].extend(numbers)
+                        chart.options["series"][0]["data"].extend(values)
+                        chart.client.run_javascript(APPEND_BARS % (chart.id, json.dumps(numbers), json.dumps(values)))
                     
-                    def show_deep_result(text):
-                        deep_analysis = deep_analyze_text(text)
+                    async def show_deep_result(text):
+                        # Results are pushed as they arrive: headline, the polarity chart batch by batch,
+                        # then the sentence table and the summary cards
+                        deep_run[0] += 1
+                        run_id = deep_run[0]
                         
-                        analysis_record = {
-                            "timestamp": datetime.now().isoformat(),
-                            "text": text,
-                            "sentiment": deep_analysis["basic"]["sentiment"],
-                            "polarity": deep_analysis["basic"]["polarity"],
-                            "subjectivity": deep_analysis["basic"]["subjectivity"],
-                            "type": "deep_analysis"
-                        }
-                        analysis_history.append(analysis_record)
+                        deep_analysis = await result_cache.results.fetch("deep", text)
+                        quick = await result_cache.results.fetch("quick", text) if deep_analysis is None else None
+                        if deep_analysis is not None:
+                            sentences = deep_analysis["sentences"]
+                            headline = deep_analysis["basic"]
+                        elif quick is not None:
+                            # The quick result already has the whole-text score; only split sentences
+                            sentences = await run_analysis(split_sentences, text)
+                            headline = quick
+                        else:
+                            headline = await run_analysis(outline_text, text)
+                            sentences = headline["sentences"] if headline is not None else None
+                        if sentences is None or run_id != deep_run[0]:
+                            return
+                        sentiment, emoji = sentiment_label(headline["polarity"])
+                        render_started = time.perf_counter()
                         
                         result_box.clear()
                         with result_box:
                             with ui.card().classes('glass-strong').style('padding:18px;margin-bottom:15px;'):
-                                ui.html(f"<div style='font-size:48px;text-align:center'>{deep_analysis['basic']['emoji']}</div>", sanitize=False)
-                                ui.label(f"📊 Deep Analysis: {deep_analysis['basic']['sentiment']}").classes('text-xl').style('font-weight:800;text-align:center;margin-top:6px;color:white;')
-                                ui.label(f"Polarity: {deep_analysis['basic']['polarity']:.3f} | Subjectivity: {deep_analysis['basic']['subjectivity']:.3f}").classes('text-sm text-white/60').style('text-align:center;')
+                                headline_emoji = ui.html(f"<div style='font-size:48px;text-align:center'>{emoji}</div>", sanitize=False)
+                                headline_title = ui.label(f"📊 Deep Analysis: {sentiment}").classes('text-xl').style('font-weight:800;text-align:center;margin-top:6px;color:white;')
+                                headline_scores = ui.label(f"Polarity: {headline['polarity']:.3f} | Subjectivity: {headline['subjectivity']:.3f}").classes('text-sm text-white/60').style('text-align:center;')
+                            
+                            stats_box = ui.column().classes('w-full')
+                            
+                            with ui.card().classes('glass-strong').style('padding:18px;margin-bottom:15px;'):
+                                ui.label("🔍 Sentence Analysis").classes('text-lg').style('font-weight:700;color:white;margin-bottom:10px;')
+                                progress = ui.label(f"Analyzing 0 of {len(sentences)} sentences...").classes('text-xs text-white/60')
+                                polarity_chart = ui.echart(polarity_chart_options(len(sentences), sentences if deep_analysis is not None else ())).classes('w-full').style('height:180px;')
+                                # Quasar only mounts the rows scrolled into view
+                                sentence_table = ui.table(rows=[], columns=SENTENCE_COLUMNS, row_key="number", pagination=0) \
+                                    .props('dense flat dark loading virtual-scroll hide-bottom :virtual-scroll-item-size="33"') \
+                                    .classes('w-full').style('height:300px;background:transparent;font-size:12px;margin-top:8px;')
+                                sentence_table.add_slot('body-cell-polarity', POLARITY_CELL)
+                            
+                            details_box = ui.column().classes('w-full')
+                        render_time = time.perf_counter() - render_started  # only the synchronous parts, not the waits
+                        
+                        if deep_analysis is None:
+                            # A window of batches in flight: the next one is submitted as the oldest finishes,
+                            # so other pages' analyses get their turn in the pool between them
+                            starts = iter(range(0, len(sentences), DEEP_BATCH_SIZE))
+                            batches = deque()
+                            length = sum(map(len, sentences))
+                            
+                            def submit_batch():
+                                i = next(starts, None)
+                                if i is not None:
+                                    batches.append(asyncio.ensure_future(
+                                        worker_pool.run(analyze_sentence_batch, sentences[i:i + DEEP_BATCH_SIZE], i + 1, True, None, length)))
+                            
+                            for _ in range(DEEP_BATCHES_IN_FLIGHT):
+                                submit_batch()
+                            partials = []
+                            try:
+                                while batches:
+                                    part = await batches.popleft()
+                                    if run_id != deep_run[0]:
+                                        return
+                                    submit_batch()
+                                    partials.append(part)
+                                    render_started = time.perf_counter()
+                                    chart_sentences(polarity_chart, part["sentences"])
+                                    progress.set_text(f"Analyzing {part['sentences'][-1]['number']} of {len(sentences)} sentences...")
+                                    render_time += time.perf_counter() - render_started
+                            except asyncio.TimeoutError:
+                                ui.notify("Analysis took too long — try a shorter text", type='negative')
+                                return
+                            except Exception as e:
+                                ui.notify(f"Analysis failed: {e}", type='negative')
+                                return
+                            finally:
+                                for batch in batches:
+                                    batch.cancel()
                             
+                            deep_analysis = finish_deep_analysis(merge_partials(partials), score=(headline["polarity"], headline["subjectivity"]))
+                            await result_cache.results.save("deep", text, deep_analysis)
+                        
+                        render_started = time.perf_counter()
+                        basic = deep_analysis["basic"]
+                        progress.set_visibility(False)
+                        sentence_table.update_rows(sentence_rows(deep_analysis["sentences"]))
+                        sentence_table.props(remove='loading')
+                        headline_emoji.set_content(f"<div style='font-size:48px;text-align:center'>{basic['emoji']}</div>")
+                        headline_title.set_text(f"📊 Deep Analysis: {basic['sentiment']}")
+                        headline_scores.set_text(f"Polarity: {basic['polarity']:.3f} | Subjectivity: {basic['subjectivity']:.3f}")
+                        
+                        record_analysis(text, basic, kind="deep_analysis")
+                        
+                        with stats_box:
                             with ui.card().classes('glass-strong').style('padding:18px;margin-bottom:15px;'):
                                 ui.label("📈 Text Statistics").classes('text-lg').style('font-weight:700;color:white;margin-bottom:10px;')
                                 stats = deep_analysis["statistics"]
@@ -412,17 +420,8 @@ with ui.column().classes('main-container'):
                                         with ui.card().classes('card-glass').style('padding:10px;min-width:100px;'):
                                             ui.label(label).classes('text-xs text-white/70').style('text-align:center;')
                                             ui.label(str(value)).classes('text-lg').style('font-weight:700;color:white;text-align:center;')
-                            
-                            with ui.card().classes('glass-strong').style('padding:18px;margin-bottom:15px;'):
-                                ui.label("🔍 Sentence Analysis").classes('text-lg').style('font-weight:700;color:white;margin-bottom:10px;')
-                                with ui.column().classes('gap-2').style('max-height:300px;overflow:auto;'):
-                                    for sentence in deep_analysis["sentences"][:5]:
-                                        sentiment_color = "rgba(34,197,94,0.2)" if sentence["polarity"] > 0.1 else "rgba(239,68,68,0.2)" if sentence["polarity"] < -0.1 else "rgba(107,114,128,0.2)"
-                                        with ui.card().style(f'padding:12px;background:{sentiment_color};border:1px solid rgba(255,255,255,0.1);'):
-                                            ui.label(f"Sentence {sentence['number']}").classes('text-xs text-white/70')
-                                            ui.label(sentence["text"]).classes('text-sm').style('color:white;margin:5px 0;')
-                                            ui.label(f"Polarity: {sentence['polarity']:.3f} | Words: {sentence['word_count']}").classes('text-xs text-white/60')
-                            
+                        
+                        with details_box:
                             with ui.row().classes('gap-4').style('flex-wrap:wrap;'):
                                 with ui.card().classes('glass-strong').style('padding:18px;flex:1;min-width:300px;'):
                                     ui.label("💡 Key Insights").classes('text-lg').style('font-weight:700;color:white;margin-bottom:10px;')
@@ -432,16 +431,17 @@ with ui.column().classes('main-container'):
                                 
                                 with ui.card().classes('glass-strong').style('padding:18px;flex:1;min-width:300px;'):
                                     ui.label("🏷️ Most Frequent Words").classes('text-lg').style('font-weight:700;color:white;margin-bottom:10px;')
-                                    with ui.row().classes('gap-2').style('flex-wrap:wrap;'):
-                                        for word, freq in deep_analysis["word_frequency"][:8]:
-                                            ui.html(f'<span style="padding:4px 8px;border-radius:12px;background:rgba(255,255,255,0.1);font-size:12px;color:white;">{word} ({freq})</span>', sanitize=False)
+                                    top_words = deep_analysis["word_frequency"][:TOP_WORDS_CHART]
+                                    ui.echart(word_chart_options(top_words)).classes('w-full').style(f'height:{24 * len(top_words) + 16}px;')
+                        render_time += time.perf_counter() - render_started
+                        metrics.observe_stage("render", "deep", render_time)
                         
-                        refresh_history_list()
-                        ui.notify(f"🧠 Deep Analysis Complete — {deep_analysis['basic']['sentiment']}", type='positive')
+                        ui.notify(f"🧠 Deep Analysis Complete — {basic['sentiment']}", type='positive')
 
                     ui.button("🔍 Quick Analyze", on_click=do_analyze).classes('btn-primary')
                     ui.button("🧠 Deep Analyze", on_click=do_deep_analyze).classes('btn-primary').style('background:linear-gradient(90deg,#8b5cf6,#a855f7);')
                     ui.button("🗑️ Clear", on_click=lambda: setattr(text_input, "value", "")).classes('btn-secondary')
+                    live_switch = ui.switch("⚡ Live", on_change=toggle_live).classes('text-white/80').tooltip("Analyze as you type")
 
             # Result container
             result_box = ui.column().classes('w-full').style('margin-top:12px;')
@@ -460,8 +460,8 @@ with ui.column().classes('main-container'):
                 ui.label("👤 Developer Profile").classes('text-base').style('font-weight:700;color:white;margin-bottom:15px;text-align:center;')
                 
                 with ui.column().classes('items-center').style('margin-bottom:15px;'):
-                    profile_datauri = read_profile_image_datauri(PROFILE_IMAGE)
-                    ui.html(f'<img src="{profile_datauri}" alt="profile" class="profile-img">', sanitize=False)
+                    profile_src, profile_srcset = static_assets.profile_image(PROFILE_IMAGE)
+                    ui.html(f'<img src="{profile_src}" srcset="{profile_srcset}" width="80" height="80" alt="profile" class="profile-img">', sanitize=False)
                     ui.label(NAME).classes('text-lg').style('font-weight:700;color:white;margin-top:10px;text-align:center;')
                     ui.label(TITLE).classes('text-sm text-white/70').style('line-height:1.4;text-align:center;margin-top:5px;')
                 
@@ -489,31 +489,137 @@ with ui.column().classes('main-container'):
             with ui.card().classes('card-glass'):
                 with ui.row().classes('items-center justify-between'):
                     ui.label("📈 Analysis History").classes('text-base').style('font-weight:700;color:white;')
-                    ui.button("🗑️", on_click=lambda: (analysis_history.clear(), refresh_history_list(), ui.notify("History cleared", type='warning'))).classes('btn-secondary').style('padding:4px 8px;font-size:12px;')
+                    with ui.row().classes('gap-1'):
+                        ui.button("📜", on_click=lambda: toggle_history_view()).classes('btn-secondary').style('padding:4px 8px;font-size:12px;').tooltip("Show all")
+                        ui.button("🗑️", on_click=lambda: (clear_history(), ui.notify("History cleared", type='warning'))).classes('btn-secondary').style('padding:4px 8px;font-size:12px;')
                 history_list = ui.column().classes('gap-2').style('margin-top:8px;max-height:300px;overflow:auto;')
+                history_full = ui.column().classes('w-full').style('margin-top:8px;')
+                history_full.visible = False
+
+def history_placeholder():
+    with history_list:
+        ui.html('<div style="color:rgba(255,255,255,0.5);padding:12px;text-align:center;font-size:12px;">No analyses yet<br>Try the examples above!</div>', sanitize=False)
 
-def refresh_history_list():
+def render_history_row(entry):
+    """Build one history row at the top of the compact list"""
+    analysis_type = entry.kind
+    icon = '🧠' if analysis_type == 'deep_analysis' else '🔍'
+    bg_color = 'rgba(139,92,246,0.1)' if analysis_type == 'deep_analysis' else 'rgba(255,255,255,0.03)'
+    
+    with history_list:
+        with ui.row().classes('items-start gap-2').style(f'padding:8px;border-radius:8px;background:{bg_color};margin-bottom:6px;border-left:3px solid {"#8b5cf6" if analysis_type == "deep_analysis" else "#64748b"};') as row:
+            ui.label(icon).style('font-size:14px;margin-top:2px;')
+            with ui.column().classes('flex-1').style('min-width:0;'):
+                ui.label(entry.preview).classes('text-xs').style('font-weight:600;color:white;line-height:1.3;')
+                ui.label(f"{entry.sentiment} • {entry.polarity:.2f}").classes('text-xs text-white/60').style('margin-top:2px;')
+                ui.label(entry.time_label).classes('text-xs text-white/40').style('margin-top:1px;')
+    row.move(history_list, target_index=0)
+    history_rows[entry] = row
+
+def history_table_row(entry):
+    return {
+        "id": f"{entry.timestamp:.6f}-{entry.digest}",
+        "icon": '🧠' if entry.kind == 'deep_analysis' else '🔍',
+        "text": entry.preview,
+        "sentiment": f"{entry.sentiment} • {entry.polarity:.2f}",
+        "time": entry.time_label,
+    }
+
+def add_history_row(entry):
+    """Keyed update: add the new entry's row and drop the oldest, leaving the other rows untouched"""
+    if not history_rows:
+        history_list.clear()  # the "no analyses yet" placeholder
+    render_history_row(entry)
+    while len(history_rows) > HISTORY_ROWS:
+        _, oldest = history_rows.popitem(last=False)
+        history_list.remove(oldest)
+    table = history_table[0]
+    if table is not None:
+        table.rows.insert(0, history_table_row(entry))
+        if history_log.log is None:
+            del table.rows[histories.per_session:]
+        table.update()
+
+def clear_history():
+    write_history(histories.clear, session_id)
+    if history_log.log is not None:
+        # The log is append-only: mark where this session's history now starts
+        write_history(history_log.log.append, {"timestamp": datetime.now().isoformat(), "session": history_key, "type": "cleared"})
+        if history_table[0] is not None:
+            history_paging["done"] = True  # an open full view gets the new records as they come
+    history_rows.clear()
     history_list.clear()
-    if not analysis_history:
-        with history_list:
-            ui.html('<div style="color:rgba(255,255,255,0.5);padding:12px;text-align:center;font-size:12px;">No analyses yet<br>Try the examples above!</div>', sanitize=False)
+    history_placeholder()
+    if history_table[0] is not None:
+        history_table[0].rows.clear()
+        history_table[0].update()
+
+def history_log_row(record):
+    """history_table_row() for a record read back from the history log"""
+    entry = HistoryRecord(record["text"], record["sentiment"], record["polarity"], record["subjectivity"],
+                          kind=record.get("type", "quick"), timestamp=datetime.fromisoformat(record["timestamp"]).timestamp())
+    return history_table_row(entry)
+
+async def load_history_page():
+    """Add the next page of this session's records in the history log to the bottom of the full view"""
+    if history_paging["done"] or history_paging["loading"]:
         return
-    
-    for entry in reversed(analysis_history[-6:]):
-        analysis_type = entry.get('type', 'quick')
-        icon = '🧠' if analysis_type == 'deep_analysis' else '🔍'
-        bg_color = 'rgba(139,92,246,0.1)' if analysis_type == 'deep_analysis' else 'rgba(255,255,255,0.03)'
-        
-        with history_list:
-            with ui.row().classes('items-start gap-2').style(f'padding:8px;border-radius:8px;background:{bg_color};margin-bottom:6px;border-left:3px solid {"#8b5cf6" if analysis_type == "deep_analysis" else "#64748b"};'):
-                ui.label(icon).style('font-size:14px;margin-top:2px;')
-                with ui.column().classes('flex-1').style('min-width:0;'):
-                    ui.label(entry['text'][:60] + ('...' if len(entry['text'])>60 else '')).classes('text-xs').style('font-weight:600;color:white;line-height:1.3;')
-                    ui.label(f"{entry['sentiment']} • {entry['polarity']:.2f}").classes('text-xs text-white/60').style('margin-top:2px;')
-                    ui.label(entry['timestamp'].split('T')[-1].split('.')[0]).classes('text-xs text-white/40').style('margin-top:1px;')
-
-# Initialize history
-refresh_history_list()
+    history_paging["loading"] = True
+    try:
+        records = await asyncio.to_thread(history_log.log.page, history_paging["before"], HISTORY_PAGE, history_key)
+    finally:
+        history_paging["loading"] = False
+    table = history_table[0]
+    if records and not history_paging["done"]:
+        history_paging["before"] = datetime.fromisoformat(records[-1]["timestamp"])
+        table.rows.extend(history_log_row(record) for record in records)
+    history_paging["done"] = history_paging["done"] or len(records) < HISTORY_PAGE
+    table.props(remove='loading')
+    table.update()
+
+async def history_scrolled(e):
+    # Read further back in the log as the view nears its last loaded row
+    if e.args["to"] >= len(history_table[0].rows) - HISTORY_PAGE // 2:
+        await load_history_page()
+
+async def toggle_history_view():
+    """Switch between the compact list and a virtual-scroll table over the whole session history:
+    the history log when it is enabled (read a page at a time as the user scrolls), else the ring buffer"""
+    rows = []
+    if history_table[0] is None and history_log.log is None:
+        rows = [history_table_row(entry) for entry in reversed((await read_history()).records)]
+    if history_table[0] is None:
+        columns = [
+            {"name": "icon", "label": "", "field": "icon", "align": "left"},
+            {"name": "text", "label": "Text", "field": "text", "align": "left", "style": "white-space:normal;"},
+            {"name": "sentiment", "label": "Sentiment", "field": "sentiment", "align": "left"},
+            {"name": "time", "label": "Time", "field": "time", "align": "left"},
+        ]
+        with history_full:
+            # Quasar only mounts the rows scrolled into view
+            history_table[0] = ui.table(rows=rows, columns=columns, row_key="id", pagination=0) \
+                .props('dense flat dark virtual-scroll hide-bottom :virtual-scroll-item-size="33"') \
+                .classes('w-full').style('height:300px;background:transparent;font-size:12px;')
+        if history_log.log is not None:
+            history_table[0].props('loading').on('virtual-scroll', history_scrolled, args=['to'])
+    history_full.visible = not history_full.visible
+    history_list.visible = not history_full.visible
+    if history_log.log is not None and history_full.visible and not history_table[0].rows:
+        await load_history_page()
+
+async def load_history():
+    """Fill the compact list from the stored history, unless this page has added to it already"""
+    history = await read_history()
+    if history_rows:
+        return
+    history_list.clear()
+    for entry in reversed(history.recent(HISTORY_ROWS)):
+        render_history_row(entry)
+    if not history_rows:
+        history_placeholder()
+
+# Initialize history (the shared store is read off the event loop)
+ui.timer(0, load_history, once=True)
 
 # Footer
 ui.html(f'''
@@ -522,6 +628,21 @@ ui.html(f'''
     </div>
 ''', sanitize=False)
 
-# Run the app
+startup.configure_nltk()
+startup.register_endpoints()
+app.on_startup(startup.begin)
+# Build the static assets once, before the first visitor
+app.on_startup(static_assets.head_html)
+app.on_startup(lambda: static_assets.profile_image(PROFILE_IMAGE))
+app.on_shutdown(worker_pool.shutdown)
+app.on_shutdown(result_cache.results.close)
+app.on_shutdown(state.store.close)
+if history_log.log is not None:
+    app.on_shutdown(history_log.log.close)
+
+# Run the app (server.py runs its app processes with SERVER_WORKER set: internal port, no reload)
 if __name__ in {"__main__", "__mp_main__"}:
-    ui.run(title="Sentiment Reader — Senith", port=8080, reload=True)
+    server_worker = os.environ.get("SERVER_WORKER")
+    ui.run(title="Sentiment Reader — Senith", host="127.0.0.1" if server_worker else None,
+           port=int(os.environ.get("PORT", "8080")), reload=not server_worker, show=not server_worker,
+           storage_secret=os.environ.get("STORAGE_SECRET") or secrets.token_hex(16))
@@ -4,11 +4,12 @@
 # Install: pip install nicegui textblob
 
 from nicegui import ui
-from textblob import TextBlob
+from analyzer import analyze_text_blob, deep_analyze_text
 from datetime import datetime
 import json
 import base64
 from io import BytesIO
+import history_log
 
 # ---------- CONFIG ----------
 PROFILE_IMAGE = 'image.png'  # <-- place your image file here (image.png) or change path
@@ -25,112 +26,10 @@ LINKS = [
 analysis_history = []  # list of dicts: {timestamp, text, sentiment, polarity, subjectivity}
 
 # ---------- UTILITIES ----------
-def analyze_text_blob(text: str):
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    # category
-    if polarity > 0.1:
-        sentiment = "Positive"
-        emoji = "😊"
-    elif polarity < -0.1:
-        sentiment = "Negative"
-        emoji = "😔"
-    else:
-        sentiment = "Neutral"
-        emoji = "😐"
-    # key phrases (simple)
-    try:
-        key_phrases = [w.lower() for w, pos in blob.tags if pos.startswith(("NN","JJ"))]
-    except Exception:
-        key_phrases = [w.lower() for w in blob.words if len(w) > 3]
-    result = {
-        "sentiment": sentiment,
-        "emoji": emoji,
-        "polarity": polarity,
-        "polarity_percent": ((polarity + 1) / 2) * 100,
-        "subjectivity": subjectivity,
-        "subjectivity_label": "Subjective" if subjectivity > 0.5 else "Objective",
-        "word_count": len(blob.words),
-        "sentence_count": len(blob.sentences),
-        "key_phrases": list(dict.fromkeys(key_phrases))[:10],  # preserve order unique
-    }
-    return result
-
-def save_history_to_file():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"sentiment_history_{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(analysis_history, f, ensure_ascii=False, indent=2)
-    return filename
-
-def deep_analyze_text(text: str):
-    """Perform comprehensive deep analysis of the text"""
-    blob = TextBlob(text)
-    
-    # Basic analysis
-    basic_analysis = analyze_text_blob(text)
-    
-    # Advanced metrics
-    sentences = list(blob.sentences)
-    words = list(blob.words)
-    
-    # Sentence-by-sentence analysis
-    sentence_analysis = []
-    for i, sentence in enumerate(sentences, 1):
-        sent_blob = TextBlob(str(sentence))
-        sentence_analysis.append({
-            "number": i,
-            "text": str(sentence),
-            "polarity": sent_blob.sentiment.polarity,
-            "subjectivity": sent_blob.sentiment.subjectivity,
-            "word_count": len(sent_blob.words)
-        })
-    
-    # Word frequency analysis
-    word_freq = {}
-    for word in words:
-        word_lower = word.lower()
-        if len(word_lower) > 2:  # Skip short words
-            word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
-    
-    # Sort by frequency
-    top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    # Emotional intensity analysis
-    positive_sentences = [s for s in sentence_analysis if s["polarity"] > 0.1]
-    negative_sentences = [s for s in sentence_analysis if s["polarity"] < -0.1]
-    neutral_sentences = [s for s in sentence_analysis if -0.1 <= s["polarity"] <= 0.1]
-    
-    # Calculate various metrics
-    avg_sentence_length = sum(len(s.words) for s in sentences) / len(sentences) if sentences else 0
-    complexity_score = sum(s["subjectivity"] for s in sentence_analysis) / len(sentence_analysis) if sentence_analysis else 0
-    
-    # Overall sentiment confidence
-    polarities = [s["polarity"] for s in sentence_analysis]
-    sentiment_consistency = 1 - (sum(abs(p - basic_analysis["polarity"]) for p in polarities) / len(polarities)) if polarities else 0
-    
-    return {
-        "basic": basic_analysis,
-        "sentences": sentence_analysis,
-        "word_frequency": top_words,
-        "statistics": {
-            "total_sentences": len(sentences),
-            "total_words": len(words),
-            "avg_sentence_length": round(avg_sentence_length, 2),
-            "complexity_score": round(complexity_score, 3),
-            "sentiment_consistency": round(max(0, sentiment_consistency), 3),
-            "positive_sentences": len(positive_sentences),
-            "negative_sentences": len(negative_sentences),
-            "neutral_sentences": len(neutral_sentences)
-        },
-        "insights": {
-            "dominant_emotion": "Positive" if len(positive_sentences) > len(negative_sentences) else "Negative" if len(negative_sentences) > len(positive_sentences) else "Neutral",
-            "emotional_range": round(max(polarities) - min(polarities), 3) if polarities else 0,
-            "subjectivity_level": "High" if complexity_score > 0.6 else "Medium" if complexity_score > 0.3 else "Low",
-            "consistency_level": "High" if sentiment_consistency > 0.7 else "Medium" if sentiment_consistency > 0.4 else "Low"
-        }
-    }
+def save_history_to_file(record):
+    """Append one analysis record to the append-only history log (see history_log.py)"""
+    if history_log.log is not None:
+        history_log.log.append(record)
 
 def read_profile_image_datauri(path):
     try:
@@ -370,6 +269,7 @@ with ui.column().classes('main-container'):
                             "subjectivity": analysis["subjectivity"]
                         }
                         analysis_history.append(analysis_record)
+                        save_history_to_file(analysis_record)
                         # render result card
                         result_box.clear()
                         with result_box:
@@ -423,6 +323,7 @@ with ui.column().classes('main-container'):
                         "type": "deep_analysis"
                     }
                     analysis_history.append(analysis_record)
+                    save_history_to_file(analysis_record)
                     
                     # Show comprehensive results
                     result_box.clear()
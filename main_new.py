@@ -3,7 +3,7 @@
 # Requirements: nicegui, textblob
 
 from nicegui import ui
-from textblob import TextBlob
+from analyzer import analyze_text_blob, deep_analyze_text
 from datetime import datetime
 import json
 import base64
@@ -24,100 +24,6 @@ LINKS = [
 analysis_history = []
 
 # ---------- UTILITIES ----------
-def analyze_text_blob(text: str):
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
-    subjectivity = blob.sentiment.subjectivity
-    
-    if polarity > 0.1:
-        sentiment = "Positive"
-        emoji = "😊"
-    elif polarity < -0.1:
-        sentiment = "Negative"
-        emoji = "😔"
-    else:
-        sentiment = "Neutral"
-        emoji = "😐"
-    
-    try:
-        key_phrases = [w.lower() for w, pos in blob.tags if pos.startswith(("NN","JJ"))]
-    except Exception:
-        key_phrases = [w.lower() for w in blob.words if len(w) > 3]
-    
-    return {
-        "sentiment": sentiment,
-        "emoji": emoji,
-        "polarity": polarity,
-        "polarity_percent": ((polarity + 1) / 2) * 100,
-        "subjectivity": subjectivity,
-        "subjectivity_label": "Subjective" if subjectivity > 0.5 else "Objective",
-        "word_count": len(blob.words),
-        "sentence_count": len(blob.sentences),
-        "key_phrases": list(dict.fromkeys(key_phrases))[:10],
-    }
-
-def deep_analyze_text(text: str):
-    """Perform comprehensive deep analysis of the text"""
-    blob = TextBlob(text)
-    basic_analysis = analyze_text_blob(text)
-    
-    sentences = list(blob.sentences)
-    words = list(blob.words)
-    
-    # Sentence-by-sentence analysis
-    sentence_analysis = []
-    for i, sentence in enumerate(sentences, 1):
-        sent_blob = TextBlob(str(sentence))
-        sentence_analysis.append({
-            "number": i,
-            "text": str(sentence),
-            "polarity": sent_blob.sentiment.polarity,
-            "subjectivity": sent_blob.sentiment.subjectivity,
-            "word_count": len(sent_blob.words)
-        })
-    
-    # Word frequency analysis
-    word_freq = {}
-    for word in words:
-        word_lower = word.lower()
-        if len(word_lower) > 2:
-            word_freq[word_lower] = word_freq.get(word_lower, 0) + 1
-    
-    top_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
-    
-    # Analysis metrics
-    positive_sentences = [s for s in sentence_analysis if s["polarity"] > 0.1]
-    negative_sentences = [s for s in sentence_analysis if s["polarity"] < -0.1]
-    neutral_sentences = [s for s in sentence_analysis if -0.1 <= s["polarity"] <= 0.1]
-    
-    avg_sentence_length = sum(len(s.words) for s in sentences) / len(sentences) if sentences else 0
-    complexity_score = sum(s["subjectivity"] for s in sentence_analysis) / len(sentence_analysis) if sentence_analysis else 0
-    
-    polarities = [s["polarity"] for s in sentence_analysis]
-    sentiment_consistency = 1 - (sum(abs(p - basic_analysis["polarity"]) for p in polarities) / len(polarities)) if polarities else 0
-    
-    return {
-        "basic": basic_analysis,
-        "sentences": sentence_analysis,
-        "word_frequency": top_words,
-        "statistics": {
-            "total_sentences": len(sentences),
-            "total_words": len(words),
-            "avg_sentence_length": round(avg_sentence_length, 2),
-            "complexity_score": round(complexity_score, 3),
-            "sentiment_consistency": round(max(0, sentiment_consistency), 3),
-            "positive_sentences": len(positive_sentences),
-            "negative_sentences": len(negative_sentences),
-            "neutral_sentences": len(neutral_sentences)
-        },
-        "insights": {
-            "dominant_emotion": "Positive" if len(positive_sentences) > len(negative_sentences) else "Negative" if len(negative_sentences) > len(positive_sentences) else "Neutral",
-            "emotional_range": round(max(polarities) - min(polarities), 3) if polarities else 0,
-            "subjectivity_level": "High" if complexity_score > 0.6 else "Medium" if complexity_score > 0.3 else "Low",
-            "consistency_level": "High" if sentiment_consistency > 0.7 else "Medium" if sentiment_consistency > 0.4 else "Low"
-        }
-    }
-
 def read_profile_image_datauri(path):
     try:
         with open(path, "rb") as f:
@@ -0,0 +1,103 @@
+# metrics.py
+# Stage timers, latency histograms and gauges, exposed on /metrics in the Prometheus text format
+#
+# Analysis code wraps its stages in `with metrics.stage("split"):`. The time adds up per process;
+# worker_pool returns a job's stage times along with its result, and the server records them
+# per analysis type. No NiceGUI imports here, so worker processes can use it too.
+
+import bisect
+import threading
+import time
+
+# ---------- CONFIG ----------
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_HISTOGRAM = "analyzer_stage_seconds"
+
+# ---------- STATE ----------
+_stage_seconds = {}  # stage -> seconds spent in this process since the last collect_stages()
+_histograms = {}     # (name, labels) -> [count per bucket..., +Inf count, sum]
+_help = {STAGE_HISTOGRAM: "Time spent per analysis stage (queue is the wait for a worker)"}
+_gauges = []         # (name, help, type, fn) read at scrape time
+_lock = threading.Lock()
+
+# ---------- TIMING ----------
+class stage:
+    """`with stage("name"):` adds the block's duration to this process's pending stage times"""
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _stage_seconds[self.name] = _stage_seconds.get(self.name, 0.0) + time.perf_counter() - self.started
+
+def add_stage(name, seconds):
+    _stage_seconds[name] = _stage_seconds.get(name, 0.0) + seconds
+
+def collect_stages():
+    """Stage times since the last call, and start over"""
+    stages = dict(_stage_seconds)
+    _stage_seconds.clear()
+    return stages
+
+# ---------- RECORDING ----------
+def observe(name, labels, seconds):
+    """Record one value in the histogram name{labels}; labels is a tuple of (key, value) pairs"""
+    index = bisect.bisect_left(BUCKETS, seconds)
+    with _lock:
+        histogram = _histograms.get((name, labels))
+        if histogram is None:
+            histogram = _histograms[(name, labels)] = [0] * (len(BUCKETS) + 1) + [0.0]
+        histogram[index] += 1
+        histogram[-1] += seconds
+
+def observe_stage(stage_name, kind, seconds):
+    observe(STAGE_HISTOGRAM, (("stage", stage_name), ("kind", kind)), seconds)
+
+def observe_stages(stages, kind):
+    for stage_name, seconds in stages.items():
+        observe_stage(stage_name, kind, seconds)
+
+def gauge(name, help, fn, type="gauge"):
+    """Expose fn() at scrape time: a number, or a dict of {labels tuple: number}"""
+    _gauges.append((name, help, type, fn))
+
+# ---------- EXPOSITION ----------
+def _labels(labels, extra=()):
+    pairs = tuple(labels) + tuple(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def render():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    with _lock:
+        histograms = sorted((key, list(values)) for key, values in _histograms.items())
+    current = None
+    for (name, labels), values in histograms:
+        if name != current:
+            current = name
+            lines.append(f"# HELP {name} {_help.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), values):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, (('le', bound),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {values[-1]:.6f}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    for name, help, type, fn in _gauges:
+        try:
+            value = fn()
+        except Exception:
+            continue  # a broken gauge shouldn't take the whole scrape down
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {type}")
+        for labels, v in (value.items() if isinstance(value, dict) else [((), value)]):
+            lines.append(f"{name}{_labels(labels)} {v}")
+    return "\n".join(lines) + "\n"
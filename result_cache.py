@@ -0,0 +1,213 @@
+# result_cache.py
+# Bounded LRU cache of analysis results, keyed by a hash of the analyzed text
+#
+# Environment:
+#   RESULT_CACHE_ENTRIES  maximum number of cached results (default: 512)
+#   RESULT_CACHE_BYTES    approximate memory budget in bytes (default: 32 MB)
+#   RESULT_CACHE_TTL      seconds a result is kept in a shared STATE_BACKEND (default: 7 days)
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+
+import disk_cache
+import metrics
+import state
+from analyzer import ANALYZER_VERSION
+
+# ---------- CONFIG ----------
+MAX_ENTRIES = int(os.environ.get("RESULT_CACHE_ENTRIES", "512"))
+MAX_BYTES = int(os.environ.get("RESULT_CACHE_BYTES", str(32 * 1024 * 1024)))
+SHARED_TTL = int(os.environ.get("RESULT_CACHE_TTL", str(7 * 24 * 3600)))
+
+# ---------- CACHE ----------
+def normalize_text(text: str):
+    """Canonical form used for cache keys: NFC, LF line endings, no surrounding whitespace"""
+    return unicodedata.normalize("NFC", text).replace("\r\n", "\n").strip()
+
+def text_key(kind: str, text: str):
+    return kind, hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+def approx_size(result):
+    """Approximate memory cost of a result by its JSON encoding"""
+    return len(json.dumps(result, ensure_ascii=False, default=str))
+
+class ResultCache:
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, backing=None):
+        self.backing = backing  # optional persistent store consulted on a miss
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()  # key -> (result, size)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, kind: str, text: str):
+        return self.get_many(kind, [text])[0]
+
+    def get_many(self, kind: str, texts):
+        """Results for texts, None where there is none; the ones not in memory take one backing lookup"""
+        keys = [text_key(kind, text) for text in texts]
+        results = self._lookup(keys)
+        self._lookup_backing(kind, keys, results)
+        return results
+
+    async def fetch(self, kind: str, text: str):
+        return (await self.fetch_many(kind, [text]))[0]
+
+    async def fetch_many(self, kind: str, texts):
+        """get_many() for the event loop: memory hits right away, the backing store's lookup in a thread"""
+        keys = [text_key(kind, text) for text in texts]
+        results = self._lookup(keys)
+        if self.backing is not None and None in results:
+            await asyncio.to_thread(self._lookup_backing, kind, keys, results)
+        return results
+
+    def put(self, kind: str, text: str, result):
+        self.put_many(kind, [(text, result)])
+
+    def put_many(self, kind: str, items):
+        """Store (text, result) pairs, in the backing store with one write"""
+        keyed = [(text_key(kind, text), result) for text, result in items]
+        for key, result in keyed:
+            self._store(key, result)
+        self._put_backing(kind, keyed)
+
+    async def save(self, kind: str, text: str, result):
+        await self.save_many(kind, [(text, result)])
+
+    async def save_many(self, kind: str, items):
+        """put_many() for the event loop: the backing store's write runs in a thread"""
+        keyed = [(text_key(kind, text), result) for text, result in items]
+        for key, result in keyed:
+            self._store(key, result)
+        if self.backing is not None:
+            await asyncio.to_thread(self._put_backing, kind, keyed)
+
+    def _lookup(self, keys):
+        results = []
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                results.append(entry and entry[0])
+        return results
+
+    def _lookup_backing(self, kind, keys, results):
+        """Fill in the None results from the backing store"""
+        missing = [i for i, result in enumerate(results) if result is None]
+        if self.backing is None or not missing:
+            return
+        for i, result in zip(missing, self.backing.get_many(kind, [keys[i][1] for i in missing])):
+            if result is not None:
+                self._store(keys[i], result)
+                results[i] = result
+
+    def _put_backing(self, kind, keyed):
+        if self.backing is not None:
+            self.backing.put_many(kind, [(key[1], result) for key, result in keyed])
+
+    def _store(self, key, result):
+        size = approx_size(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (result, size)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def close(self):
+        if self.backing is not None:
+            self.backing.close()
+
+    def stats(self):
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+        if self.backing is not None:
+            stats["disk"] = self.backing.stats()
+        return stats
+
+class SharedResults:
+    """Backing store on the shared state store, so a result computed by one app process is reused
+    by the others; an unreachable store counts as a miss"""
+
+    def __init__(self, store, version, ttl=SHARED_TTL):
+        self.store = store
+        self.version = version
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get_many(self, kind: str, digests):
+        """Results for digests (None where missing), in one store request"""
+        try:
+            values = self.store.get_many([f"result:{self.version}:{kind}:{digest}" for digest in digests])
+        except state.StateError:
+            self.errors += 1
+            values = [None] * len(digests)
+        found = sum(value is not None for value in values)
+        self.hits += found
+        self.misses += len(values) - found
+        return [None if value is None else json.loads(value) for value in values]
+
+    def put_many(self, kind: str, items):
+        """Store (digest, result) pairs in one store request"""
+        try:
+            self.store.set_many([(f"result:{self.version}:{kind}:{digest}", json.dumps(result, ensure_ascii=False))
+                                 for digest, result in items], self.ttl)
+        except state.StateError:
+            self.errors += 1
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    def close(self):
+        pass  # the store is shared with the history; the app closes it on shutdown
+
+def open_backing():
+    """The SQLite disk cache when ANALYSIS_CACHE_DB is set, else a shared STATE_BACKEND, else none"""
+    backing = disk_cache.open_from_env(ANALYZER_VERSION)
+    if backing is None and state.store.shared:
+        backing = SharedResults(state.store, ANALYZER_VERSION)
+    return backing
+
+# Shared by every client of this process
+results = ResultCache(backing=open_backing())
+
+metrics.gauge("analyzer_cache_hits_total", "Result cache lookups answered from memory", lambda: results.hits, type="counter")
+metrics.gauge("analyzer_cache_misses_total", "Result cache lookups not in memory", lambda: results.misses, type="counter")
+metrics.gauge("analyzer_cache_hit_ratio", "Share of result cache lookups answered from memory",
+              lambda: round(results.hits / ((results.hits + results.misses) or 1), 4))
+metrics.gauge("analyzer_cache_entries", "Results held in the memory cache", lambda: len(results))
+metrics.gauge("analyzer_cache_bytes", "Approximate size of the memory cache", lambda: results.bytes)
@@ -0,0 +1,182 @@
+# server.py
+# Production server: several app processes behind one port, each browser pinned to one of them
+#
+# NiceGUI keeps a page's elements in the process that built it, and the page's websocket has to
+# reach that same process, so a plain multi-worker uvicorn can't serve it. Instead this starts
+# WEB_WORKERS copies of main.py on internal ports and forwards connections to them: a browser's
+# first request goes to the worker with the fewest open connections, and a cookie pins every
+# later request and websocket of that browser to the same worker. A worker that exits is
+# restarted; its browsers are re-pinned and their pages reload.
+#
+# Usage: python main.py serve [--workers N] [--port PORT] [--host HOST]
+#
+# Environment:
+#   WEB_WORKERS       app processes (default: CPU count)
+#   PORT              public port (default: 8080)
+#   STATE_BACKEND     see state.py; defaults to sqlite:///state.sqlite3 here when there is more than one worker
+#   ANALYZER_WORKERS  analysis processes per app process (default: CPU count / WEB_WORKERS, at least 1)
+#   STORAGE_SECRET    signs the session cookie; generated once and shared by the workers when unset
+
+import argparse
+import asyncio
+import os
+import secrets
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+# ---------- CONFIG ----------
+ROOT = os.path.dirname(os.path.abspath(__file__))
+WORKERS = max(1, int(os.environ.get("WEB_WORKERS", os.cpu_count() or 1)))
+PORT = int(os.environ.get("PORT", "8080"))
+STICKY_COOKIE = "app_worker"
+MAX_HEAD_BYTES = 64 * 1024   # request/response heads larger than this are refused
+RESTART_DELAY = 1.0          # seconds before a crashed worker is started again
+CHUNK = 64 * 1024
+
+# ---------- WORKERS ----------
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Worker:
+    """One app process on an internal port"""
+
+    def __init__(self, index, env):
+        self.index = index
+        self.env = env
+        self.port = free_port()
+        self.process = None
+        self.connections = 0
+
+    def start(self):
+        env = {**self.env, "PORT": str(self.port), "SERVER_WORKER": str(self.index)}
+        self.process = subprocess.Popen([sys.executable, os.path.join(ROOT, "main.py")], cwd=ROOT, env=env)
+
+    @property
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.alive:
+            self.process.terminate()
+
+def worker_env(workers):
+    env = dict(os.environ)
+    env.setdefault("STORAGE_SECRET", secrets.token_hex(16))
+    env.setdefault("ANALYZER_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+    if workers > 1:
+        env.setdefault("STATE_BACKEND", f"sqlite:///{os.path.join(ROOT, 'state.sqlite3')}")
+    return env
+
+async def supervise(workers, stopping):
+    while not stopping.is_set():
+        for worker in workers:
+            if not worker.alive:
+                print(f"Worker {worker.index} exited with code {worker.process.returncode}; restarting", flush=True)
+                worker.start()
+        try:
+            await asyncio.wait_for(stopping.wait(), RESTART_DELAY)
+        except asyncio.TimeoutError:
+            pass
+
+# ---------- PROXY ----------
+def sticky_worker(head):
+    """Index of the worker named by the request's sticky cookie, or None"""
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.strip().lower() == b"cookie":
+            for cookie in value.split(b";"):
+                key, _, index = cookie.strip().partition(b"=")
+                if key == STICKY_COOKIE.encode() and index.isdigit():
+                    return int(index)
+    return None
+
+async def pipe(reader, writer):
+    try:
+        while data := await reader.read(CHUNK):
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        if not writer.is_closing():
+            writer.close()
+
+async def pin_response(reader, writer, index):
+    """Forward the response head with the sticky cookie added, then the rest of the stream"""
+    head = await reader.readuntil(b"\r\n\r\n")
+    cookie = f"Set-Cookie: {STICKY_COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode()
+    writer.write(head[:-2] + cookie + b"\r\n")
+    await pipe(reader, writer)
+
+def make_handler(workers):
+    async def handle(client_reader, client_writer):
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            return
+        index = sticky_worker(head)
+        pinned = index is not None and index < len(workers) and workers[index].alive
+        if not pinned:
+            alive = [worker for worker in workers if worker.alive] or workers
+            index = min(alive, key=lambda worker: worker.connections).index
+        worker = workers[index]
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port, limit=MAX_HEAD_BYTES)
+        except OSError:
+            client_writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            client_writer.close()
+            return
+        worker.connections += 1
+        try:
+            upstream_writer.write(head)
+            downstream = pin_response(upstream_reader, client_writer, index) if not pinned else pipe(upstream_reader, client_writer)
+            await asyncio.gather(pipe(client_reader, upstream_writer), downstream, return_exceptions=True)
+        finally:
+            worker.connections -= 1
+            for writer in (upstream_writer, client_writer):
+                if not writer.is_closing():
+                    writer.close()
+    return handle
+
+# ---------- MAIN ----------
+async def serve(host, port, count):
+    env = worker_env(count)
+    workers = [Worker(i, env) for i in range(count)]
+    for worker in workers:
+        worker.start()
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+    server = await asyncio.start_server(make_handler(workers), host, port, limit=MAX_HEAD_BYTES)
+    print(f"Serving on http://{host}:{port} with {count} workers "
+          f"(state: {env.get('STATE_BACKEND', 'memory')}, analysis processes per worker: {env['ANALYZER_WORKERS']})", flush=True)
+    supervisor = asyncio.create_task(supervise(workers, stopping))
+    await stopping.wait()
+    server.close()
+    await supervisor
+    for worker in workers:
+        worker.stop()
+    deadline = time.monotonic() + 10
+    for worker in workers:
+        try:
+            worker.process.wait(max(0.1, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            worker.process.kill()
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several app processes behind one port with sticky sessions")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="app processes (default: WEB_WORKERS or CPU count)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=PORT, help="public port (default: PORT or 8080)")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, max(1, args.workers)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# startup.py
+# Cold start: local NLTK corpora, background warm-up and the /healthz, /readyz and /metrics endpoints
+#
+# Environment:
+#   NLTK_DATA_DIR  directory holding the NLTK corpora, filled at build time (default: ./nltk_data)
+#
+# Build step (see railway.json):  python startup.py download
+
+import os
+import sys
+import threading
+import time
+
+# ---------- CONFIG ----------
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+NLTK_DATA_DIR = os.environ.get("NLTK_DATA_DIR", os.path.join(APP_DIR, "nltk_data"))
+CORPORA = {  # NLTK package -> resource the analyzer loads from it
+    "punkt_tab": "tokenizers/punkt_tab/english/",
+    "averaged_perceptron_tagger_eng": "taggers/averaged_perceptron_tagger_eng/",
+}
+
+# ---------- STATE ----------
+STARTED = time.monotonic()  # process start, as far as Python can tell
+status = {
+    "phase": "starting",    # starting -> warming -> ready (or failed)
+    "stages": {},           # stage -> seconds
+    "ready_after": None,    # seconds from process start to ready
+    "missing_corpora": [],
+    "error": None,
+}
+_endpoints = []  # routes are registered once, not on every script re-execution
+
+# ---------- CORPORA ----------
+def configure_nltk():
+    """Put NLTK_DATA_DIR first on NLTK's search path, here and in worker processes spawned later"""
+    paths = os.environ.get("NLTK_DATA", "")
+    if NLTK_DATA_DIR not in paths.split(os.pathsep):
+        os.environ["NLTK_DATA"] = os.pathsep.join(p for p in (NLTK_DATA_DIR, paths) if p)
+    if "nltk" in sys.modules:
+        import nltk
+        if NLTK_DATA_DIR not in nltk.data.path:
+            nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+def missing_corpora():
+    import nltk
+    missing = []
+    for package, resource in CORPORA.items():
+        try:
+            nltk.data.find(resource)
+        except LookupError:
+            missing.append(package)
+    return missing
+
+def ensure_corpora(download=False):
+    """Return the corpora still missing; only touches the network when download is set and something is missing"""
+    configure_nltk()
+    missing = missing_corpora()
+    if missing and download:
+        import nltk
+        os.makedirs(NLTK_DATA_DIR, exist_ok=True)
+        for package in missing:
+            nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+        missing = missing_corpora()
+    return missing
+
+# ---------- WARM-UP ----------
+def _timed(stage, fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    status["stages"][stage] = round(time.perf_counter() - t0, 4)
+    return result
+
+def _warm_up():
+    import worker_pool
+    try:
+        # A corpus directory from the build step means no network calls; without one, fetch what's missing
+        status["missing_corpora"] = _timed("corpora", ensure_corpora, not os.path.isdir(NLTK_DATA_DIR))
+        status["phase"] = "warming"
+        # One job per worker spawns the whole pool; each worker loads lexicon, tokenizer and tagger once
+        timings = _timed("workers", worker_pool.warm)
+        for stage in ("lexicon", "tokenizer", "tagger"):
+            status["stages"][stage] = max((t.get(stage, 0.0) for t in timings), default=0.0)
+        status["phase"] = "ready"
+    except Exception as e:
+        status["phase"] = "failed"
+        status["error"] = str(e)
+    status["ready_after"] = round(time.monotonic() - STARTED, 4)
+    print(f"Startup {status['phase']} after {status['ready_after']}s: {status['stages']}", flush=True)
+
+def begin():
+    """Start warming up in the background; /readyz turns 200 once it's done"""
+    threading.Thread(target=_warm_up, name="startup-warm-up", daemon=True).start()
+
+def is_ready():
+    return status["phase"] == "ready"
+
+# ---------- ENDPOINTS ----------
+def register_endpoints():
+    if _endpoints:
+        return
+    from fastapi.responses import JSONResponse, PlainTextResponse
+    from nicegui import Client, app
+    import metrics
+
+    @app.get("/healthz", include_in_schema=False)
+    def healthz():
+        return {"status": "ok", "uptime": round(time.monotonic() - STARTED, 4)}
+
+    @app.get("/readyz", include_in_schema=False)
+    def readyz():
+        return JSONResponse(status, status_code=200 if is_ready() else 503)
+
+    @app.get("/metrics", include_in_schema=False)
+    def prometheus_metrics():
+        return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    metrics.gauge("analyzer_connected_clients", "Browser pages with an open connection",
+                  lambda: sum(1 for client in Client.instances.values() if client.has_socket_connection))
+    metrics.gauge("analyzer_ready", "1 once the startup warm-up has finished", lambda: int(is_ready()))
+    _endpoints.extend([healthz, readyz, prometheus_metrics])
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["download"]:
+        sys.exit("usage: python startup.py download")
+    missing = ensure_corpora(download=True)
+    if missing:
+        sys.exit(f"Could not download NLTK corpora: {', '.join(missing)}")
+    print(f"NLTK corpora ready in {NLTK_DATA_DIR}")
@@ -0,0 +1,425 @@
+# state.py
+# Pluggable store for state shared by the app processes: session histories and analysis results
+#
+# Environment:
+#   STATE_BACKEND  where shared state lives (default: memory)
+#                    memory                        this process only (a single-process server)
+#                    sqlite:///path/state.sqlite3  a SQLite file shared by the processes of one machine
+#                    redis://host:port/db          a Redis-compatible key-value server shared by every machine
+#   STATE_TIMEOUT  seconds before a redis request is given up (default: 1)
+#
+# `python state.py serve [--port 6379]` runs a small in-memory stand-in for the redis backend
+# (the commands used here only), for tests and single-box trials without a Redis install.
+
+import asyncio
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+# ---------- CONFIG ----------
+BACKEND_URL = os.environ.get("STATE_BACKEND", "memory")
+TIMEOUT = float(os.environ.get("STATE_TIMEOUT", "1"))
+
+class StateError(Exception):
+    """The shared store could not be reached or answered with an error"""
+
+# ---------- MEMORY ----------
+class MemoryStore:
+    """Values and bounded lists in this process, with optional expiry"""
+    shared = False
+
+    def __init__(self):
+        self._values = {}
+        self._lists = {}
+        self._expires = {}
+        self._lock = threading.Lock()
+
+    def _alive(self, key):
+        expires = self._expires.get(key)
+        if expires is not None and expires <= time.time():
+            self._values.pop(key, None)
+            self._lists.pop(key, None)
+            del self._expires[key]
+        return key in self._values or key in self._lists
+
+    def get(self, key):
+        with self._lock:
+            return self._values.get(key) if self._alive(key) else None
+
+    def get_many(self, keys):
+        """Values of keys, None where missing"""
+        with self._lock:
+            return [self._values.get(key) if self._alive(key) else None for key in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = value
+            self._expire(key, ttl)
+
+    def set_many(self, items, ttl=None):
+        """set() for (key, value) pairs"""
+        with self._lock:
+            for key, value in items:
+                self._values[key] = value
+                self._expire(key, ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+            self._lists.pop(key, None)
+            self._expires.pop(key, None)
+
+    def push(self, key, value, limit, ttl=None):
+        """Add value at the head of the list at key, keeping the newest limit items"""
+        with self._lock:
+            items = self._lists.get(key) if self._alive(key) else None
+            if items is None:
+                items = self._lists[key] = deque()
+            items.appendleft(value)
+            while len(items) > limit:
+                items.pop()
+            self._expire(key, ttl)
+
+    def items(self, key, n=None):
+        """Newest first"""
+        with self._lock:
+            items = self._lists.get(key) if self._alive(key) else None
+            return list(items)[:n] if items else []
+
+    def _expire(self, key, ttl):
+        if ttl:
+            self._expires[key] = time.time() + ttl
+        else:
+            self._expires.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "keys": len(self._values) + len(self._lists)}
+
+    def close(self):
+        pass
+
+# ---------- SQLITE ----------
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS lists (key TEXT NOT NULL, seq INTEGER PRIMARY KEY AUTOINCREMENT, value TEXT NOT NULL, expires REAL);
+CREATE INDEX IF NOT EXISTS lists_key ON lists (key, seq);
+"""
+SQLITE_BATCH = 500  # keys per lookup, under SQLite's limit on query parameters
+
+class SQLiteStore:
+    """The memory store's operations on a SQLite file, shared by every process that opens it"""
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=TIMEOUT * 5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self.purge()
+
+    def _run(self, *statements):
+        with self._lock:
+            try:
+                rows = None
+                if len(statements) > 1:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                for sql, args in statements:
+                    rows = self._conn.execute(sql, args).fetchall()
+                if len(statements) > 1:
+                    self._conn.execute("COMMIT")
+                return rows
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise StateError(f"{self.path}: {e}") from e
+
+    def get(self, key):
+        rows = self._run(("SELECT value FROM kv WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, time.time())))
+        return rows[0][0] if rows else None
+
+    def get_many(self, keys):
+        found = {}
+        for i in range(0, len(keys), SQLITE_BATCH):
+            batch = keys[i:i + SQLITE_BATCH]
+            found.update(self._run((f"SELECT key, value FROM kv WHERE key IN ({','.join('?' * len(batch))}) "
+                                    "AND (expires IS NULL OR expires > ?)", (*batch, time.time()))))
+        return [found.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        self._run(("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, time.time() + ttl if ttl else None)))
+
+    def set_many(self, items, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        self._run(*(("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, value, expires)) for key, value in items))
+
+    def delete(self, key):
+        self._run(("DELETE FROM kv WHERE key = ?", (key,)), ("DELETE FROM lists WHERE key = ?", (key,)))
+
+    def push(self, key, value, limit, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        self._run(
+            ("DELETE FROM lists WHERE key = ? AND expires <= ?", (key, now)),
+            ("INSERT INTO lists (key, value, expires) VALUES (?, ?, ?)", (key, value, expires)),
+            ("UPDATE lists SET expires = ? WHERE key = ?", (expires, key)),
+            ("DELETE FROM lists WHERE key = ? AND seq NOT IN "
+             "(SELECT seq FROM lists WHERE key = ? ORDER BY seq DESC LIMIT ?)", (key, key, limit)),
+        )
+
+    def items(self, key, n=None):
+        rows = self._run(("SELECT value FROM lists WHERE key = ? AND (expires IS NULL OR expires > ?) ORDER BY seq DESC LIMIT ?",
+                          (key, time.time(), -1 if n is None else n)))
+        return [row[0] for row in rows]
+
+    def purge(self):
+        """Delete expired keys and list items; run whenever a process opens the file"""
+        now = time.time()
+        self._run(("DELETE FROM kv WHERE expires <= ?", (now,)), ("DELETE FROM lists WHERE expires <= ?", (now,)))
+
+    def stats(self):
+        rows = self._run(("SELECT (SELECT COUNT(*) FROM kv) + (SELECT COUNT(DISTINCT key) FROM lists)", ()))
+        return {"backend": "sqlite", "keys": rows[0][0]}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# ---------- REDIS ----------
+def encode_command(*args):
+    """A command in the redis protocol (RESP): an array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+def read_reply(stream):
+    """One RESP reply from a binary file object; bulk strings come back as str"""
+    line = stream.readline()
+    if not line.endswith(b"\r\n"):
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest.decode()
+    if kind == b"-":
+        raise StateError(rest.decode())
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        if int(rest) < 0:
+            return None
+        data = stream.read(int(rest) + 2)
+        return data[:-2].decode("utf-8")
+    if kind == b"*":
+        return None if int(rest) < 0 else [read_reply(stream) for _ in range(int(rest))]
+    raise StateError(f"unexpected reply {line!r}")
+
+class RedisStore:
+    """The memory store's operations on a Redis-compatible server, over one pooled connection"""
+    shared = True
+
+    def __init__(self, url):
+        parsed = urlparse(url)
+        self.url = url
+        self.address = (parsed.hostname or "localhost", parsed.port or 6379)
+        self.db = int(parsed.path.strip("/") or 0)
+        self.password = parsed.password
+        self._sock = None
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        self._sock = socket.create_connection(self.address, timeout=TIMEOUT)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._stream = self._sock.makefile("rb")
+        if self.password:
+            self._send(("AUTH", self.password))
+        if self.db:
+            self._send(("SELECT", self.db))
+
+    def _send(self, *commands):
+        self._sock.sendall(b"".join(encode_command(*command) for command in commands))
+        return [read_reply(self._stream) for _ in commands]
+
+    def _run(self, *commands):
+        """Replies to the commands, sent in one round trip; reconnects once after a dropped connection"""
+        with self._lock:
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*commands)
+                except (OSError, StateError) as e:
+                    self._disconnect()  # unread replies would answer the next request
+                    if attempt == 2 or not isinstance(e, ConnectionError):
+                        raise StateError(f"{self.address[0]}:{self.address[1]}: {e}") from e
+
+    def _disconnect(self):
+        if self._sock is not None:
+            self._stream.close()
+            self._sock.close()
+        self._sock = self._stream = None
+
+    def get(self, key):
+        return self._run(("GET", key))[0]
+
+    def get_many(self, keys):
+        return self._run(("MGET", *keys))[0] if keys else []
+
+    def set(self, key, value, ttl=None):
+        self._run(("SET", key, value, "EX", int(ttl)) if ttl else ("SET", key, value))
+
+    def set_many(self, items, ttl=None):
+        if items:
+            self._run(*(("SET", key, value, "EX", int(ttl)) if ttl else ("SET", key, value) for key, value in items))
+
+    def delete(self, key):
+        self._run(("DEL", key))
+
+    def push(self, key, value, limit, ttl=None):
+        commands = [("LPUSH", key, value), ("LTRIM", key, 0, limit - 1)]
+        if ttl:
+            commands.append(("EXPIRE", key, int(ttl)))
+        self._run(*commands)
+
+    def items(self, key, n=None):
+        return self._run(("LRANGE", key, 0, -1 if n is None else n - 1))[0]
+
+    def stats(self):
+        return {"backend": "redis", "keys": self._run(("DBSIZE",))[0]}
+
+    def close(self):
+        with self._lock:
+            self._disconnect()
+
+# ---------- SETUP ----------
+def open_store(url):
+    if url == "memory":
+        return MemoryStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteStore(url[len("sqlite:///"):])
+    if url.startswith("redis://"):
+        return RedisStore(url)
+    raise ValueError(f"Unknown STATE_BACKEND {url!r}; use memory, sqlite:///path or redis://host:port/db")
+
+# Shared by every client of this process
+store = open_store(BACKEND_URL)
+
+# ---------- STAND-IN SERVER ----------
+class StandInServer:
+    """The redis commands RedisStore uses, on an in-memory MemoryStore"""
+
+    def __init__(self):
+        self.data = MemoryStore()
+
+    def execute(self, name, args):
+        data = self.data
+        if name == "PING":
+            return "PONG"
+        if name in ("SELECT", "AUTH"):
+            return "OK"
+        if name == "GET":
+            return data.get(args[0])
+        if name == "MGET":
+            return data.get_many(args)
+        if name == "SET":
+            data.set(args[0], args[1], int(args[3]) if len(args) > 3 and args[2].upper() == "EX" else None)
+            return "OK"
+        if name == "DEL":
+            found = data.get(args[0]) is not None or bool(data.items(args[0]))
+            data.delete(args[0])
+            return int(found)
+        if name == "LPUSH":
+            for value in args[1:]:
+                data.push(args[0], value, sys.maxsize, self._ttl(args[0]))
+            return len(data.items(args[0]))
+        if name == "LTRIM":
+            kept = self._range(data.items(args[0]), args[1], args[2])
+            ttl = self._ttl(args[0])
+            data.delete(args[0])
+            for value in reversed(kept):
+                data.push(args[0], value, sys.maxsize, ttl)
+            return "OK"
+        if name == "LRANGE":
+            return self._range(data.items(args[0]), args[1], args[2])
+        if name == "EXPIRE":
+            with data._lock:
+                found = data._alive(args[0])
+                if found:
+                    data._expire(args[0], int(args[1]))
+            return int(found)
+        if name == "DBSIZE":
+            return data.stats()["keys"]
+        raise StateError(f"ERR unknown command '{name}'")
+
+    @staticmethod
+    def _range(items, start, stop):
+        """items from start to stop, both included and counted from the end when negative, as in redis"""
+        start, stop = int(start), int(stop)
+        if start < 0:
+            start = max(0, len(items) + start)
+        if stop < 0:
+            stop += len(items)
+        return items[start:max(0, stop + 1)]
+
+    def _ttl(self, key):
+        expires = self.data._expires.get(key)
+        return expires - time.time() if expires else None
+
+    @staticmethod
+    def encode_reply(value):
+        if value is None:
+            return b"$-1\r\n"
+        if isinstance(value, int):
+            return b":%d\r\n" % value
+        if isinstance(value, list):
+            return b"*%d\r\n" % len(value) + b"".join(StandInServer.encode_reply(v) for v in value)
+        if value in ("OK", "PONG"):
+            return f"+{value}\r\n".encode()
+        data = value.encode("utf-8")
+        return b"$%d\r\n%s\r\n" % (len(data), data)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2].decode("utf-8"))
+                try:
+                    reply = self.encode_reply(self.execute(args[0].upper(), args[1:]))
+                except (StateError, IndexError, ValueError) as e:
+                    reply = f"-{str(e) or 'ERR syntax error'}\r\n".encode()
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port):
+    server = await asyncio.start_server(StandInServer().handle, host, port)
+    print(f"State stand-in listening on redis://{host}:{port}/0", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    if sys.argv[1:2] != ["serve"]:
+        sys.exit("usage: python state.py serve [--host HOST] [--port PORT]")
+    import argparse
+    parser = argparse.ArgumentParser(description="In-memory stand-in for the redis state backend")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args(sys.argv[2:])
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,143 @@
+# static_assets.py
+# Content-hashed static assets served from memory with long-lived immutable cache headers
+
+import base64
+import gzip
+import hashlib
+import io
+import mimetypes
+import os
+import re
+
+from fastapi import Request, Response
+from nicegui import app
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional: without it the original image is served unresized
+    Image = None
+
+try:
+    import brotli
+except ImportError:  # without brotli only the gzip variants are precompressed
+    brotli = None
+
+# ---------- CONFIG ----------
+ROUTE = "/assets"
+CACHE_CONTROL = "public, max-age=31536000, immutable"
+PROFILE_SIZES = (80, 160)  # CSS size of the profile image and its 2x variant for hi-DPI screens
+WEBP_QUALITY = 82
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STYLESHEETS = ("bootstrap-icons.css", "app.css")  # bundled into one file, in this order
+ICON_FONT = "bootstrap-icons.woff2"
+
+PLACEHOLDER_SVG = """
+<svg xmlns='http://www.w3.org/2000/svg' width='240' height='240' viewBox='0 0 24 24' fill='none' stroke='currentColor'>
+  <rect width='24' height='24' rx='4' fill='#e2e8f0'/>
+  <circle cx='12' cy='9' r='3' fill='#94a3b8'/>
+  <path d='M6 20c1.5-4 10.5-4 12 0' stroke='#64748b' stroke-width='1.2' fill='none'/>
+</svg>
+"""
+
+# ---------- REGISTRY ----------
+_assets = {}    # file name -> (bodies by content encoding, media type, digest)
+_profiles = {}  # image path -> (src, srcset), built once per process
+_head = []      # head HTML linking the bundle, built once per process
+
+def precompress(body: bytes):
+    """The body in every content encoding that makes it smaller, plus the original"""
+    variants = {"identity": body}
+    candidates = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(body, quality=11)
+    for encoding, compressed in candidates.items():
+        if len(compressed) < len(body):
+            variants[encoding] = compressed
+    return variants
+
+def register(stem: str, suffix: str, body: bytes, media_type: str, compress=False):
+    """Serve body under a name that changes whenever its content does; returns the URL"""
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    name = f"{stem}.{digest}{suffix}"
+    _assets[name] = (precompress(body) if compress else {"identity": body}, media_type, digest)
+    return f"{ROUTE}/{name}"
+
+def _accepted_encodings(header: str):
+    accepted = set()
+    for part in header.split(","):
+        encoding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+@app.get(ROUTE + "/{name}", include_in_schema=False)
+def serve_asset(name: str, request: Request):
+    asset = _assets.get(name)
+    if asset is None:
+        return Response(status_code=404)
+    variants, media_type, digest = asset
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    encoding = next((e for e in ("br", "gzip") if e in variants and e in accepted), "identity")
+    etag = f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+    headers = {"Cache-Control": CACHE_CONTROL, "ETag": etag}
+    if len(variants) > 1:
+        headers["Vary"] = "Accept-Encoding"
+    if etag in [tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(variants[encoding], media_type=media_type, headers=headers)
+
+# ---------- STYLESHEET BUNDLE ----------
+def minify_css(css: str):
+    css = re.sub(r"/\*(?!!).*?\*/", "", css, flags=re.S)  # keeps /*! license */ comments
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+def head_html():
+    """<link> tags for the icon font and the minified stylesheet bundle"""
+    if _head:
+        return _head[0]
+    with open(os.path.join(STATIC_DIR, ICON_FONT), "rb") as f:
+        font_url = register("bootstrap-icons", ".woff2", f.read(), "font/woff2")
+    parts = []
+    for name in STYLESHEETS:
+        with open(os.path.join(STATIC_DIR, name), encoding="utf-8") as f:
+            parts.append(f.read().replace(f'url("{ICON_FONT}")', f'url("{font_url}")'))
+    css_url = register("app", ".css", minify_css("\n".join(parts)).encode("utf-8"), "text/css; charset=utf-8", compress=True)
+    _head.append(
+        f'<link rel="preload" href="{font_url}" as="font" type="font/woff2" crossorigin>\n'
+        f'<link rel="stylesheet" href="{css_url}">'
+    )
+    return _head[0]
+
+# ---------- PROFILE IMAGE ----------
+def _resized(image, size):
+    buffer = io.BytesIO()
+    ImageOps.fit(image, (size, size), Image.LANCZOS).save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+    return buffer.getvalue()
+
+def profile_image(path):
+    """(src, srcset) of the profile image, resized for display; a placeholder if it can't be read"""
+    if path in _profiles:
+        return _profiles[path]
+    try:
+        if Image is None:
+            with open(path, "rb") as f:
+                suffix = os.path.splitext(path)[1].lower()
+                src = register("profile", suffix, f.read(), mimetypes.guess_type(path)[0] or "application/octet-stream")
+            srcset = ""
+        else:
+            with Image.open(path) as image:
+                image = image.convert("RGBA")
+                urls = [register(f"profile-{size}", ".webp", _resized(image, size), "image/webp")
+                        for size in PROFILE_SIZES]
+            src = urls[0]
+            srcset = ", ".join(f"{url} {size // PROFILE_SIZES[0]}x" for url, size in zip(urls, PROFILE_SIZES))
+    except Exception:
+        b = base64.b64encode(PLACEHOLDER_SVG.encode("utf-8")).decode("ascii")
+        src, srcset = f"data:image/svg+xml;base64,{b}", ""
+    _profiles[path] = (src, srcset)
+    return src, srcset
@@ -0,0 +1,178 @@
+# streaming.py
+# Deep analysis of documents too large to hold in memory: the text arrives as chunks, sentences
+# are segmented across chunk boundaries and the report is built from running aggregates
+#
+# Environment:
+#   STREAM_TOP_SENTENCES   most strongly polarized sentences kept for the report (default: 50)
+#   STREAM_WORD_CAPACITY   distinct words counted at once for the word-frequency list (default: 50000)
+
+import heapq
+import os
+
+import analyzer
+import lexicon
+
+# ---------- CONFIG ----------
+TOP_SENTENCES = int(os.environ.get("STREAM_TOP_SENTENCES", "50"))
+WORD_CAPACITY = int(os.environ.get("STREAM_WORD_CAPACITY", "50000"))
+CHUNK_CHARS = 64 * 1024         # characters read per chunk by read_chunks()
+BATCH_SENTENCES = 256           # sentences analyzed together
+MAX_SENTENCE_CHARS = 64 * 1024  # text without a sentence break is cut at a space past this length
+POLARITY_RESOLUTION = 1000      # histogram bins per unit of polarity, for the sentiment consistency
+KEY_PHRASES = 10
+
+# ---------- INPUT ----------
+def read_chunks(f, size=CHUNK_CHARS):
+    """Chunks of an open text file, until it is exhausted"""
+    while True:
+        chunk = f.read(size)
+        if not chunk:
+            return
+        yield chunk
+
+# ---------- ANALYSIS ----------
+class StreamingDeepAnalysis:
+    """Feed chunks of one document, then finish() for a report shaped like deep_analyze_text()'s.
+
+    Memory stays bounded whatever the document size: one chunk plus the unfinished sentence,
+    a batch of sentences, the top sentences, at most 2 * word_capacity word counts and a
+    polarity histogram. "sentences" holds the top_sentences most strongly polarized sentences
+    in text order; the statistics and insights still cover every sentence. Word counts are
+    exact unless more than word_capacity distinct words were seen, in which case rare words are
+    dropped and "stream.word_count_error" bounds how far any count may be short. The sentiment
+    consistency comes from the histogram and may differ from the exact value in the third decimal.
+    """
+
+    def __init__(self, top_sentences=TOP_SENTENCES, word_capacity=WORD_CAPACITY):
+        self.top_sentences = top_sentences
+        self.word_capacity = word_capacity
+        self.chunks = 0
+        self.characters = 0
+        self._buffer = ""       # text after the last complete sentence
+        self._pending = []      # complete sentences waiting for a batch
+        self._totals = {"sentences": 0, "words": 0, "subjectivity_sum": 0.0, "positive": 0, "negative": 0}
+        self._document = lexicon.Accumulator()  # the document score, read as one stream across batches
+        self._min_polarity = self._max_polarity = None
+        self._histogram = {}    # polarity bin -> [sentences, polarity sum]
+        self._top = []          # min-heap of (|polarity|, -number, sentence)
+        self._word_freq = {}
+        self._word_count_error = 0  # highest count dropped when pruning the word counts
+        self._key_phrases = {}  # first tagged phrases, or None once a batch leaves them to the word counts
+
+    def feed(self, chunk: str):
+        """Add the next chunk of text; complete sentences are analyzed in batches"""
+        self.chunks += 1
+        self.characters += len(chunk)
+        self._buffer += chunk
+        sentences = analyzer.split_sentences(self._buffer)
+        if len(sentences) > 2:
+            # The last sentence may continue in the next chunk, and whether the one before it
+            # ends where it seems to can depend on the last one's (possibly cut) first word
+            start = self._buffer.rfind(sentences[-1])
+            start = self._buffer.rfind(sentences[-2], 0, start)
+            self._pending.extend(sentences[:-2])
+            self._buffer = self._buffer[start:]
+        elif not sentences:
+            self._buffer = ""
+        while len(self._buffer) > MAX_SENTENCE_CHARS:
+            cut = self._buffer.rfind(" ", 0, MAX_SENTENCE_CHARS)
+            cut = cut if cut > 0 else MAX_SENTENCE_CHARS
+            self._pending.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:].lstrip()
+        if len(self._pending) >= BATCH_SENTENCES:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        totals = self._totals
+        partial = analyzer.analyze_sentence_batch(self._pending, start=totals["sentences"] + 1,
+                                                  with_key_phrases=self._key_phrases is not None and len(self._key_phrases) < KEY_PHRASES,
+                                                  document=self._document)
+        self._pending = []
+
+        for sentence in partial["sentences"]:
+            polarity = sentence["polarity"]
+            totals["subjectivity_sum"] += sentence["subjectivity"]
+            totals["positive"] += polarity > 0.1
+            totals["negative"] += polarity < -0.1
+            if self._min_polarity is None or polarity < self._min_polarity:
+                self._min_polarity = polarity
+            if self._max_polarity is None or polarity > self._max_polarity:
+                self._max_polarity = polarity
+            bucket = self._histogram.setdefault(round(polarity * POLARITY_RESOLUTION), [0, 0.0])
+            bucket[0] += 1
+            bucket[1] += polarity
+            # Keep the most polarized sentences; on ties the earlier one stays
+            heapq.heappush(self._top, (abs(polarity), -sentence["number"], sentence))
+            if len(self._top) > self.top_sentences:
+                heapq.heappop(self._top)
+        totals["sentences"] += len(partial["sentences"])
+        totals["words"] += partial["total_words"]
+
+        word_freq = self._word_freq
+        for word, freq in partial["word_freq"].items():
+            word_freq[word] = word_freq.get(word, 0) + freq
+        if len(word_freq) > 2 * self.word_capacity:
+            kept = set(heapq.nlargest(self.word_capacity, word_freq, key=word_freq.get))
+            self._word_count_error = max(self._word_count_error,
+                                         max(freq for word, freq in word_freq.items() if word not in kept))
+            self._word_freq = {word: freq for word, freq in word_freq.items() if word in kept}
+
+        if partial["key_phrases"] is None:
+            self._key_phrases = None
+        elif self._key_phrases is not None:
+            for phrase in partial["key_phrases"]:
+                if len(self._key_phrases) >= KEY_PHRASES:
+                    break
+                self._key_phrases[phrase] = None
+
+    def _deviation_sum(self, polarity):
+        """Sum of |sentence polarity - polarity| over all sentences, from the histogram.
+        Exact except within the one bin that straddles polarity."""
+        total = 0.0
+        for bin_, (count, polarity_sum) in self._histogram.items():
+            if (bin_ + 0.5) / POLARITY_RESOLUTION <= polarity:
+                total += count * polarity - polarity_sum
+            elif (bin_ - 0.5) / POLARITY_RESOLUTION >= polarity:
+                total += polarity_sum - count * polarity
+            else:
+                total += abs(polarity_sum - count * polarity)
+        return total
+
+    def finish(self):
+        """Analyze the rest of the text and return the report"""
+        if self._buffer.strip():
+            self._pending.extend(analyzer.split_sentences(self._buffer))
+        self._buffer = ""
+        self._flush()
+
+        totals = dict(self._totals)
+        polarity_sum, subjectivity_sum, assessments = self._document.totals()
+        basic_analysis = analyzer.summarize_scores(
+            polarity_sum / float(assessments or 1),
+            subjectivity_sum / float(assessments or 1),
+            totals["words"],
+            totals["sentences"],
+            analyzer.rank_light(self._word_freq) if self._key_phrases is None else list(self._key_phrases),
+        )
+        totals["deviation_sum"] = self._deviation_sum(basic_analysis["polarity"])
+        totals["polarity_range"] = self._max_polarity - self._min_polarity if totals["sentences"] else 0
+        top_words = sorted(self._word_freq.items(), key=lambda x: x[1], reverse=True)[:10]
+        sentences = [sentence for _, _, sentence in sorted(self._top, key=lambda t: -t[1])]
+
+        report = analyzer.build_report(basic_analysis, sentences, top_words, totals)
+        report["stream"] = {
+            "chunks": self.chunks,
+            "characters": self.characters,
+            "sentences_kept": len(sentences),
+            "word_count_error": self._word_count_error,
+        }
+        return report
+
+def deep_analyze_stream(chunks, top_sentences=TOP_SENTENCES, word_capacity=WORD_CAPACITY):
+    """Deep analysis of a document given as an iterable of text chunks"""
+    analysis = StreamingDeepAnalysis(top_sentences, word_capacity)
+    for chunk in chunks:
+        analysis.feed(chunk)
+    return analysis.finish()
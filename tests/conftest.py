@@ -0,0 +1,50 @@
+# tests/conftest.py
+# Run the tests from the repository root: python -m pytest
+# Tests that need an NLTK corpus take the fixture of that name and are skipped when it is missing.
+
+import os
+import signal
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(1, os.path.join(ROOT, "benchmarks"))
+
+import startup  # noqa: E402
+
+startup.configure_nltk()
+
+def require_corpus(package):
+    if package in startup.missing_corpora():
+        pytest.skip(f"NLTK corpus {package} is not installed (python startup.py download)")
+
+@pytest.fixture
+def punkt():
+    require_corpus("punkt_tab")
+
+@pytest.fixture
+def tagger():
+    require_corpus("averaged_perceptron_tagger_eng")
+
+@pytest.fixture
+def inline_pool(monkeypatch):
+    """worker_pool.run() runs jobs in this process, stopped by the same timer as in a worker"""
+    import worker_pool
+
+    async def run(fn, *args):
+        return worker_pool.timed_job(fn, *args)[0]
+
+    monkeypatch.setattr(worker_pool, "run", run)
+    previous = signal.signal(signal.SIGALRM, worker_pool.job_timed_out)
+    yield worker_pool
+    signal.signal(signal.SIGALRM, previous)
+
+@pytest.fixture
+def results(monkeypatch):
+    """An empty result cache in place of the process's"""
+    import result_cache
+    cache = result_cache.ResultCache(backing=None)
+    monkeypatch.setattr(result_cache, "results", cache)
+    return cache
@@ -0,0 +1,64 @@
+# tests/test_analyzer.py
+# Deep analysis agrees with the quick analysis, however the text is split up for it
+
+import io
+
+import pytest
+
+import corpus
+import key_phrases
+from analyzer import (analyze_sentence_batch, analyze_text_blob, deep_analyze_text, finish_deep_analysis,
+                      merge_partials, outline_text, shard_sentences)
+from streaming import deep_analyze_stream, read_chunks
+
+# ---------- CORPUS ----------
+TEXTS = [
+    "Very. Good stuff!",
+    "It was not. Bad at all, really!",
+    "The start was slow. Extremely! Nice ending though :)",
+    "Absolutely awful. Not great. Never again (!)",
+]
+CORPUS = [pytest.param(text, id=f"{kind}-{i}") for kind in corpus.KINDS for i, text in enumerate(corpus.generate(kind, 10))]
+
+def scores(result):
+    return pytest.approx((result["polarity"], result["subjectivity"]), abs=1e-12)
+
+# ---------- TESTS ----------
+@pytest.mark.parametrize("text", TEXTS + CORPUS)
+def test_deep_score_matches_quick(text, punkt):
+    deep = deep_analyze_text(text)["basic"]
+    assert (deep["polarity"], deep["subjectivity"]) == scores(analyze_text_blob(text))
+
+@pytest.mark.parametrize("text", TEXTS + CORPUS)
+def test_outline_score_matches_quick(text, punkt):
+    outline = outline_text(text)
+    assert (outline["polarity"], outline["subjectivity"]) == scores(analyze_text_blob(text))
+
+@pytest.mark.parametrize("text", TEXTS + CORPUS)
+def test_streamed_score_matches_quick(text, punkt):
+    streamed = deep_analyze_stream(read_chunks(io.StringIO(text), size=7))
+    assert (streamed["basic"]["polarity"], streamed["basic"]["subjectivity"]) == scores(analyze_text_blob(text))
+
+@pytest.mark.parametrize("text", TEXTS + CORPUS)
+def test_batched_report_matches_sequential(text, punkt):
+    outline = outline_text(text)
+    sentences = outline["sentences"]
+    partials = [analyze_sentence_batch(sentences[i:i + 2], i + 1) for i in range(0, len(sentences), 2)]
+    batched = finish_deep_analysis(merge_partials(partials), score=(outline["polarity"], outline["subjectivity"]))
+    assert batched == deep_analyze_text(text)
+
+@pytest.mark.parametrize("mode", ["tagger", "light", "auto-light", "auto-tagger"])
+@pytest.mark.parametrize("text", CORPUS)
+def test_sharded_key_phrases_match_sequential(text, mode, punkt, monkeypatch):
+    outline = outline_text(text)
+    sentences = outline["sentences"]
+    length = sum(map(len, sentences))
+    # In auto mode the whole text is over (or under) the budget, while each shard on its own is under it
+    monkeypatch.setattr(key_phrases, "MODE", mode.split("-")[0])
+    monkeypatch.setattr(key_phrases, "BUDGET", 0.75 * length)
+    monkeypatch.setattr(key_phrases, "_seconds_per_char", [1.0 if mode == "auto-light" else 0.0])
+    sequential = deep_analyze_text(text)
+    partials = [analyze_sentence_batch(shard, start, True, None, length) for start, shard in shard_sentences(sentences, 4)]
+    sharded = finish_deep_analysis(merge_partials(partials), score=(outline["polarity"], outline["subjectivity"]))
+    assert sharded["basic"]["key_phrases"] == sequential["basic"]["key_phrases"]
+    assert sharded == sequential
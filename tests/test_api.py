@@ -0,0 +1,146 @@
+# tests/test_api.py
+# /api/analyze and /api/deep-analyze answer like the analyzer, in order and whether or not texts
+# are cached or sharded; CSV uploads to /api/bulk give one record per CSV row, however its quoted
+# fields break across lines
+
+import asyncio
+import csv
+import io
+import json
+
+import httpx
+import pytest
+from nicegui import app
+
+import api
+import corpus
+import worker_pool
+from analyzer import analyze_text_blob, deep_analyze_text
+
+# ---------- HELPERS ----------
+def post(path, body):
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post(path, json=body)
+    return asyncio.run(request())
+
+def as_json(result):
+    return json.loads(json.dumps(result))
+
+@pytest.fixture
+def jobs(inline_pool, results, monkeypatch):
+    """Jobs run in this process, with a fresh result cache; returns the functions run"""
+    ran = []
+    run = inline_pool.run
+
+    async def counted(fn, *args):
+        ran.append(fn.__name__)
+        return await run(fn, *args)
+
+    monkeypatch.setattr(worker_pool, "run", counted)
+    return ran
+
+async def lines_of(text):
+    for line in text.split("\n"):
+        yield line
+
+def read_csv(text, text_field="text", id_field="id"):
+    async def collect():
+        return [record async for record in api.read_csv(lines_of(text), text_field, id_field)]
+    return asyncio.run(collect())
+
+# ---------- CSV ----------
+@pytest.mark.parametrize("line, quoted, expected", [
+    ('1,plain text', False, False),
+    ('1,"open field', False, True),
+    ('1,"closed field"', False, False),
+    ('1,"say ""hi"" there', False, True),
+    ('1,"say ""hi"""', False, False),
+    ('1,not "a quote', False, False),  # a quote inside an unquoted field is just a character
+    ('still inside', True, True),
+    ('end of it",2', True, False),
+    ('"" is a literal quote', True, True),
+    ('', True, True),
+])
+def test_csv_quoted(line, quoted, expected):
+    assert api.csv_quoted(line, quoted) == expected
+
+def test_csv_quoted_agrees_with_csv_reader():
+    rows = [["1", 'multi\nline, with "quotes"\n'], ["2", '""'], ["3", '\n\n'], ["4", 'end"']]
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(rows)
+    quoted, records = False, 0
+    for line in out.getvalue().split("\n")[:-1]:
+        quoted = api.csv_quoted(line, quoted)
+        records += not quoted
+    assert not quoted and records == len(rows)
+
+def test_read_csv_embedded_newlines_and_escapes():
+    text = 'id,text\n1,"first line\nsecond, line"\n2,"a ""quoted"" word"\n\n3,plain'
+    assert read_csv(text) == [
+        ("1", "first line\nsecond, line", None),
+        ("2", 'a "quoted" word', None),
+        ("3", "plain", None),
+    ]
+
+def test_read_csv_needs_the_text_column():
+    assert read_csv("id,body\n1,hello") == [(None, None, "CSV header has no 'text' column")]
+
+def test_read_csv_record_over_the_cap_is_an_error_and_reading_resumes(monkeypatch):
+    monkeypatch.setattr(api, "CSV_MAX_RECORD", 50)
+    text = 'id,text\n1,"never closed\n' + "x" * 60 + '\n2,"fine,\nafter all"'
+    assert read_csv(text) == [(None, None, "Unterminated quoted field"), ("2", "fine,\nafter all", None)]
+
+def test_read_csv_upload_ending_inside_quotes_is_an_error():
+    assert read_csv('id,text\n1,ok\n2,"cut off\nmid-field') == [("1", "ok", None), (None, None, "Unterminated quoted field")]
+
+# ---------- ANALYZE ----------
+TEXTS = ["I love this product!", "Terrible service. Never again.", "It arrived on Tuesday."]
+
+@pytest.mark.parametrize("path, analyze", [("/api/analyze", analyze_text_blob), ("/api/deep-analyze", deep_analyze_text)])
+def test_one_text_or_a_batch(path, analyze, punkt, jobs):
+    assert post(path, {"text": TEXTS[0]}).json() == as_json(analyze(TEXTS[0]))
+    texts = [TEXTS[2], TEXTS[1], TEXTS[2], TEXTS[0]]
+    assert post(path, {"texts": texts}).json() == {"results": as_json([analyze(text) for text in texts])}
+
+def test_cached_results_are_not_computed_again(punkt, jobs):
+    post("/api/analyze", {"texts": TEXTS[:2]})
+    ran = len(jobs)
+    assert post("/api/analyze", {"texts": [TEXTS[1], TEXTS[0]]}).json()["results"][0]["sentiment"] == "Negative"
+    assert len(jobs) == ran
+    post("/api/analyze", {"text": TEXTS[2]})
+    assert len(jobs) == ran + 1
+
+@pytest.mark.parametrize("body, status", [
+    ({}, 400),
+    ({"text": "a", "texts": ["b"]}, 400),
+    ({"texts": []}, 400),
+    ({"texts": ["fine", "  "]}, 400),
+    ({"texts": ["one", "two", "three", "four"]}, 413),
+    ({"text": "a", "fields": ["sentiment", "nope"]}, 400),
+])
+def test_bad_requests(body, status, punkt, jobs, monkeypatch):
+    monkeypatch.setattr(api, "MAX_BATCH", 3)
+    assert post("/api/analyze", body).status_code == status
+
+def test_fields(punkt, jobs):
+    assert post("/api/analyze", {"text": TEXTS[0], "fields": ["sentiment", "polarity"]}).json() == \
+        {"sentiment": "Positive", "polarity": analyze_text_blob(TEXTS[0])["polarity"]}
+    results = post("/api/deep-analyze", {"texts": TEXTS, "fields": ["statistics"]}).json()["results"]
+    assert [list(result) for result in results] == [["statistics"]] * len(TEXTS)
+
+def test_timeout_is_a_504(punkt, results, monkeypatch):
+    async def run(fn, *args):
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(worker_pool, "run", run)
+    assert post("/api/analyze", {"text": TEXTS[0]}).status_code == 504
+
+def test_long_texts_are_sharded_like_sequential(punkt, jobs, monkeypatch):
+    monkeypatch.setattr(worker_pool, "POOL_SIZE", 3)
+    monkeypatch.setattr(api, "SHARD_MIN_CHARS", 500)
+    long_texts = corpus.generate("report", 2, seed=4)
+    texts = [long_texts[0], TEXTS[0], long_texts[1]]
+    assert all(len(text) > 500 for text in long_texts)
+    assert post("/api/deep-analyze", {"texts": texts}).json() == {"results": as_json([deep_analyze_text(text) for text in texts])}
+    assert jobs.count("analyze_sentence_batch") == 6 and jobs.count("deep_analyze_batch") == 1
@@ -0,0 +1,99 @@
+# tests/test_cli.py
+# Batch mode reads CSV, JSONL and plain text, reports bad records in place and writes one line per
+# record in input order, whatever the number of workers
+
+import json
+
+import pytest
+
+import analyzer
+import cli
+
+# ---------- HELPERS ----------
+TEXTS = ["I love this, it is wonderful.", "Terrible service. Never again!", "The box is blue.", "Not bad at all."]
+
+def write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8", newline="")
+    return str(path)
+
+def analyze(tmp_path, *argv):
+    """Output lines of `python main.py analyze ARGV`"""
+    out = tmp_path / "out.jsonl"
+    assert cli.main([*argv, "-o", str(out)]) == 0
+    return [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+
+def records(path, fmt="auto", text_field="text", id_field="id"):
+    return list(cli.read_records(path, fmt, text_field, id_field))
+
+# ---------- INPUT ----------
+def test_csv_records(tmp_path):
+    path = write(tmp_path, "in.csv", 'id,text\r\n1,"Good, very good"\r\n2,"Line one\nline two"\r\n3,\r\n')
+    assert records(path) == [("1", "Good, very good", None), ("2", "Line one\nline two", None), ("3", "", None)]
+    assert records(path, text_field="body", id_field="key") == [(None, "", None)] * 3
+
+def test_jsonl_records(tmp_path):
+    lines = ['{"id": 7, "text": "Fine."}', "", '"Just a string"', "{not json", '{"id": 8, "text": 5}', "[1, 2]"]
+    path = write(tmp_path, "in.ndjson", "\n".join(lines) + "\n")
+    assert records(path) == [
+        (7, "Fine.", None),
+        (None, "Just a string", None),
+        (None, None, "Invalid JSON"),
+        (8, None, "No 'text' string"),
+        (None, None, "No 'text' string"),
+    ]
+
+def test_text_records_are_numbered_by_line(tmp_path):
+    path = write(tmp_path, "in.txt", "First line\r\n\r\n  \nThird text\n")
+    assert records(path) == [(1, "First line", None), (4, "Third text", None)]
+
+@pytest.mark.parametrize("name, fmt, expected", [
+    ("in.CSV", "auto", "csv"), ("in.jsonl", "auto", "jsonl"), ("in.log", "auto", "text"), ("in.csv", "text", "text"),
+])
+def test_format_by_extension_unless_given(name, fmt, expected):
+    assert cli.detect_format(name, fmt) == expected
+
+# ---------- RUN ----------
+def test_chunk_results_line_up_with_records(punkt):
+    chunk = [(1, TEXTS[0], None), (2, "   ", None), (3, None, "Invalid JSON"), (4, TEXTS[1], None)]
+    first, empty, invalid, last = cli.analyze_chunk(False, chunk)
+    assert (empty, invalid) == (None, None)
+    assert [first, last] == analyzer.analyze_batch([TEXTS[0], TEXTS[1]])
+    assert cli.analyze_chunk(True, chunk)[3] == analyzer.deep_analyze_text(TEXTS[1])
+    assert cli.analyze_chunk(False, [(1, "", None)]) == [None]
+
+def test_errors_are_reported_in_place(tmp_path, punkt):
+    path = write(tmp_path, "in.jsonl", '{"id": "a", "text": "Great."}\n{oops\n{"id": "b", "text": " "}\n{"id": "c"}\n')
+    lines = analyze(tmp_path, path, "--workers", "1")
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line.get("id") for line in lines] == ["a", None, "b", "c"]
+    assert [line.get("error") for line in lines] == [None, "Invalid JSON", "Empty text", "No 'text' string"]
+    assert lines[0]["result"] == analyzer.analyze_batch(["Great."])[0]
+
+def test_inputs_run_one_after_the_other(tmp_path, punkt):
+    csv_path = write(tmp_path, "in.csv", "text,id\n" + "".join(f'"{text}",r{i}\n' for i, text in enumerate(TEXTS)))
+    text_path = write(tmp_path, "in.txt", "\n".join(TEXTS))
+    lines = analyze(tmp_path, csv_path, text_path, "--workers", "1", "--chunk-size", "3")
+    assert [line["id"] for line in lines] == ["r0", "r1", "r2", "r3", 1, 2, 3, 4]
+    assert [line["result"] for line in lines] == analyzer.analyze_batch(TEXTS) * 2
+
+def test_fields_keep_only_those_keys(tmp_path, punkt):
+    path = write(tmp_path, "in.txt", "\n".join(TEXTS))
+    lines = analyze(tmp_path, path, "--workers", "1", "--fields", "sentiment,polarity,,unknown")
+    expected = analyzer.analyze_batch(TEXTS)
+    assert [line["result"] for line in lines] == [{"sentiment": r["sentiment"], "polarity": r["polarity"]} for r in expected]
+    deep = analyze(tmp_path, path, "--workers", "1", "--deep", "--fields", "statistics")
+    assert [line["result"] for line in deep] == [{"statistics": r["statistics"]} for r in analyzer.deep_analyze_batch(TEXTS)]
+
+def test_workers_keep_the_input_order(tmp_path, punkt):
+    """Small chunks over two worker processes come back in input order, errors included"""
+    texts = [f"{TEXTS[i % len(TEXTS)]} Record {i}." for i in range(30)]
+    lines = [json.dumps({"id": i, "text": text}) for i, text in enumerate(texts)]
+    lines[11] = "{broken"
+    path = write(tmp_path, "in.jsonl", "\n".join(lines))
+    single = analyze(tmp_path, path, "--workers", "1", "--chunk-size", "2")
+    pooled = analyze(tmp_path, path, "--workers", "2", "--chunk-size", "2")
+    assert pooled == single
+    assert [line["index"] for line in pooled] == list(range(30))
+    assert pooled[11] == {"index": 11, "error": "Invalid JSON"}
+    assert [line["result"] for line in pooled if "result" in line] == analyzer.analyze_batch(texts[:11] + texts[12:])
@@ -0,0 +1,77 @@
+# tests/test_disk_cache.py
+# The disk cache keeps results across restarts, within its byte budget, for one analyzer version
+
+import pytest
+
+import disk_cache
+from disk_cache import DiskCache
+
+# ---------- HELPERS ----------
+def value(name):
+    """A result that takes exactly 100 bytes on disk"""
+    return name * 98
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+def reopen(path, version="1", max_bytes=disk_cache.MAX_BYTES):
+    """The cache a restarted process sees; close() flushes the previous one's writes"""
+    return DiskCache(path, version, max_bytes)
+
+# ---------- TESTS ----------
+def test_results_survive_a_restart(path):
+    cache = reopen(path)
+    cache.put_many("quick", [("a", {"polarity": 0.5}), ("b", [1, "ü"])])
+    cache.close()
+    cache = reopen(path)
+    assert cache.get_many("deep", ["a"]) == [None]
+    assert cache.get_many("quick", ["b", "missing", "a"]) == [[1, "ü"], None, {"polarity": 0.5}]
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.close()
+
+def test_lookups_larger_than_a_batch(path, monkeypatch):
+    monkeypatch.setattr(disk_cache, "LOOKUP_BATCH", 3)
+    cache = reopen(path)
+    cache.put_many("quick", [(str(i), i) for i in range(10)])
+    cache.close()
+    cache = reopen(path)
+    assert cache.get_many("quick", [str(i) for i in range(11)]) == list(range(10)) + [None]
+    cache.close()
+
+def test_byte_budget_evicts_least_recently_used(path):
+    cache = reopen(path, max_bytes=1000)
+    cache.put_many("quick", [(name, value(name)) for name in "abcde"])
+    cache.close()
+    cache = reopen(path, max_bytes=1000)
+    assert cache.bytes == 500
+    cache.get_many("quick", ["a"])  # a is used again, so b, c and d are now the least recently used
+    cache.put_many("quick", [(name, value(name)) for name in "fghijk"])
+    cache.close()
+    # 1100 bytes is over the budget: compacted down to 80% of it
+    cache = reopen(path, max_bytes=1000)
+    kept = [name for name, result in zip("abcdefghijk", cache.get_many("quick", list("abcdefghijk"))) if result]
+    assert kept == list("aefghijk")
+    assert cache.bytes == 800 and cache.stats()["compactions"] == 0
+    cache.close()
+
+def test_rewriting_a_result_keeps_the_byte_count(path):
+    cache = reopen(path)
+    cache.put_many("quick", [("a", value("a"))])
+    cache.put_many("quick", [("a", value("b"))])
+    cache.close()
+    cache = reopen(path)
+    assert cache.bytes == 100 and cache.get_many("quick", ["a"]) == [value("b")]
+    cache.close()
+
+def test_results_of_another_analyzer_version_are_ignored_and_dropped(path):
+    cache = reopen(path, version="1")
+    cache.put_many("quick", [("a", value("a"))])
+    cache.close()
+    cache = reopen(path, version="2")
+    assert cache.get_many("quick", ["a"]) == [None]
+    cache.close()
+    assert cache.bytes == 0  # the writer drops them when it starts
+    cache = reopen(path, version="1")  # dropped when the new version opened the file
+    assert cache.get_many("quick", ["a"]) == [None]
+    cache.close()
@@ -0,0 +1,76 @@
+# tests/test_history.py
+# Each session keeps its newest HISTORY_PER_SESSION records, and idle sessions are forgotten
+# to keep the whole history under HISTORY_MAX_BYTES
+
+import history
+from history import HistoryRecord, HistoryRegistry, SessionHistory
+
+# ---------- HELPERS ----------
+def record(i, text="Some analyzed text"):
+    return HistoryRecord(f"{text} {i}", "Neutral", 0.0, 0.0, timestamp=1000.0 + i)
+
+def previews(records):
+    return [r.preview for r in records]
+
+# ---------- SESSION ----------
+def test_record_keeps_a_preview_and_a_digest_not_the_text():
+    long = HistoryRecord("x" * 500, "Positive", 0.5, 0.5)
+    assert long.preview == "x" * history.PREVIEW_CHARS + "..."
+    assert long.digest == HistoryRecord("x" * 500, "Negative", -0.5, 0.1).digest
+    assert HistoryRecord.from_dict(long.to_dict()).to_dict() == long.to_dict()
+
+def test_ring_buffer_keeps_the_newest_records():
+    session = SessionHistory(capacity=3)
+    evicted = [session.append(record(i)) for i in range(5)]
+    assert evicted[:3] == [None] * 3
+    assert previews(evicted[3:]) == ["Some analyzed text 0", "Some analyzed text 1"]
+    assert previews(session) == [f"Some analyzed text {i}" for i in (2, 3, 4)]
+    assert previews(session.recent(2)) == ["Some analyzed text 4", "Some analyzed text 3"]
+    assert len(session.recent(10)) == 3
+
+def test_session_bytes_follow_evictions_and_clear():
+    session = SessionHistory(capacity=2)
+    empty = session.bytes
+    for i in range(3):
+        session.append(record(i))
+    assert session.bytes == empty + sum(r.approx_size() for r in session)
+    session.clear()
+    assert session.bytes == empty and len(session) == 0
+
+# ---------- REGISTRY ----------
+def test_per_session_limit():
+    registry = HistoryRegistry(per_session=4)
+    for i in range(10):
+        registry.append("s", record(i))
+    assert len(registry.session("s")) == 4
+    assert registry.stats() == {"sessions": 1, "records": 4, "bytes": registry.bytes}
+
+def test_idle_sessions_are_dropped_over_the_byte_budget():
+    size = SessionHistory(2).bytes + 2 * record(0).approx_size()
+    registry = HistoryRegistry(per_session=2, max_bytes=int(2.5 * size))
+    for session_id in ("a", "b"):
+        registry.append(session_id, record(0))
+        registry.append(session_id, record(1))
+    registry.session("a")  # a was active more recently than b
+    registry.append("c", record(0))
+    registry.append("c", record(1))
+    assert registry.stats()["sessions"] == 2
+    assert registry.bytes <= registry.max_bytes
+    assert len(registry.session("a")) == 2
+    assert len(registry.session("b")) == 0  # forgotten: a new, empty history
+
+def test_the_current_session_is_never_dropped():
+    registry = HistoryRegistry(per_session=50, max_bytes=1)
+    for i in range(5):
+        registry.append("big", record(i, "x" * 60))
+    assert len(registry.session("big")) == 5
+    assert registry.stats()["sessions"] == 1
+
+def test_clear_gives_back_the_bytes():
+    registry = HistoryRegistry()
+    registry.append("s", record(0))
+    registry.append("t", record(0))
+    before = registry.bytes
+    registry.clear("s")
+    assert len(registry.session("s")) == 0 and len(registry.session("t")) == 1
+    assert registry.bytes == before - record(0).approx_size()
@@ -0,0 +1,52 @@
+# tests/test_history_log.py
+# Segments written by several processes overlap in time; readers merge them and skip torn lines
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import history_log
+
+BASE = datetime(2026, 1, 1, 12)
+
+# ---------- FIXTURES ----------
+def write_segment(directory, pid, seconds, tail=""):
+    """A segment of process pid with one record per offset in seconds from BASE"""
+    start = BASE + timedelta(seconds=seconds[0])
+    name = f"{history_log.SEGMENT_PREFIX}{int(start.timestamp() * 1e6):020d}-{pid}{history_log.SEGMENT_SUFFIX}"
+    with open(directory / name, "w", encoding="utf-8") as f:
+        for s in seconds:
+            record = {"timestamp": (BASE + timedelta(seconds=s)).isoformat(), "text": f"{pid}:{s}", "session": f"s{s % 2}"}
+            f.write(json.dumps(record) + "\n")
+        f.write(tail)
+
+@pytest.fixture
+def log(tmp_path):
+    # Two processes writing at the same time, one of them killed mid-line
+    write_segment(tmp_path, 100, range(0, 40, 2), tail='{"timestamp": "2026-01-01T12:0')
+    write_segment(tmp_path, 200, range(1, 40, 2))
+    log = history_log.HistoryLog(str(tmp_path))
+    yield log
+    log.close()
+
+# ---------- TESTS ----------
+def test_records_of_overlapping_segments_come_in_time_order(log):
+    assert [r["text"].split(":")[1] for r in log.iter_records()] == [str(s) for s in range(40)]
+    assert log.skipped_lines == 1
+
+def test_iter_records_range(log):
+    records = log.iter_records(since=BASE + timedelta(seconds=10), until=BASE + timedelta(seconds=20))
+    assert [r["text"].split(":")[1] for r in records] == [str(s) for s in range(10, 20)]
+
+@pytest.mark.parametrize("session", [None, "s1"])
+def test_pages_are_newest_first_without_gaps(log, session):
+    seen, before = [], None
+    while page := log.page(before, 7, session):
+        seen += [int(r["text"].split(":")[1]) for r in page]
+        before = datetime.fromisoformat(page[-1]["timestamp"])
+    assert seen == [s for s in reversed(range(40)) if session is None or s % 2 == 1]
+
+def test_page_stops_at_the_sessions_last_clear(log):
+    log.append({"timestamp": (BASE + timedelta(seconds=25.5)).isoformat(), "session": "s1", "type": "cleared"})
+    assert [int(r["text"].split(":")[1]) for r in log.page(None, 50, "s1")] == [39, 37, 35, 33, 31, 29, 27]
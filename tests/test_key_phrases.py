@@ -0,0 +1,52 @@
+# tests/test_key_phrases.py
+# The memoized tagger tags exactly like nltk.pos_tag; the light mode ranks without a tagger
+
+import corpus
+import key_phrases
+
+# ---------- CORPUS ----------
+def documents():
+    """Token lists per sentence for a seeded sample of every corpus kind"""
+    import nltk
+    texts = [text for kind in corpus.KINDS for text in corpus.generate(kind, 15, seed=3)]
+    return [[nltk.word_tokenize(s, preserve_line=True) for s in nltk.sent_tokenize(text)] for text in texts]
+
+# ---------- TAGGER ----------
+def test_memoized_tags_match_pos_tag(punkt, tagger):
+    import nltk
+    docs = documents()
+    reference = [[[tag for _, tag in sentence] for sentence in nltk.pos_tag_sents(doc)] for doc in docs]
+    key_phrases._memo.clear()
+    assert [key_phrases.tag_sents(doc) for doc in docs] == reference
+    # The second pass is answered from the memo and must not change a single tag
+    hits = key_phrases.stats["memo_hits"]
+    assert [key_phrases.tag_sents(doc) for doc in docs] == reference
+    assert key_phrases.stats["memo_hits"] > hits
+
+def test_memo_survives_being_cleared_when_full(punkt, tagger, monkeypatch):
+    import nltk
+    docs = documents()[:10]
+    monkeypatch.setattr(key_phrases, "MEMO_SIZE", 50)
+    key_phrases._memo.clear()
+    reference = [[[tag for _, tag in sentence] for sentence in nltk.pos_tag_sents(doc)] for doc in docs]
+    assert [key_phrases.tag_sents(doc) for doc in docs] == reference
+    assert len(key_phrases._memo) <= 50
+
+def test_tagger_phrases_are_pos_tag_nouns_and_adjectives(punkt, tagger):
+    import nltk
+    for doc in documents():
+        expected = [w.lower() for sentence in nltk.pos_tag_sents(doc) for w, tag in sentence if tag.startswith(("NN", "JJ"))]
+        assert key_phrases.extract(doc, mode="tagger") == expected
+
+# ---------- LIGHT MODE ----------
+def test_light_ranks_non_stopwords_by_frequency():
+    sentences = [["The", "battery", "is", "great", ",", "really", "great", "!"], ["Battery", "life", "is", "ok", "."]]
+    assert key_phrases.extract(sentences, mode="light") == ["battery", "great", "life"]
+
+def test_light_ties_keep_text_order():
+    assert key_phrases.extract([["zebra", "apple", "mango"]], mode="light") == ["zebra", "apple", "mango"]
+
+def test_auto_uses_light_mode_over_budget(monkeypatch):
+    monkeypatch.setattr(key_phrases, "_seconds_per_char", [1.0])
+    monkeypatch.setattr(key_phrases, "BUDGET", 0.5)
+    assert key_phrases.extract([["Lovely", "hotel", "staff"]], mode="auto") == ["lovely", "hotel", "staff"]
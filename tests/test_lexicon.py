@@ -0,0 +1,63 @@
+# tests/test_lexicon.py
+# The compiled lexicon must score every text exactly like TextBlob's PatternAnalyzer
+
+import pytest
+from textblob import TextBlob
+
+import corpus
+import lexicon
+from analyzer import analyze_text_blob
+
+# ---------- CORPUS ----------
+NEGATION = [
+    "This is not good.",
+    "The food was never bad, not once.",
+    "It isn't great and it wasn't terrible either.",
+    "I don't hate it. No, really, I don't.",
+    "Not very happy with the service.",
+    "He did not seem particularly interested.",
+]
+INTENSIFIERS = [
+    "The hotel was very good.",
+    "Absolutely awful experience, extremely rude staff!",
+    "Really really nice people.",
+    "It was terribly slow and incredibly loud!!",
+    "Very. Good stuff!",
+    "A slightly disappointing but mostly pleasant evening.",
+]
+EMOTICONS = [
+    "Great job :)",
+    "Missed the bus again :-(",
+    "I <3 this place",
+    "Saw the results :'(",
+    "Well that went well (!)",
+    "Hmm :/ not sure :D",
+    "Love it ;) but the price :(",
+]
+EDGE_CASES = [
+    "",
+    "   ",
+    "Dr. Smith, e.g. our lead, met Mr. Jones at 5 p.m. vs. the others.",
+    "“Wonderful,” she said. ‘Just wonderful.’",
+    "First paragraph is happy.\n\nSecond paragraph is sad.\r\n\r\nThird is fine.",
+    "We’re officially restarting! 🚀✨ #StartAgain",
+    "You'll love it... or you'll hate it?!",
+]
+TEXTS = NEGATION + INTENSIFIERS + EMOTICONS + EDGE_CASES
+CORPUS = [pytest.param(text, id=f"{kind}-{i}") for kind in corpus.KINDS for i, text in enumerate(corpus.generate(kind, 25))]
+
+# ---------- TESTS ----------
+@pytest.mark.parametrize("text", TEXTS)
+def test_score_matches_textblob(text):
+    assert lexicon.score(text) == pytest.approx(tuple(TextBlob(text).sentiment), abs=1e-12)
+
+@pytest.mark.parametrize("text", CORPUS)
+def test_corpus_matches_textblob(text):
+    assert lexicon.score(text) == pytest.approx(tuple(TextBlob(text).sentiment), abs=1e-12)
+
+@pytest.mark.parametrize("text", TEXTS + CORPUS[::5])
+def test_quick_analysis_counts_match_textblob(text, punkt):
+    blob = TextBlob(text)
+    result = analyze_text_blob(text)
+    assert (result["word_count"], result["sentence_count"]) == (len(blob.words), len(blob.sentences))
+    assert result["polarity"] == pytest.approx(blob.sentiment.polarity, abs=1e-12)
@@ -0,0 +1,75 @@
+# tests/test_live.py
+# Live analysis updated edit by edit reports the same as analyzing the final text from scratch
+
+import pytest
+
+import analyzer
+import corpus
+import live
+
+# ---------- EDITS ----------
+BASE = "The hotel was lovely. Staff were rude though! Breakfast was great. We would not return."
+
+EDITS = [  # (description, function of the previous text)
+    ("insert a sentence", lambda t: t.replace("Breakfast", "The pool was awful. Breakfast")),
+    ("insert within a sentence", lambda t: t.replace("lovely", "really lovely")),
+    ("delete a sentence", lambda t: t.replace(" Staff were rude though!", "")),
+    ("join two sentences", lambda t: t.replace("great. We", "great, we")),
+    ("split a sentence", lambda t: t.replace("lovely and", "lovely. And")),
+    ("edit across a boundary", lambda t: t.replace("awful. Breakfast was", "fine! Dinner is")),
+    ("append", lambda t: t + " Terrible parking :("),
+    ("delete the start", lambda t: t[t.index(".") + 2:]),
+    ("paste the same text twice", lambda t: t + " " + t),
+    ("delete everything", lambda t: ""),
+    ("type a new text", lambda t: "Good."),
+]
+
+def fresh(text):
+    return live.LiveAnalysis().update(text)
+
+# ---------- TESTS ----------
+def test_each_edit_matches_a_full_recompute(punkt):
+    analysis = live.LiveAnalysis()
+    text = BASE
+    analysis.update(text)
+    for description, edit in EDITS:
+        text = edit(text)
+        assert analysis.update(text) == fresh(text), description
+        assert analysis._spans == live.sentence_spans(text), description
+
+def test_keystrokes_match_a_full_recompute(punkt):
+    """Typing a text character by character, then deleting it from the middle out"""
+    target = corpus.generate("review", 1, seed=5)[0][:300]
+    analysis = live.LiveAnalysis()
+    for i in range(1, len(target) + 1, 7):
+        assert analysis.update(target[:i]) == fresh(target[:i])
+    text = target
+    while text:
+        middle = len(text) // 2
+        text = text[:middle] + text[middle + 9:]
+        assert analysis.update(text) == fresh(text)
+
+def test_only_changed_sentences_are_rescored(punkt):
+    analysis = live.LiveAnalysis()
+    analysis.update(BASE)
+    rescored = analysis.stats["rescored"]
+    analysis.update(BASE.replace("great", "superb"))
+    assert analysis.stats["rescored"] == rescored + 1
+    analysis.update(BASE)  # back to a sentence scored before
+    assert analysis.stats["rescored"] == rescored + 1
+
+@pytest.mark.parametrize("cache_size", [1, 3])
+def test_small_cache_still_matches(cache_size, punkt):
+    analysis = live.LiveAnalysis(cache_size=cache_size)
+    text = BASE
+    analysis.update(text)
+    for _, edit in EDITS:
+        text = edit(text)
+        assert analysis.update(text) == fresh(text)
+
+@pytest.mark.parametrize("text", [text for kind in corpus.KINDS for text in corpus.generate(kind, 5, seed=9)])
+def test_word_figures_match_the_deep_analysis(text, punkt):
+    report, deep = fresh(text), analyzer.deep_analyze_text(text)
+    assert report["word_frequency"] == deep["word_frequency"]
+    assert report["statistics"]["total_words"] == deep["statistics"]["total_words"]
+    assert report["statistics"]["total_sentences"] == deep["statistics"]["total_sentences"]
@@ -0,0 +1,72 @@
+# tests/test_result_cache.py
+# The result cache stays within its entry and byte budgets, counts its lookups, and never hands
+# out a result stored by another analyzer version
+
+import asyncio
+
+import result_cache
+import state
+from analyzer import ANALYZER_VERSION
+from result_cache import ResultCache, SharedResults
+
+# ---------- HELPERS ----------
+def result(size=0):
+    return {"sentiment": "Positive", "padding": "x" * size}
+
+# ---------- MEMORY ----------
+def test_keys_ignore_unicode_form_line_endings_and_surrounding_space():
+    assert result_cache.text_key("quick", "Café ok\r\nfine ") == result_cache.text_key("quick", "Café ok\nfine")
+    assert result_cache.text_key("quick", "text") != result_cache.text_key("deep", "text")
+
+def test_least_recently_used_entry_goes_first():
+    cache = ResultCache(max_entries=3)
+    for text in "abc":
+        cache.put("quick", text, result())
+    cache.get("quick", "a")
+    cache.put("quick", "d", result())
+    assert [cache.get("quick", text) is not None for text in "abcd"] == [True, False, True, True]
+    assert len(cache) == 3 and cache.evictions == 1
+
+def test_byte_budget():
+    size = result_cache.approx_size(result(100))
+    cache = ResultCache(max_bytes=2 * size + size // 2)
+    for text in "abc":
+        cache.put("quick", text, result(100))
+    assert len(cache) == 2 and cache.bytes == 2 * size
+    assert cache.get("quick", "a") is None
+    cache.put("quick", "huge", result(10 * size))  # larger than the whole budget: not kept, nothing evicted
+    assert len(cache) == 2 and cache.get("quick", "huge") is None
+
+def test_replacing_an_entry_keeps_the_byte_count():
+    cache = ResultCache()
+    cache.put("quick", "a", result(100))
+    cache.put("quick", "a", result(10))
+    assert cache.bytes == result_cache.approx_size(result(10))
+
+def test_hits_and_misses():
+    cache = ResultCache()
+    cache.put("quick", "a", result())
+    assert cache.get_many("quick", ["a", "b", "a"]) == [result(), None, result()]
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache.clear()
+    assert cache.get("quick", "a") is None and cache.stats()["misses"] == 2
+
+# ---------- BACKING ----------
+def test_misses_are_looked_up_in_the_backing_store_in_one_request():
+    store = state.MemoryStore()
+    calls = []
+    get_many = store.get_many
+    store.get_many = lambda keys: calls.append(keys) or get_many(keys)
+    first, second = ResultCache(backing=SharedResults(store, ANALYZER_VERSION)), ResultCache(backing=SharedResults(store, ANALYZER_VERSION))
+    asyncio.run(first.save_many("quick", [("a", result(1)), ("b", result(2))]))
+    assert asyncio.run(second.fetch_many("quick", ["a", "c", "b"])) == [result(1), None, result(2)]
+    assert len(calls) == 1 and len(calls[0]) == 3
+    # What the backing store found is now in memory: no second request
+    assert second.get_many("quick", ["a", "b"]) == [result(1), result(2)] and len(calls) == 1
+    assert second.backing.stats() == {"hits": 2, "misses": 1, "errors": 0}
+
+def test_results_of_another_analyzer_version_are_not_used():
+    store = state.MemoryStore()
+    SharedResults(store, "old").put_many("quick", [("digest", result())])
+    assert SharedResults(store, ANALYZER_VERSION).get_many("quick", ["digest"]) == [None]
+    assert SharedResults(store, "old").get_many("quick", ["digest"]) == [result()]
@@ -0,0 +1,169 @@
+# tests/test_state.py
+# Every STATE_BACKEND stores the same way (redis through the `python state.py serve` stand-in,
+# which shares the patched clock), and the history and results fall back to this process when the store fails
+
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+import history
+import result_cache
+import state
+
+# ---------- FIXTURES ----------
+class Clock:
+    """time.time() for state.py, moved on by the tests instead of waiting"""
+
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(state, "time", clock)
+    return clock
+
+@pytest.fixture
+def stand_in():
+    """URL of a stand-in redis server running in a thread"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(state.StandInServer().handle, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"redis://127.0.0.1:{server.sockets[0].getsockname()[1]}/0"
+
+    async def stop():
+        server.close()
+        connections = asyncio.all_tasks() - {asyncio.current_task()}
+        for task in connections:
+            task.cancel()
+        await asyncio.gather(*connections, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(stop(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path, clock):
+    if request.param == "memory":
+        store = state.MemoryStore()
+    elif request.param == "sqlite":
+        store = state.SQLiteStore(str(tmp_path / "state.sqlite3"))
+    else:
+        store = state.RedisStore(request.getfixturevalue("stand_in"))
+    yield store
+    store.close()
+
+@pytest.fixture
+def unreachable():
+    """A redis store on a port nothing listens on"""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return state.RedisStore(f"redis://127.0.0.1:{port}/0")
+
+# ---------- STORES ----------
+def test_values(store):
+    store.set("a", "1")
+    store.set_many([("b", "2"), ("c", "ü")])
+    assert store.get("a") == "1"
+    assert store.get_many(["c", "missing", "a"]) == ["ü", None, "1"]
+    assert store.get_many([]) == []
+    store.delete("a")
+    assert store.get("a") is None
+
+def test_values_expire(store, clock):
+    store.set("short", "1", ttl=10)
+    store.set_many([("long", "2")], ttl=100)
+    store.set("forever", "3")
+    clock.now += 50
+    assert store.get_many(["short", "long", "forever"]) == [None, "2", "3"]
+
+def test_lists_keep_the_newest(store):
+    for i in range(7):
+        store.push("list", str(i), limit=5)
+    assert store.items("list") == ["6", "5", "4", "3", "2"]
+    assert store.items("list", 2) == ["6", "5"]
+    assert store.items("missing") == []
+    store.delete("list")
+    assert store.items("list") == []
+
+def test_lists_expire(store, clock):
+    store.push("list", "old", limit=5, ttl=10)
+    clock.now += 5
+    store.push("list", "new", limit=5, ttl=10)  # pushing renews the whole list
+    clock.now += 8
+    assert store.items("list") == ["new", "old"]
+    clock.now += 10
+    assert store.items("list") == []
+
+def test_sqlite_store_is_shared_by_connections(tmp_path):
+    first, second = state.SQLiteStore(str(tmp_path / "state.sqlite3")), state.SQLiteStore(str(tmp_path / "state.sqlite3"))
+    first.set("key", "value")
+    first.push("list", "item", limit=3)
+    assert second.get("key") == "value" and second.items("list") == ["item"]
+    first.close()
+    second.close()
+
+@pytest.mark.parametrize("start, stop", [(0, -1), (0, 2), (1, 3), (-3, -1), (-2, 10), (-10, 1), (2, 1), (5, 9), (0, -10), (-1, -2)])
+def test_stand_in_ranges_like_redis(start, stop):
+    server = state.StandInServer()
+    values = [str(i) for i in range(5)]
+    server.execute("LPUSH", ["list", *reversed(values)])
+    # Redis: negative indexes count from the end, out-of-range ones are clamped, both ends are included
+    first = max(0, start + 5 if start < 0 else start)
+    last = min(4, stop + 5 if stop < 0 else stop)
+    expected = values[first:last + 1] if first <= last else []
+    assert server.execute("LRANGE", ["list", str(start), str(stop)]) == expected
+    server.execute("LTRIM", ["list", str(start), str(stop)])
+    assert server.execute("LRANGE", ["list", "0", "-1"]) == expected
+
+def test_stand_in_keeps_expiry_through_trim(clock):
+    server = state.StandInServer()
+    server.execute("LPUSH", ["list", "a", "b", "c"])
+    server.execute("EXPIRE", ["list", "10"])
+    server.execute("LTRIM", ["list", "0", "1"])
+    assert server.execute("LRANGE", ["list", "0", "-1"]) == ["c", "b"]
+    clock.now += 11
+    assert server.execute("LRANGE", ["list", "0", "-1"]) == []
+
+def test_unreachable_store_raises_state_error(unreachable):
+    with pytest.raises(state.StateError):
+        unreachable.get("key")
+    with pytest.raises(state.StateError):
+        unreachable.push("list", "item", limit=3)
+
+# ---------- FALLBACKS ----------
+def test_history_works_without_the_store(unreachable):
+    histories = history.SharedHistoryRegistry(unreachable)
+    histories.append("s", history.HistoryRecord("Kept in this process", "Neutral", 0.0, 0.0))
+    assert [r.preview for r in histories.session("s")] == ["Kept in this process"]
+    histories.clear("s")
+    assert len(histories.session("s")) == 0
+    assert histories.errors == 4
+
+def test_results_miss_without_the_store(unreachable):
+    shared = result_cache.SharedResults(unreachable, "test")
+    shared.put_many("quick", [("digest", {"polarity": 0.5})])
+    assert shared.get_many("quick", ["digest"]) == [None]
+    assert shared.stats() == {"hits": 0, "misses": 1, "errors": 2}
+
+# ---------- SHARING ----------
+def test_history_is_shared_by_registries(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    first, second = history.SharedHistoryRegistry(state.SQLiteStore(path)), history.SharedHistoryRegistry(state.SQLiteStore(path))
+    for i in range(3):
+        first.append("s", history.HistoryRecord(f"text {i}", "Positive", 0.5, 0.5, timestamp=1000.0 + i))
+    assert [(r.preview, r.timestamp) for r in second.session("s")] == [(f"text {i}", 1000.0 + i) for i in range(3)]
+    assert len(second.session("other")) == 0
+    second.clear("s")
+    assert len(first.session("s")) == 0
+    first.store.close()
+    second.store.close()
@@ -0,0 +1,64 @@
+# tests/test_worker_pool.py
+# A job that runs out of time fails, rather than returning (and caching) a degraded result
+
+import asyncio
+import time
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import analyzer
+import api
+import key_phrases
+import worker_pool
+
+# ---------- FIXTURES ----------
+def slow_key_phrases(*args, **kwargs):
+    time.sleep(1)
+    return []
+
+class BrokenExecutor(Executor):
+    """A pool whose worker dies once break_jobs() is called, failing every job it was given"""
+
+    def __init__(self):
+        self.jobs = []
+        self.shut_down = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        self.jobs.append(Future())
+        return self.jobs[-1]
+
+    def break_jobs(self):
+        for job in self.jobs:
+            job.set_exception(BrokenProcessPool("a worker died"))
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down += 1
+
+# ---------- TESTS ----------
+@pytest.mark.parametrize("kind, batch_fn", [("quick", analyzer.analyze_batch), ("deep", analyzer.deep_analyze_batch)])
+def test_timed_out_job_raises_and_caches_nothing(kind, batch_fn, punkt, inline_pool, results, monkeypatch):
+    monkeypatch.setattr(inline_pool, "JOB_TIMEOUT", 0.2)
+    monkeypatch.setattr(key_phrases, "MODE", "tagger")
+    monkeypatch.setattr(analyzer, "extract_key_phrases", slow_key_phrases)
+    monkeypatch.setattr(analyzer, "tagged_phrases", slow_key_phrases)
+    started = time.perf_counter()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(api.analyze_many(kind, batch_fn, ["This is really great.", "Not good at all."]))
+    assert time.perf_counter() - started < 1
+    assert len(results) == 0
+
+def test_broken_pool_is_shut_down_once(monkeypatch):
+    broken = BrokenExecutor()
+    monkeypatch.setattr(worker_pool, "_executor", broken)
+
+    async def run_twice():
+        jobs = asyncio.gather(worker_pool.run(len, "a"), worker_pool.run(len, "b"), return_exceptions=True)
+        asyncio.get_running_loop().call_soon(broken.break_jobs)
+        return await jobs
+
+    assert all(isinstance(e, BrokenProcessPool) for e in asyncio.run(run_twice()))
+    assert broken.shut_down == 1
+    assert worker_pool._executor is None
+    assert worker_pool.in_flight[0] == 0
@@ -0,0 +1,116 @@
+# worker_pool.py
+# Process pool that keeps analyses off the NiceGUI event loop
+#
+# Environment:
+#   ANALYZER_WORKERS  number of worker processes (default: CPU count)
+#   ANALYZER_TIMEOUT  seconds a single analysis job may run before it is stopped; time spent queued
+#                     doesn't count (default: 30)
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import metrics
+
+# ---------- CONFIG ----------
+POOL_SIZE = max(1, int(os.environ.get("ANALYZER_WORKERS", os.cpu_count() or 1)))
+JOB_TIMEOUT = float(os.environ.get("ANALYZER_TIMEOUT", "30"))
+QUICK_JOBS = ("analyze_text_blob", "analyze_batch")  # job functions recorded as quick analyses; the rest are deep,
+LIVE_JOBS = ("sentence_spans", "score_sentences")     # except these steps of the live (as-you-type) analysis
+WORKER_TIMER = hasattr(signal, "setitimer")  # workers stop their own jobs; elsewhere (Windows) run() gives up waiting
+
+# ---------- STATE ----------
+_executor = None
+in_flight = [0]  # jobs submitted and not finished yet
+
+# ---------- POOL ----------
+def watch_parent(parent):
+    # A server process that was killed, or exited before its pool shut down, leaves no one to stop us
+    while os.getppid() == parent:
+        time.sleep(1)
+    os._exit(0)
+
+def init_worker():
+    # Ctrl+C is handled by the server process, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if WORKER_TIMER:
+        signal.signal(signal.SIGALRM, job_timed_out)
+    threading.Thread(target=watch_parent, args=(os.getppid(),), daemon=True).start()
+    import startup
+    startup.configure_nltk()
+    import analyzer
+    analyzer.warm_up()
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=POOL_SIZE,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+    return _executor
+
+def job_timed_out(signum, frame):
+    raise TimeoutError(f"analysis job ran for more than {JOB_TIMEOUT:g}s")
+
+def timed_job(fn, *args):
+    """Worker side of run(): the result plus the job's stage times and duration.
+    The job's clock starts here, when a worker picks it up, and the job is stopped when it runs out."""
+    metrics.collect_stages()
+    started = time.perf_counter()
+    if WORKER_TIMER:
+        signal.setitimer(signal.ITIMER_REAL, JOB_TIMEOUT)
+    try:
+        result = fn(*args)
+    finally:
+        if WORKER_TIMER:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result, metrics.collect_stages(), time.perf_counter() - started
+
+async def run(fn, *args):
+    """Run fn(*args) in the worker pool; raises asyncio.TimeoutError when the job runs longer than
+    JOB_TIMEOUT seconds, not counting the time it waited for a worker"""
+    global _executor
+    loop = asyncio.get_running_loop()
+    submitted = time.perf_counter()
+    in_flight[0] += 1
+    executor = get_executor()
+    try:
+        job = loop.run_in_executor(executor, timed_job, fn, *args)
+        result, stages, duration = await (job if WORKER_TIMER else asyncio.wait_for(job, JOB_TIMEOUT))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM on a huge paste); stop what is left of the pool (once, however
+        # many of its jobs fail) and start a fresh one for the next job
+        if _executor is executor:
+            _executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        in_flight[0] -= 1
+    kind = "quick" if fn.__name__ in QUICK_JOBS else "live" if fn.__name__ in LIVE_JOBS else "deep"
+    stages["queue"] = time.perf_counter() - submitted - duration
+    metrics.observe_stages(stages, kind)
+    return result
+
+def warm():
+    """Start every worker and wait for it to warm up; returns each worker's warm-up timings"""
+    import analyzer
+    executor = get_executor()
+    futures = [executor.submit(analyzer.warm_up) for _ in range(POOL_SIZE)]
+    return [f.result() for f in futures]
+
+def shutdown():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+# ---------- METRICS ----------
+metrics.gauge("analyzer_pool_jobs_in_flight", "Analysis jobs queued or running on the worker pool", lambda: in_flight[0])
+metrics.gauge("analyzer_pool_workers", "Worker processes in the analysis pool", lambda: POOL_SIZE)